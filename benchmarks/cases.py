@@ -0,0 +1,220 @@
+'''
+Benchmark cases. Each case is a function taking the size parameters of the case and returning a callable which runs
+the code being measured once, any setup (generating data, starting servers) is done before the callable is returned.
+Cases register themselves in CASES with the benchmark decorator, once per set of parameters.
+'''
+
+import warnings
+from contextlib import ExitStack
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from flood_monitoring import (FloodStatus, Forecast, FloodMonitoringMixin, HTTPTransport, Readings, ReadingsTruncatedWarning, RiverLevel,
+                              StationCatalogue, get_transport, set_transport, station)
+from flood_monitoring.standin import StandInServer, SyntheticNetwork
+
+from synthetic import NOTATION, StaticTransport, reading_series, readings_csv, readings_frame, readings_json
+
+
+CASES = {}
+
+# the largest parsing cases are deliberately at the API's row limit
+warnings.filterwarnings('ignore', category = ReadingsTruncatedWarning)
+
+
+def benchmark(name : str, quick : bool = True, **params):
+
+    '''
+    registers a case under name (formatted with params), quick cases are also run with --quick
+    '''
+
+    def register(case):
+        CASES[name.format(**params)] = (case, params, quick)
+        return case
+
+    return register
+
+
+def multi_benchmark(name : str, param_sets : list[dict], quick_sets : int = 1):
+
+    ''' registers a case once per set of params, only the first quick_sets are run with --quick '''
+
+    def register(case):
+        for idx, params in enumerate(param_sets):
+            benchmark(name, quick = idx < quick_sets, **params)(case)
+        return case
+
+    return register
+
+
+class using_transport:
+
+    ''' installs a transport for the lifetime of a case, restoring the previous one when the case is closed '''
+
+    def __init__(self, transport) -> None:
+        self.transport = transport
+        self.previous = get_transport()
+        set_transport(transport)
+
+    def close(self) -> None:
+        set_transport(self.previous)
+
+
+'''
+response parsing
+'''
+
+@multi_benchmark('get_readings_csv[n={n}]', [{'n' : 2_000}, {'n' : 10_000}, {'n' : 35_040}])
+def get_readings_csv(cleanup : ExitStack, n : int):
+
+    cleanup.callback(using_transport(StaticTransport(readings_csv(n))).close)
+    mixin = FloodMonitoringMixin()
+
+    return lambda : mixin.get_readings(NOTATION, ['2025-01-01', '2025-12-31'], as_readings = True)
+
+
+@multi_benchmark('get_readings_json[n={n}]', [{'n' : 2_000}, {'n' : 10_000}])
+def get_readings_json(cleanup : ExitStack, n : int):
+
+    cleanup.callback(using_transport(StaticTransport(readings_json(n))).close)
+    mixin = FloodMonitoringMixin()
+
+    return lambda : Readings.from_json(mixin.get_readings(NOTATION, ['2025-01-01', '2025-12-31']), NOTATION)
+
+
+'''
+forecasting
+'''
+
+@multi_benchmark('transform_data[n={n},lags={lags}]', [{'n' : 2_000, 'lags' : 4}, {'n' : 35_040, 'lags' : 4}, {'n' : 35_040, 'lags' : 96}])
+def transform_data(cleanup : ExitStack, n : int, lags : int):
+
+    frame = readings_frame(n)
+
+    return lambda : Forecast.transform_data(frame, lags, evaluation_split = True, split_size = 96)
+
+
+@multi_benchmark('predict[horizon={horizon},batch={batch}]', [{'horizon' : 10, 'batch' : 1}, {'horizon' : 100, 'batch' : 1},
+                                                             {'horizon' : 1_000, 'batch' : 1}, {'horizon' : 96, 'batch' : 3_000}], quick_sets = 2)
+def predict(cleanup : ExitStack, horizon : int, batch : int):
+
+    forecast = Forecast()
+    X, y = forecast.transform_data(readings_frame(2_000), 8)
+    forecast.fit(X, y)
+
+    states = X[:batch] if batch > 1 else X[0]
+
+    return lambda : forecast.predict(states, horizon)
+
+
+@multi_benchmark('fit[n={n}]', [{'n' : 1_000}, {'n' : 10_000}, {'n' : 35_040}])
+def fit(cleanup : ExitStack, n : int):
+
+    forecast = Forecast()
+    X, y = forecast.transform_data(readings_frame(n), 8)
+
+    return lambda : forecast.fit(X, y)
+
+
+@multi_benchmark('fit_many[measures={measures}]', [{'measures' : 100}, {'measures' : 2_000}])
+def fit_many(cleanup : ExitStack, measures : int):
+
+    forecast = Forecast()
+    X, y = forecast.transform_data(readings_frame(3_000), 8)
+
+    data = { f'measure-{idx}' : (X[idx:], y[idx:]) for idx in range(measures) }
+
+    return lambda : forecast.fit_many(data)
+
+
+'''
+plotting and station construction against a local StandInServer
+'''
+
+def serve(cleanup : ExitStack, **network_params) -> StandInServer:
+
+    server = cleanup.enter_context(StandInServer(SyntheticNetwork(**network_params)))
+    cleanup.callback(using_transport(HTTPTransport(base_url = server.base_url)).close)
+
+    return server
+
+
+@multi_benchmark('plot_data_range[days={days}]', [{'days' : 7}, {'days' : 90}])
+def plot_data_range(cleanup : ExitStack, days : int):
+
+    serve(cleanup, n_stations = 0)
+    river_level = RiverLevel('F1906')
+
+    end = np.datetime64('today', 'D') - 1
+    date_range = [ str(date) for date in [end - days + 1, end] ]
+
+    def run():
+        fig, _ = river_level.plot_data_range(date_range)
+        plt.close(fig)
+
+    return run
+
+
+@multi_benchmark('render_year[downsample={method}]', [{'method' : 'minmax'}, {'method' : 'lttb'}, {'method' : None}], quick_sets = 2)
+def render_year(cleanup : ExitStack, method : str | None):
+
+    ''' drawing a year of 15 minute readings, downsampled to twice the figure width in pixels as plot_data_range does '''
+
+    times, values = reading_series(35_040)
+    readings = Readings(times, values, NOTATION)
+
+    def run():
+        fig, ax = plt.subplots()
+        plotted = readings if method is None else readings.downsample(2 * int(fig.get_figwidth() * fig.dpi), method)
+        ax.plot(plotted.times, plotted.values)
+        fig.canvas.draw()
+        plt.close(fig)
+
+    return run
+
+
+@multi_benchmark('construct_stations[n={n}]', [{'n' : 20}, {'n' : 200}])
+def construct_stations(cleanup : ExitStack, n : int):
+
+    server = serve(cleanup, n_stations = n)
+    references = [ reference for reference in server.network.stations if reference.startswith('SYN') ]
+
+    def run():
+        stations = [ station(reference, lazy = True) for reference in references ]
+        station.hydrate_many(stations)
+
+    return run
+
+
+'''
+station catalogue
+'''
+
+@multi_benchmark('catalogue_nearest[stations={stations},queries={queries}]', [{'stations' : 5_000, 'queries' : 1_000}])
+def catalogue_nearest(cleanup : ExitStack, stations : int, queries : int):
+
+    network = SyntheticNetwork(n_stations = stations)
+    catalogue = StationCatalogue(list(network.stations.values()))
+
+    rng = np.random.default_rng(0)
+    points = np.column_stack([rng.uniform(50.0, 55.5, size = queries), rng.uniform(-5.5, 1.7, size = queries)]).tolist()
+
+    catalogue.nearest(*points[0], parameter = 'level')
+
+    return lambda : [ catalogue.nearest(lat, long, n = 5, parameter = 'level') for lat, long in points ]
+
+
+@multi_benchmark('flood_status[stations={stations}]', [{'stations' : 5_000}])
+def flood_status(cleanup : ExitStack, stations : int):
+
+    network = serve(cleanup, n_stations = stations, flood_fraction = 0.5).network
+
+    flood_status = FloodStatus(min_severity = 3)
+    flood_status.status(network.station_lats[:1], network.station_longs[:1])
+
+    return lambda : flood_status.status(network.station_lats, network.station_longs)
@@ -0,0 +1,138 @@
+'''
+Runs the benchmark suite, reporting the time and peak memory of each case and comparing them against a stored baseline.
+
+    python benchmarks/run.py                     # run every case and compare against benchmarks/baseline.json
+    python benchmarks/run.py --quick             # run the small cases only
+    python benchmarks/run.py -k transform        # run the cases whose name contains transform
+    python benchmarks/run.py --save-baseline     # store the results as the new baseline
+
+The exit code is 1 if any case is slower than its baseline by more than --tolerance, or uses more memory by more than
+--memory-tolerance. Timings depend on the machine, so the baseline should be saved on the machine it is compared on.
+'''
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import ExitStack
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cases import CASES
+
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def measure(run, repeat : int, min_time : float) -> dict:
+
+    '''
+    times run repeat times (or for at least min_time seconds) and reports the fastest run, then measures the
+    peak memory allocated during one further run with tracemalloc
+    '''
+
+    run()
+
+    times, start = [], time.perf_counter()
+
+    while len(times) < repeat or time.perf_counter() - start < min_time:
+
+        gc.collect()
+
+        before = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - before)
+
+        if len(times) >= 100 * repeat:
+            break
+
+    gc.collect()
+    tracemalloc.start()
+
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {'seconds' : min(times), 'peak_bytes' : peak, 'runs' : len(times)}
+
+
+def compare(result : dict, baseline : dict | None, tolerance : float, memory_tolerance : float) -> list[str]:
+
+    ''' names of the metrics which regressed by more than their tolerance against the baseline '''
+
+    if baseline is None:
+        return []
+
+    tolerances = {'seconds' : tolerance, 'peak_bytes' : memory_tolerance}
+
+    return [ metric for metric, limit in tolerances.items() if result[metric] > baseline[metric] * (1 + limit) ]
+
+
+def format_bytes(n_bytes : int) -> str:
+
+    for unit in ['B', 'KB', 'MB']:
+        if n_bytes < 1024:
+            return f'{n_bytes:.0f} {unit}'
+        n_bytes /= 1024
+
+    return f'{n_bytes:.1f} GB'
+
+
+def main(argv : list[str] | None = None) -> int:
+
+    parser = argparse.ArgumentParser(description = 'flood_monitoring benchmarks')
+    parser.add_argument('-k', dest = 'keyword', default = '', help = 'only run cases whose name contains keyword')
+    parser.add_argument('--quick', action = 'store_true', help = 'only run the small cases')
+    parser.add_argument('--repeat', type = int, default = 5, help = 'minimum number of timed runs per case')
+    parser.add_argument('--min-time', type = float, default = 0.2, help = 'minimum number of seconds each case is timed for')
+    parser.add_argument('--baseline', default = BASELINE, help = 'baseline file to compare against')
+    parser.add_argument('--save-baseline', action = 'store_true', help = 'store the results in the baseline file')
+    parser.add_argument('--tolerance', type = float, default = 0.5, help = 'relative slowdown reported as a regression')
+    parser.add_argument('--memory-tolerance', type = float, default = 0.1, help = 'relative growth in peak memory reported as a regression')
+
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    results, regressions = {}, []
+
+    print(f'{"case":<45} {"time":>12} {"peak memory":>12} {"vs baseline":>12}')
+
+    for name, (case, params, quick) in CASES.items():
+
+        if args.keyword not in name or (args.quick and not quick):
+            continue
+
+        with ExitStack() as cleanup:
+            results[name] = measure(case(cleanup, **params), args.repeat, args.min_time)
+
+        regressed = compare(results[name], baseline.get(name), args.tolerance, args.memory_tolerance)
+        regressions += [ (name, metric) for metric in regressed ]
+
+        ratio = f'{results[name]["seconds"] / baseline[name]["seconds"]:.2f}x' if name in baseline else '-'
+        flag = '  REGRESSION: ' + ', '.join(regressed) if regressed else ''
+
+        print(f'{name:<45} {results[name]["seconds"] * 1000:>9.3f} ms {format_bytes(results[name]["peak_bytes"]):>12} {ratio:>12}{flag}')
+
+    if args.save_baseline:
+
+        with open(args.baseline, 'w') as file:
+            json.dump({**baseline, **results}, file, indent = 2, sort_keys = True)
+
+        print(f'saved {len(results)} results to {args.baseline}')
+        return 0
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
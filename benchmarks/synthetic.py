@@ -0,0 +1,69 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from flood_monitoring.replay import RecordedResponse
+
+
+NOTATION = 'SYN00000-level-stage-i-15_min-masd'
+MEASURE = f'http://environment.data.gov.uk/flood-monitoring/id/measures/{NOTATION}'
+
+
+def reading_series(n_readings : int, seed : int = 0) -> tuple[np.ndarray, np.ndarray]:
+
+    ''' times (every 15 minutes from 2025-01-01) and values of a smooth, noisy river level series '''
+
+    rng = np.random.default_rng(seed)
+
+    times = np.datetime64('2025-01-01T00:00:00') + np.arange(n_readings) * np.timedelta64(15, 'm')
+    values = 1.0 + 0.3 * np.sin(np.arange(n_readings) * 2 * np.pi / 96) + np.cumsum(rng.normal(scale = 0.01, size = n_readings))
+
+    return times, np.round(values, 3)
+
+
+def timestamps(times : np.ndarray) -> list[str]:
+    return [ f'{time}Z' for time in np.datetime_as_string(times, unit = 's') ]
+
+
+def readings_csv(n_readings : int, seed : int = 0) -> str:
+
+    ''' a readings.csv response with n_readings rows, newest first as returned by the API '''
+
+    times, values = reading_series(n_readings, seed)
+
+    return 'dateTime,measure,value\n' + ''.join( f'{time},{MEASURE},{value}\n' for time, value in zip(timestamps(times)[::-1], values[::-1]) )
+
+
+def readings_json(n_readings : int, seed : int = 0) -> str:
+
+    ''' a readings response with n_readings items, newest first as returned by the API '''
+
+    times, values = reading_series(n_readings, seed)
+
+    items = [ {'@id' : f'{MEASURE}/readings/{time}', 'dateTime' : time, 'measure' : MEASURE, 'value' : float(value)}
+              for time, value in zip(timestamps(times)[::-1], values[::-1]) ]
+
+    return json.dumps({'items' : items})
+
+
+def readings_frame(n_readings : int, seed : int = 0) -> pd.DataFrame:
+
+    ''' readings as returned by Forecast.load_data '''
+
+    times, values = reading_series(n_readings, seed)
+
+    return pd.DataFrame({'dateTime' : timestamps(times), 'measure' : MEASURE, 'value' : values})
+
+
+class StaticTransport:
+
+    '''
+    transport answering every request with the same body, so parsing is measured without any network or server
+    '''
+
+    def __init__(self, text : str) -> None:
+        self.text = text
+
+    def get(self, query : str, params : dict | None = None, timeout = None) -> RecordedResponse:
+        return RecordedResponse(200, self.text)
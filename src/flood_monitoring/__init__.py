@@ -2,5 +2,17 @@ from .river_level import RiverLevel #noqa : F401
 from .tidal_level import TidalLevel #noqa : F401 
 from .temperature import Temperature #noqa : F401 
 from .river_flow import RiverFlow #noqa : F401 
-from .station import station, FloodMonitoringMixin #noqa : F401 
-from .forecast import Forecast #noqa : F401 
\ No newline at end of file
+from .station import station, FloodMonitoringMixin, ReadingsTruncatedWarning, ReadingsTruncatedError, RequestError #noqa : F401 
+from .forecast import Forecast #noqa : F401 
+from .transport import HTTPTransport, get_transport, set_transport #noqa : F401 
+from .aio import AsyncFloodMonitoringClient #noqa : F401 
+from .store import ReadingsStore, get_readings_store, set_readings_store #noqa : F401 
+from .metadata_cache import MetadataCache, TTLCache, get_metadata_cache, set_metadata_cache #noqa : F401 
+from .readings import Readings #noqa : F401 
+from .online import OnlineForecast, RLSState #noqa : F401 
+from .registry import ModelRegistry #noqa : F401 
+from .poller import ReadingsPoller #noqa : F401 
+from .replay import RecordingTransport, ReplayTransport, recording, replaying #noqa : F401 
+from .instrumentation import Metrics, RequestEvent, get_metrics, set_metrics, phase, logging_hook #noqa : F401 
+from .catalogue import StationCatalogue #noqa : F401 
+from .floods import FloodStatus, get_flood_status, set_flood_status #noqa : F401 
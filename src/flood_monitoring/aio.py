@@ -0,0 +1,196 @@
+import asyncio
+import functools
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from .station import FloodMonitoringMixin, station
+from .river_level import RiverLevel
+from .river_flow import RiverFlow
+from .tidal_level import TidalLevel
+from .temperature import Temperature
+
+
+class AsyncFloodMonitoringClient:
+
+    '''
+    Async counterpart to FloodMonitoringMixin which allows many stations and readings to be fetched
+    concurrently from a single event loop.
+
+    Requests are sent through the shared transport (see transport.py) on a private thread pool so that
+    keep-alive connections and retries are shared with the synchronous classes. A semaphore bounds the
+    number of requests in flight, max_concurrency should not exceed the pool_size of the transport
+    otherwise the extra connections are not kept alive.
+
+    Inputs:
+
+        max_concurrency [int] - maximum number of requests sent to the API at the same time
+    '''
+
+    def __init__(self, max_concurrency : int = 10) -> None:
+
+        if max_concurrency < 1:
+            raise Exception('max_concurrency must be at least 1')
+
+        self.max_concurrency = max_concurrency
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._executor = ThreadPoolExecutor(max_concurrency, thread_name_prefix = 'flood-monitoring')
+
+    async def __aenter__(self) -> 'AsyncFloodMonitoringClient':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+
+        ''' shuts down the thread pool used to send requests '''
+
+        self._executor.shutdown(wait = False)
+
+    async def make_request(self,
+                           query : str,
+                           params : dict = {},
+                           return_json : bool = True,
+                           timeout : float | tuple | None = None) -> dict | str:
+
+        '''
+        awaitable version of FloodMonitoringMixin.make_request, waits for a free slot before sending the request
+        '''
+
+        return await self.run(FloodMonitoringMixin.make_request, query, params, return_json, timeout)
+
+    async def run(self, function, *args):
+
+        '''
+        calls a blocking function (one which sends requests) on the thread pool once a slot is free, so it counts
+        towards max_concurrency and does not block the event loop
+        '''
+
+        loop = asyncio.get_running_loop()
+
+        # semaphores are bound to an event loop, one is kept per loop so the client can be reused across asyncio.run calls
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+
+        async with semaphore:
+            return await loop.run_in_executor(self._executor, functools.partial(function, *args))
+
+    async def get_readings(self,
+                           measure_notation : str,
+                           date_range : list | None = None,
+                           limit : int | None = None,
+                           csv : bool = False) -> dict | str:
+
+        '''
+        awaitable version of FloodMonitoringMixin.get_readings, accepts the same arguments
+        '''
+
+        query, params, return_json = FloodMonitoringMixin.readings_query(measure_notation, date_range, limit, csv)
+
+        return await self.make_request(query, params, return_json)
+
+    async def get_latest_measurement(self, station_ : station, limit : int = 1) -> dict:
+
+        '''
+        awaitable version of station.get_latest_measurement, the readings for every measure of the
+        station are requested concurrently. Measures without a reading are set to None. Lazily created stations
+        are hydrated first, as reading their measures would otherwise load them on the event loop.
+        '''
+
+        if not station_.hydrated:
+            await self.hydrate(station_)
+
+        notations = [measure.notation for measure in station_.measures]
+
+        responses = await asyncio.gather(*[self.get_readings(notation, limit = limit) for notation in notations],
+                                         return_exceptions = True)
+
+        latest_measurements = {}
+
+        for notation, response in zip(notations, responses):
+
+            try:
+                reading = response['items'][0]['value']
+            except (TypeError, KeyError, IndexError):
+                reading = None
+
+            latest_measurements[notation] = reading
+
+        return latest_measurements
+
+    async def hydrate(self, station_ : station) -> station:
+
+        '''
+        populates a lazily created station, the metadata and measures are requested concurrently through the metadata
+        cache when one is set (see metadata_cache.py). They are applied on the thread pool while holding the station's
+        hydration lock, so a station being hydrated by another thread is only loaded once.
+        '''
+
+        if station_.hydrated:
+            return station_
+
+        metadata, measures = await asyncio.gather(self.run(station_.get_station_metadata), self.run(station_.get_measures))
+
+        await self.run(self.apply_hydration, station_, metadata, measures)
+
+        return station_
+
+    @staticmethod
+    def apply_hydration(station_ : station, metadata : list, measures : dict) -> None:
+
+        '''
+        applies the responses requested by hydrate unless the station has been hydrated in the meantime. RiverLevel
+        stations need their position to query the flood status so it is requested here, or read from the FloodStatus
+        when one is installed.
+        '''
+
+        with station_._hydration_lock:
+
+            if station_._hydrated or station_._hydrating:
+                return
+
+            station_._hydrating = True
+
+            try:
+                station_.apply_metadata(metadata)
+                station_.apply_measures(measures)
+
+                if isinstance(station_, RiverLevel):
+                    station_.set_in_flood()
+
+                station_.mark_hydrated()
+
+            finally:
+                station_._hydrating = False
+
+    async def create(self, station_class : type, station_id : str) -> station:
+
+        ''' async factory which creates and populates a station of the given class '''
+
+        return await self.hydrate(station_class(station_id, lazy = True))
+
+    async def create_many(self,
+                          station_class : type,
+                          station_ids : list[str],
+                          return_exceptions : bool = False) -> list:
+
+        '''
+        creates many stations of the same class concurrently, bounded by max_concurrency. If return_exceptions
+        is True stations which fail to load are returned as the exception raised instead of cancelling the rest.
+        '''
+
+        return await asyncio.gather(*[self.create(station_class, station_id) for station_id in station_ids],
+                                    return_exceptions = return_exceptions)
+
+    async def river_level(self, station_id : str) -> RiverLevel:
+        return await self.create(RiverLevel, station_id)
+
+    async def river_flow(self, station_id : str) -> RiverFlow:
+        return await self.create(RiverFlow, station_id)
+
+    async def tidal_level(self, station_id : str) -> TidalLevel:
+        return await self.create(TidalLevel, station_id)
+
+    async def temperature(self, station_id : str) -> Temperature:
+        return await self.create(Temperature, station_id)
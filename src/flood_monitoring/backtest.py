@@ -0,0 +1,132 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .forecast import Forecast
+from .readings import Readings
+
+
+METRIC_COLUMNS = ['measure', 'lag_features', 'origin', 'horizon', 'prediction', 'actual', 'MAE', 'MSE']
+
+
+def backtest_origins(n_readings : int,
+                     max_lag : int,
+                     horizon : int,
+                     n_origins : int,
+                     step : int,
+                     min_train : int) -> np.ndarray:
+
+    '''
+    indices of the readings each forecast starts from, the last origin leaves exactly horizon readings to compare
+    against and earlier origins are step readings apart. Origins with fewer than min_train training rows are dropped.
+    '''
+
+    origins = n_readings - horizon - step * np.arange(n_origins)[::-1]
+
+    return origins[origins - max_lag >= min_train]
+
+
+def backtest_series(readings : Readings,
+                    lag_features : list[int],
+                    horizon : int = 4,
+                    n_origins : int = 10,
+                    step : int | None = None,
+                    window : int | None = None,
+                    min_train : int | None = None) -> pd.DataFrame:
+
+    '''
+    Backtests the autoregressive linear model of a single measure from several forecast origins and for several
+    numbers of lag features.
+
+    A single lag matrix is built for the largest number of lag features (a view of the values, see Forecast.lag_matrix)
+    and every model is trained on its leading columns, so the series is only transformed once. For each number of lag
+    features the models of every origin are fitted with one batched solve and forecast together. Missing readings are dropped.
+
+    Inputs:
+
+        readings [Readings]  - readings of the measure
+        lag_features [list]  - numbers of lag features to compare
+        horizon [int]        - number of steps forecast from each origin
+        n_origins [int]      - number of forecast origins, ending at the last reading which leaves horizon readings to compare against
+        step [int]           - number of readings between origins, horizon by default
+        window [int]         - number of rows each model is trained on (rolling origin), None trains on all earlier rows (expanding origin)
+        min_train [int]      - minimum number of training rows, origins with fewer are skipped
+
+    Output:
+
+        metrics [pd.DataFrame] - one row per lag_features, origin and horizon step with the prediction, actual value
+                                 and its absolute (MAE) and squared (MSE) error
+    '''
+
+    readings = readings.sorted()
+
+    valid = ~np.isnan(readings.values)
+    times, values = readings.times[valid], readings.values[valid]
+
+    max_lag = max(lag_features)
+    step = step or horizon
+    min_train = min_train or 2 * (max_lag + 1)
+
+    origins = backtest_origins(len(values), max_lag, horizon, n_origins, step, min_train)
+
+    if len(origins) == 0:
+        raise Exception(f'Not enough readings to backtest measure {readings.measure}')
+
+    # row k of X predicts values[k + max_lag], so the rows before origin - max_lag only use readings before the origin
+    X, y = Forecast.lag_matrix(values, max_lag)
+    ends = origins - max_lag
+    starts = np.zeros_like(ends) if window is None else np.maximum(ends - window, 0)
+
+    steps = np.arange(horizon)
+    actual = values[origins[:, None] + steps]
+
+    frames = []
+    for lag in lag_features:
+
+        coefficients, intercepts = Forecast.solve_least_squares([ X[start:end, :lag] for start, end in zip(starts, ends) ],
+                                                                [ y[start:end] for start, end in zip(starts, ends) ])
+
+        # the lag columns are latest first, recursive_forecast expects the state oldest first
+        states = values[origins[:, None] - lag + np.arange(lag)]
+        predictions = Forecast.recursive_forecast(coefficients[:, ::-1], intercepts, states, horizon)
+
+        errors = (predictions - actual).ravel()
+
+        frames.append(pd.DataFrame({'measure' : readings.measure,
+                                    'lag_features' : lag,
+                                    'origin' : np.repeat(times[origins], horizon),
+                                    'horizon' : np.tile(steps + 1, len(origins)),
+                                    'prediction' : predictions.ravel(),
+                                    'actual' : actual.ravel(),
+                                    'MAE' : np.abs(errors),
+                                    'MSE' : errors ** 2}))
+
+    return pd.concat(frames, ignore_index = True)
+
+
+def run_backtest(series : dict[str, Readings],
+                 lag_features : list[int],
+                 max_workers : int | None = None,
+                 **kwargs) -> pd.DataFrame:
+
+    '''
+    backtests every measure in series (readings keyed by measure notation) with backtest_series, spreading the
+    measures over a process pool of max_workers processes. max_workers = 1 runs in the current process.
+    '''
+
+    if not series:
+        return pd.DataFrame(columns = METRIC_COLUMNS)
+
+    notations = list(series)
+    series = { notation : Readings(readings.times, readings.values, notation) if readings.measure is None else readings
+               for notation, readings in series.items() }
+
+    if max_workers == 1 or len(notations) == 1:
+        frames = [ backtest_series(series[notation], lag_features, **kwargs) for notation in notations ]
+    else:
+        with ProcessPoolExecutor(max_workers = max_workers) as executor:
+            futures = [ executor.submit(backtest_series, series[notation], lag_features, **kwargs) for notation in notations ]
+            frames = [ future.result() for future in futures ]
+
+    return pd.concat(frames, ignore_index = True)
@@ -0,0 +1,339 @@
+import functools
+import json
+
+import numpy as np
+
+from .station import FloodMonitoringMixin, station
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def to_cartesian(lat, long) -> np.ndarray:
+
+    '''
+    projects latitudes and longitudes (degrees) onto a sphere the size of the earth, as (..., 3) coordinates in km.
+    The straight line (chord) distance between two projected points increases with their great circle distance,
+    so nearest neighbour and radius queries on the projected points are exact.
+    '''
+
+    lat, long = np.radians(lat), np.radians(long)
+
+    return EARTH_RADIUS_KM * np.stack([np.cos(lat) * np.cos(long), np.cos(lat) * np.sin(long), np.sin(lat)], axis = -1)
+
+
+def chord_to_km(chord : np.ndarray) -> np.ndarray:
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / (2 * EARTH_RADIUS_KM), 0, 1))
+
+
+def km_to_chord(distance : float) -> float:
+    return 2 * EARTH_RADIUS_KM * np.sin(min(distance, np.pi * EARTH_RADIUS_KM) / (2 * EARTH_RADIUS_KM))
+
+
+@functools.cache
+def class_filter(station_class : type) -> tuple:
+
+    template = station_class('', lazy = True)
+
+    return (template.parameter or None, tuple(template.qualifier) if template.qualifier else None)
+
+
+class StationCatalogue(FloodMonitoringMixin):
+
+    '''
+    Catalogue of every monitoring station, downloaded with a single id/stations request.
+
+    Positions are stored as arrays and indexed with a KD-tree so nearest, within and bbox queries do not send any
+    requests. The measures of each station are kept as (notation, parameter, qualifier, unit) tuples, which is
+    enough to create typed stations (RiverLevel, TidalLevel, ...) from the catalogue without requesting their
+    metadata or measures.
+
+    Queries can be restricted to stations with a measure of a parameter (level, flow, temperature, ...) or to the
+    stations a station class can be created for (e.g. station_class = RiverLevel).
+
+    Stations without a position are kept in the catalogue but never returned by spatial queries.
+    '''
+
+    def __init__(self, items : list[dict]) -> None:
+
+        '''
+        items are the items of an id/stations response, use download to request them from the API
+        '''
+
+        self.references = np.array([ item['stationReference'] for item in items ], dtype = str)
+        self.labels = np.array([ str(item.get('label', '')) for item in items ], dtype = str)
+
+        positions = np.array([ self.parse_position(item) for item in items ], dtype = np.float64).reshape(-1, 2)
+        self.lats, self.longs = positions[:, 0], positions[:, 1]
+
+        self.measures = [ [ self.parse_measure(measure) for measure in item.get('measures', []) if isinstance(measure, dict) ]
+                          for item in items ]
+
+        self.rows = { reference : idx for idx, reference in enumerate(self.references) }
+
+        self._indexes = {}
+
+    @classmethod
+    def download(cls, parameter : str | None = None, limit : int | None = None) -> 'StationCatalogue':
+
+        '''
+        requests the catalogue from the API, optionally only the stations measuring parameter
+        '''
+
+        params = {}
+
+        if parameter is not None:
+            params['parameter'] = parameter
+
+        if limit is not None:
+            params['_limit'] = limit
+
+        return cls(cls.make_request('id/stations', params)['items'])
+
+    @staticmethod
+    def parse_position(item : dict) -> tuple[float, float]:
+
+        '''
+        position of an id/stations item, a few stations have several positions (the first is used) or none (nan)
+        '''
+
+        position = []
+
+        for orientation in ['lat', 'long']:
+
+            value = item.get(orientation)
+
+            if isinstance(value, list):
+                value = value[0] if value else None
+
+            position.append(np.nan if value is None else float(value))
+
+        return tuple(position)
+
+    @staticmethod
+    def parse_measure(measure : dict) -> tuple[str, str, str, str]:
+
+        ''' (notation, parameter, qualifier, unit) of a measure, the notation is taken from @id when not given '''
+
+        notation = measure.get('notation') or measure.get('@id', '').rsplit('/', 1)[-1]
+
+        return (notation, measure.get('parameter', ''), measure.get('qualifier', ''), measure.get('unitName', ''))
+
+    def __len__(self) -> int:
+        return len(self.references)
+
+    def __contains__(self, reference : str) -> bool:
+        return reference in self.rows
+
+    def row(self, reference : str) -> int:
+
+        if reference not in self.rows:
+            raise Exception('Incorrect Station ID')
+
+        return self.rows[reference]
+
+    def position(self, reference : str) -> tuple[float, float]:
+
+        idx = self.row(reference)
+
+        return (float(self.lats[idx]), float(self.longs[idx]))
+
+    '''
+    filtering by parameter or station class
+    '''
+
+    @staticmethod
+    def station_filter(parameter : str | None = None, station_class : type | None = None) -> tuple:
+
+        '''
+        (parameter, qualifiers) a measure must match, qualifiers is None when any qualifier matches. The
+        parameter and qualifiers of a station class are read from a lazily created instance, which sends no requests.
+        '''
+
+        if station_class is not None:
+            return class_filter(station_class)
+
+        return (parameter, None)
+
+    @staticmethod
+    def matches(measure : tuple, key : tuple) -> bool:
+
+        parameter, qualifiers = key
+
+        return (parameter is None or measure[1] == parameter) and (qualifiers is None or measure[2] in qualifiers)
+
+    def mask(self, parameter : str | None = None, station_class : type | None = None) -> np.ndarray:
+
+        ''' boolean mask of the stations with a measure of parameter, or which station_class can be created for '''
+
+        return self.index(self.station_filter(parameter, station_class))[2]
+
+    def index(self, key : tuple) -> tuple:
+
+        '''
+        (KD-tree, rows, mask) of the positioned stations matching key, built on first use and kept for later queries
+        '''
+
+        if key not in self._indexes:
+
+            from scipy.spatial import cKDTree
+
+            if key == (None, None):
+                mask = np.ones(len(self), dtype = bool)
+            else:
+                mask = np.array([ any(self.matches(measure, key) for measure in measures) for measures in self.measures ], dtype = bool)
+
+            rows = np.flatnonzero(mask & np.isfinite(self.lats) & np.isfinite(self.longs))
+
+            self._indexes[key] = (cKDTree(to_cartesian(self.lats[rows], self.longs[rows])), rows, mask)
+
+        return self._indexes[key]
+
+    '''
+    spatial queries
+    '''
+
+    def nearest(self,
+                lat : float,
+                long : float,
+                n : int = 1,
+                parameter : str | None = None,
+                station_class : type | None = None,
+                return_distance : bool = False) -> list[str] | tuple[list[str], np.ndarray]:
+
+        '''
+        references of the n stations nearest to lat, long (closest first), with their distances in km if
+        return_distance is True
+        '''
+
+        tree, rows, _ = self.index(self.station_filter(parameter, station_class))
+
+        n = min(n, len(rows))
+
+        if n == 0:
+            return ([], np.empty(0)) if return_distance else []
+
+        chords, positions = tree.query(to_cartesian(lat, long), k = [ k + 1 for k in range(n) ])
+
+        references = self.references[rows[positions]].tolist()
+
+        return (references, chord_to_km(chords)) if return_distance else references
+
+    def within(self,
+               lat : float,
+               long : float,
+               radius : float,
+               parameter : str | None = None,
+               station_class : type | None = None,
+               return_distance : bool = False) -> list[str] | tuple[list[str], np.ndarray]:
+
+        '''
+        references of the stations within radius km of lat, long (closest first), with their distances in km if
+        return_distance is True
+        '''
+
+        tree, rows, _ = self.index(self.station_filter(parameter, station_class))
+
+        point = to_cartesian(lat, long)
+        positions = np.array(tree.query_ball_point(point, km_to_chord(radius)), dtype = np.intp)
+
+        distances = chord_to_km(np.linalg.norm(tree.data[positions] - point, axis = 1))
+        order = np.argsort(distances, kind = 'stable')
+
+        references = self.references[rows[positions[order]]].tolist()
+
+        return (references, distances[order]) if return_distance else references
+
+    def bbox(self,
+             min_lat : float,
+             min_long : float,
+             max_lat : float,
+             max_long : float,
+             parameter : str | None = None,
+             station_class : type | None = None) -> list[str]:
+
+        ''' references of the stations inside the bounding box, in catalogue order '''
+
+        _, rows, _ = self.index(self.station_filter(parameter, station_class))
+
+        lats, longs = self.lats[rows], self.longs[rows]
+        inside = (lats >= min_lat) & (lats <= max_lat) & (longs >= min_long) & (longs <= max_long)
+
+        return self.references[rows[inside]].tolist()
+
+    '''
+    creating stations
+    '''
+
+    def station_class(self, reference : str) -> type:
+
+        '''
+        the station class a station is created as when no class is given, the first of RiverLevel, TidalLevel,
+        RiverFlow and Temperature which matches one of its measures
+        '''
+
+        from .river_level import RiverLevel
+        from .tidal_level import TidalLevel
+        from .river_flow import RiverFlow
+        from .temperature import Temperature
+
+        measures = self.measures[self.row(reference)]
+
+        for station_class in [RiverLevel, TidalLevel, RiverFlow, Temperature]:
+            if any(self.matches(measure, self.station_filter(station_class = station_class)) for measure in measures):
+                return station_class
+
+        raise Exception('Incorrect StationID No measurments found relating to the station type')
+
+    def measure_items(self, reference : str) -> list[dict]:
+
+        ''' the measures of a station as id/measures items, without latest readings '''
+
+        return [ {'notation' : notation, 'parameter' : parameter, 'qualifier' : qualifier, 'unitName' : unit}
+                 for notation, parameter, qualifier, unit in self.measures[self.row(reference)] ]
+
+    def create(self, reference : str, station_class : type | None = None) -> station:
+
+        '''
+        creates a station from the catalogue without sending any requests. Latest readings are not part of the
+        catalogue so data and timestamps are None until refreshed, e.g. with get_latest_measurement.
+        '''
+
+        station_class = station_class or self.station_class(reference)
+        lat, long = self.position(reference)
+
+        station_ = station_class(reference, lazy = True)
+
+        station_.apply_metadata([{'lat' : lat, 'long' : long}])
+        station_.apply_measures({'items' : self.measure_items(reference)})
+        station_.mark_hydrated()
+
+        return station_
+
+    def create_many(self, references : list[str], station_class : type | None = None) -> list:
+        return [ self.create(reference, station_class) for reference in references ]
+
+    '''
+    persistence
+    '''
+
+    def to_items(self) -> list[dict]:
+
+        ''' the catalogue as id/stations items, with only the fields the catalogue uses '''
+
+        return [ {'stationReference' : reference, 'label' : label,
+                  'lat' : None if np.isnan(lat) else lat, 'long' : None if np.isnan(long) else long,
+                  'measures' : [ dict(zip(['notation', 'parameter', 'qualifier', 'unitName'], measure)) for measure in measures ]}
+                 for reference, label, lat, long, measures in zip(self.references.tolist(), self.labels.tolist(),
+                                                                  self.lats.tolist(), self.longs.tolist(), self.measures) ]
+
+    def save(self, path : str) -> None:
+
+        with open(path, 'w') as file:
+            json.dump(self.to_items(), file)
+
+    @classmethod
+    def load(cls, path : str) -> 'StationCatalogue':
+
+        with open(path) as file:
+            return cls(json.load(file))
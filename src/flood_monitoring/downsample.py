@@ -0,0 +1,112 @@
+import numpy as np
+
+
+'''
+Downsampling of long series before they are plotted. A figure can only show about one value per pixel column, so
+plotting a year of 15 minute readings (35040 points) on a 640 pixel wide axis draws the same picture as a few
+hundred carefully chosen points, far more slowly. Both methods return the indices of the points to keep, in order.
+'''
+
+METHODS = ('minmax', 'lttb')
+
+
+def min_max_indices(values : np.ndarray, n_buckets : int) -> np.ndarray:
+
+    '''
+    splits the values into n_buckets buckets of consecutive points and keeps the lowest and highest point of each
+    bucket, along with the first and last points. Every peak and trough is kept exactly, so flood peaks remain
+    visible. Buckets without any values keep a NaN point, so gaps in the series still break the plotted line.
+    '''
+
+    n_values = len(values)
+
+    if n_buckets < 1 or n_values <= 2 * n_buckets + 2:
+        return np.arange(n_values)
+
+    size = -(-n_values // n_buckets)
+    n_buckets = -(-n_values // size)
+
+    rows = np.full(n_buckets * size, np.nan)
+    rows[:n_values] = values
+    rows = rows.reshape(n_buckets, size)
+
+    missing = np.isnan(rows)
+
+    offsets = np.arange(n_buckets) * size
+    lows = offsets + np.argmin(np.where(missing, np.inf, rows), axis = 1)
+    highs = offsets + np.argmax(np.where(missing, -np.inf, rows), axis = 1)
+
+    return np.unique(np.concatenate([[0, n_values - 1], lows, highs]))
+
+
+def lttb_indices(x : np.ndarray, values : np.ndarray, n_out : int) -> np.ndarray:
+
+    '''
+    Largest Triangle Three Buckets: keeps the first and last points and one point from each of n_out - 2 buckets,
+    the point forming the largest triangle with the point kept from the previous bucket and the mean of the next
+    bucket. The result follows the shape of the series closely with a fixed number of points, but unlike
+    min_max_indices a peak is not guaranteed to be kept. The bucket means are computed in one vectorised pass, the
+    selection visits each bucket once as it depends on the point kept before it.
+    '''
+
+    n_values = len(values)
+
+    if n_out < 3 or n_values <= n_out:
+        return np.arange(n_values)
+
+    x = np.asarray(x, dtype = np.float64)
+    y = np.asarray(values, dtype = np.float64)
+
+    ''' bucket edges between the first and last points, and the mean position of every bucket ignoring NaN values '''
+    edges = np.linspace(1, n_values - 1, n_out - 1).astype(np.intp)
+
+    finite = ~np.isnan(y)
+    counts = np.add.reduceat(finite, edges[:-1])
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        mean_x = np.add.reduceat(np.where(finite, x, 0.0), edges[:-1]) / counts
+        mean_y = np.add.reduceat(np.where(finite, y, 0.0), edges[:-1]) / counts
+
+    ''' the next bucket of the last bucket is the last point '''
+    mean_x = np.append(mean_x[1:], x[-1])
+    mean_y = np.append(mean_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype = np.intp)
+    selected[0], selected[-1] = 0, n_values - 1
+
+    previous = 0
+
+    for bucket in range(n_out - 2):
+
+        start, end = edges[bucket], edges[bucket + 1]
+
+        areas = np.abs((x[previous] - mean_x[bucket]) * (y[start:end] - y[previous]) -
+                       (x[previous] - x[start:end]) * (mean_y[bucket] - y[previous]))
+
+        previous = start + int(np.argmax(np.nan_to_num(areas, nan = -1.0)))
+        selected[bucket + 1] = previous
+
+    return selected
+
+
+def downsample(times : np.ndarray,
+               values : np.ndarray,
+               n_points : int,
+               method : str = 'minmax') -> tuple[np.ndarray, np.ndarray]:
+
+    '''
+    reduces a series to about n_points points with method (minmax or lttb), series which are already short enough
+    are returned unchanged. times must be sorted.
+    '''
+
+    if method not in METHODS:
+        raise Exception(f'Unknown downsampling method {method}, use one of {", ".join(METHODS)}')
+
+    times, values = np.asarray(times), np.asarray(values, dtype = np.float64)
+
+    if method == 'minmax':
+        indices = min_max_indices(values, n_points // 2)
+    else:
+        seconds = (times - times[0]) / np.timedelta64(1, 's') if len(times) else times
+        indices = lttb_indices(seconds, values, n_points)
+
+    return times[indices], values[indices]
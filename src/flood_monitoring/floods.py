@@ -0,0 +1,477 @@
+import threading
+import time
+
+import numpy as np
+
+from .station import FloodMonitoringMixin
+from .catalogue import EARTH_RADIUS_KM, km_to_chord, to_cartesian
+
+
+KM_PER_DEGREE = EARTH_RADIUS_KM * np.pi / 180
+
+''' largest number of position and polygon edge pairs compared at once '''
+CHUNK_SIZE = 2 ** 16
+
+
+def parse_polygon(geojson : dict) -> list[np.ndarray]:
+
+    '''
+    rings of a GeoJSON Polygon or MultiPolygon, or of a Feature or FeatureCollection of them (as returned by
+    id/floodAreas/{notation}/polygon), as (n, 2) arrays of (lat, long). GeoJSON positions are (long, lat).
+    '''
+
+    if geojson.get('type') == 'FeatureCollection':
+        return [ ring for feature in geojson['features'] for ring in parse_polygon(feature) ]
+
+    if geojson.get('type') == 'Feature':
+        return parse_polygon(geojson['geometry'])
+
+    if geojson.get('type') == 'Polygon':
+        polygons = [geojson['coordinates']]
+    elif geojson.get('type') == 'MultiPolygon':
+        polygons = geojson['coordinates']
+    else:
+        raise Exception(f'Unsupported geometry {geojson.get("type")}')
+
+    return [ np.asarray(ring, dtype = np.float64)[:, [1, 0]] for polygon in polygons for ring in polygon if len(ring) ]
+
+
+def polygon_bounds(rings : list[np.ndarray]) -> np.ndarray:
+
+    ''' (min lat, max lat, min long, max long) of the rings '''
+
+    points = np.concatenate(rings)
+
+    (min_lat, min_long), (max_lat, max_long) = points.min(axis = 0), points.max(axis = 0)
+
+    return np.array([min_lat, max_lat, min_long, max_long])
+
+
+class PolygonIndex:
+
+    '''
+    Spatial index of polygons, answering which positions are within a distance of any of them.
+
+    The centres of the polygons' bounding boxes are indexed with a KD-tree. A position is only compared with the
+    polygons whose box centre is within the largest half diagonal of the boxes plus the distance of it, and whose
+    box expanded by the distance contains it. The candidate pairs of positions and polygons are then measured against the
+    polygons' edges in one vectorised pass.
+
+    Distances are measured in a flat projection centred on each polygon, accurate to well under 1% over the few km
+    flood areas and the distances used to query them span. Positions inside an odd number of a polygon's rings are
+    inside it, so holes and the parts of a MultiPolygon are handled alike. A ring of a single point measures the
+    distance to that point.
+
+    Inputs:
+
+        polygons [list] - rings of each polygon as returned by parse_polygon
+    '''
+
+    def __init__(self, polygons : list[list[np.ndarray]]) -> None:
+
+        from scipy.spatial import cKDTree
+
+        self.n_polygons = len(polygons)
+        self.bounds = np.array([ polygon_bounds(rings) for rings in polygons ], dtype = np.float64).reshape(-1, 4)
+
+        ''' the KD-tree holds the centres of the bounding boxes on the sphere, see catalogue.to_cartesian '''
+        centre_lats, centre_longs = self.bounds[:, :2].mean(axis = 1), self.bounds[:, 2:].mean(axis = 1)
+        centres = to_cartesian(centre_lats, centre_longs).reshape(-1, 3)
+
+        corners = to_cartesian(self.bounds[:, [0, 0, 1, 1]], self.bounds[:, [2, 3, 2, 3]]).reshape(-1, 4, 3)
+        self.radius = float(np.linalg.norm(corners - centres[:, None], axis = -1).max(initial = 0.0))
+
+        self.tree = cKDTree(centres)
+
+        ''' edges of every ring in km, from each vertex to the next, grouped by polygon '''
+        points = [ np.concatenate(rings) for rings in polygons ]
+        counts = np.array([ len(points_) for points_ in points ], dtype = np.intp)
+
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.scales = np.array([ np.cos(np.radians(points_[:, 0].mean())) for points_ in points ])
+
+        starts = np.concatenate(points) if points else np.empty((0, 2))
+        ends = np.concatenate([ np.roll(ring, -1, axis = 0) for rings in polygons for ring in rings ]) if points else np.empty((0, 2))
+        scales = np.repeat(self.scales, counts)
+
+        self.ay, self.ax = starts[:, 0] * KM_PER_DEGREE, starts[:, 1] * KM_PER_DEGREE * scales
+        self.dy, self.dx = (ends[:, 0] - starts[:, 0]) * KM_PER_DEGREE, (ends[:, 1] - starts[:, 1]) * KM_PER_DEGREE * scales
+
+        ''' edges of zero length (rings of one point) have t = 0, horizontal edges are never crossed by the ray '''
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            lengths = self.dx ** 2 + self.dy ** 2
+            self.inverse_lengths = np.where(lengths > 0, 1 / lengths, 0.0)
+            self.slopes = np.where(self.dy != 0, self.dx / self.dy, 0.0)
+
+    def candidates(self, lats : np.ndarray, longs : np.ndarray, dist : float) -> tuple[np.ndarray, np.ndarray]:
+
+        ''' (positions, polygons) index pairs of every position and polygon whose box expanded by dist contains it '''
+
+        if self.n_polygons == 0 or len(lats) == 0:
+            return np.empty(0, dtype = np.intp), np.empty(0, dtype = np.intp)
+
+        from scipy.spatial import cKDTree
+
+        ''' the positions are indexed too so the pairs are found in one pass over both trees, without a list per position '''
+        points = cKDTree(to_cartesian(lats, longs), balanced_tree = False, compact_nodes = False)
+        pairs = self.tree.sparse_distance_matrix(points, self.radius + km_to_chord(dist), output_type = 'ndarray')
+
+        positions, polygons = pairs['j'].astype(np.intp), pairs['i'].astype(np.intp)
+
+        min_lat, max_lat, min_long, max_long = self.bounds[polygons].T
+
+        dlat = dist / KM_PER_DEGREE
+        dlong = dlat / np.maximum(np.cos(np.radians(np.maximum(np.abs(min_lat), np.abs(max_lat)) + dlat)), 1e-6)
+
+        lats, longs = lats[positions], longs[positions]
+        keep = (lats >= min_lat - dlat) & (lats <= max_lat + dlat) & (longs >= min_long - dlong) & (longs <= max_long + dlong)
+
+        return positions[keep], polygons[keep]
+
+    def distances(self, lats : np.ndarray, longs : np.ndarray, positions : np.ndarray, polygons : np.ndarray) -> np.ndarray:
+
+        ''' distance in km from lats[positions] to polygons, 0 inside them, for every pair at once '''
+
+        counts = self.offsets[polygons + 1] - self.offsets[polygons]
+        ends = np.cumsum(counts)
+
+        distances = np.empty(len(positions))
+        start = 0
+
+        ''' pairs are measured in chunks of about CHUNK_SIZE edges to bound the memory used '''
+        while start < len(positions):
+
+            done = ends[start - 1] if start else 0
+            stop = max(int(np.searchsorted(ends, done + CHUNK_SIZE, side = 'right')), start + 1)
+
+            counts_ = counts[start:stop]
+            firsts = np.cumsum(counts_) - counts_
+
+            pair = np.repeat(np.arange(stop - start), counts_)
+            edge = np.repeat(self.offsets[polygons[start:stop]] - firsts, counts_) + np.arange(int(counts_.sum()))
+
+            ''' positions projected once per pair, then compared with each edge of the pair's polygon '''
+            py = lats[positions[start:stop]] * KM_PER_DEGREE
+            px = longs[positions[start:stop]] * KM_PER_DEGREE * self.scales[polygons[start:stop]]
+
+            y = py[pair] - self.ay[edge]
+            x = px[pair] - self.ax[edge]
+            dy, dx = self.dy[edge], self.dx[edge]
+
+            ''' crossings of a ray from each position towards increasing longitude '''
+            crossings = ((y < 0) != (y < dy)) & (x < self.slopes[edge] * y)
+
+            ''' squared distance to the nearest point of each edge '''
+            t = np.clip((x * dx + y * dy) * self.inverse_lengths[edge], 0, 1)
+            x -= t * dx
+            y -= t * dy
+
+            inside = np.add.reduceat(crossings, firsts) % 2 == 1
+            nearest = np.sqrt(np.minimum.reduceat(x * x + y * y, firsts))
+
+            distances[start:stop] = np.where(inside, 0.0, nearest)
+            start = stop
+
+        return distances
+
+    def within(self, lats, longs, dist : float) -> np.ndarray:
+
+        ''' boolean array, True where a position is within dist km of any polygon '''
+
+        lats, longs = np.broadcast_arrays(np.asarray(lats, dtype = np.float64), np.asarray(longs, dtype = np.float64))
+        flat_lats, flat_longs = lats.ravel(), longs.ravel()
+
+        positions, polygons = self.candidates(flat_lats, flat_longs, dist)
+        near = self.distances(flat_lats, flat_longs, positions, polygons) <= dist
+
+        status = np.zeros(flat_lats.shape, dtype = bool)
+        status[positions[near]] = True
+
+        return status.reshape(lats.shape)
+
+    def near(self, lat : float, long : float, dist : float) -> list[int]:
+
+        ''' indices of the polygons within dist km of a position '''
+
+        lats, longs = np.array([lat], dtype = np.float64), np.array([long], dtype = np.float64)
+
+        positions, polygons = self.candidates(lats, longs, dist)
+
+        return sorted(polygons[self.distances(lats, longs, positions, polygons) <= dist].tolist())
+
+
+def distance_to_polygon(lats, longs, rings : list[np.ndarray]) -> np.ndarray:
+
+    ''' distance in km from each position to a polygon given by its rings, 0 for positions inside it '''
+
+    lats, longs = np.asarray(lats, dtype = np.float64).ravel(), np.asarray(longs, dtype = np.float64).ravel()
+
+    return PolygonIndex([rings]).distances(lats, longs, np.arange(len(lats)), np.zeros(len(lats), dtype = np.intp))
+
+
+class FloodStatus(FloodMonitoringMixin):
+
+    '''
+    Evaluates the flood status of any number of positions from one download of the floods currently in force.
+
+    The flood areas (and their centres) are requested once with id/floodAreas, each refresh requests the list of
+    floods with id/floods. The polygon of each flooded area is requested with id/floodAreas/{notation}/polygon the
+    first time it is flooded and kept. A position is in flood if it is within dist km of the polygon of a flood area
+    with a flood of at least min_severity. The flooded polygons are indexed spatially on each refresh (see
+    PolygonIndex), so each position is only measured against the edges of the flooded areas near it.
+
+    This answers the same question as the id/floods query RiverLevel stations send individually, but it is
+    evaluated locally and the API does not document how it measures the distance to a flood area, so the answers of
+    the two can differ for positions about dist km from the edge of an area. Flooded areas without a polygon (the
+    request failed, the error is kept in errors) are measured from their centre instead, which misses positions
+    inside large areas.
+
+    The flood list is refreshed every refresh_interval seconds, either on the first query after it has expired or
+    by a background thread started with start. Once installed with set_flood_status RiverLevel stations read their
+    in_flood status from it rather than sending a request each.
+
+    Inputs:
+
+        dist [float]             - distance in km within which a flood area counts, 1km as RiverLevel.flood_query
+        min_severity [int]       - least severe level counted (1 severe flood warning, 2 flood warning, 3 flood alert)
+        refresh_interval [float] - seconds the flood list is kept before it is requested again
+        area_limit [int]         - maximum number of flood areas requested
+        clock [callable]         - function returning the current time (seconds since the epoch)
+    '''
+
+    def __init__(self,
+                 dist : float = 1,
+                 min_severity : int = 1,
+                 refresh_interval : float = 15 * 60,
+                 area_limit : int = 10000,
+                 clock = time.time) -> None:
+
+        self.dist = dist
+        self.min_severity = min_severity
+        self.refresh_interval = refresh_interval
+        self.area_limit = area_limit
+        self.clock = clock
+
+        ''' centres of flood areas keyed by notation, requested once, and polygons of flooded areas as they are needed '''
+        self.areas = None
+        self.polygons = {}
+        self.errors = {}
+
+        ''' (notations of the flooded areas, PolygonIndex of their polygons), replaced as a whole on refresh '''
+        self._index = None
+        self.floods = []
+        self.refreshed_at = None
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    '''
+    flood areas and floods
+    '''
+
+    @staticmethod
+    def area_position(area : dict) -> tuple[float, float] | None:
+
+        lat, long = area.get('lat'), area.get('long')
+
+        return None if lat is None or long is None else (float(lat), float(long))
+
+    def load_areas(self) -> None:
+
+        ''' requests the positions of every flood area '''
+
+        response = self.make_request('id/floodAreas', {'_limit' : self.area_limit})
+
+        self.areas = { area['notation'] : self.area_position(area) for area in response['items'] }
+
+    def load_missing_areas(self, notations : list[str]) -> None:
+
+        '''
+        requests flood areas which were not part of the flood area list individually, areas which cannot be
+        requested are stored in errors and left out of the index
+        '''
+
+        def load_area(notation):
+
+            items = self.make_request(f'id/floodAreas/{notation}')['items']
+
+            return self.area_position(items[0] if isinstance(items, list) else items)
+
+        positions, errors = self.map_concurrently(load_area, notations, max_workers = 8)
+
+        self.areas.update(zip(notations, positions))
+        self.errors.update({ notations[idx] : error for idx, error in errors.items() })
+
+    def load_polygons(self, notations : list[str]) -> None:
+
+        '''
+        requests the polygons of flood areas, polygons which cannot be requested are stored in errors and the area
+        is measured from its centre instead
+        '''
+
+        def load_polygon(notation):
+            return parse_polygon(self.make_request(f'id/floodAreas/{notation}/polygon'))
+
+        polygons, errors = self.map_concurrently(load_polygon, notations, max_workers = 8)
+
+        for notation, rings in zip(notations, polygons):
+            if rings:
+                self.polygons[notation] = rings
+                self.errors.pop(notation, None)
+
+        self.errors.update({ notations[idx] : error for idx, error in errors.items() })
+
+    def area_rings(self, notation : str) -> list[np.ndarray] | None:
+
+        ''' rings of a flood area's polygon, its centre as a ring of one point if the polygon is missing '''
+
+        if notation in self.polygons:
+            return self.polygons[notation]
+
+        position = self.areas.get(notation)
+
+        return None if position is None else [np.array([position], dtype = np.float64)]
+
+    def refresh(self) -> None:
+
+        ''' requests the floods currently in force and rebuilds the index of flooded areas '''
+
+        if self.areas is None:
+            self.load_areas()
+
+        floods = self.make_request('id/floods', {'min-severity' : self.min_severity})['items']
+
+        ''' severities are filtered again in case the filter was not applied to the response '''
+        floods = [ flood for flood in floods if flood.get('severityLevel', self.min_severity) <= self.min_severity ]
+
+        flooded = sorted({ flood['floodAreaID'] for flood in floods if 'floodAreaID' in flood })
+
+        missing = [ notation for notation in flooded if notation not in self.areas ]
+        if missing:
+            self.load_missing_areas(missing)
+
+        ''' polygons are only requested again if the previous request failed '''
+        missing = [ notation for notation in flooded if notation not in self.polygons ]
+        if missing:
+            self.load_polygons(missing)
+
+        flooded = [ notation for notation in flooded if self.area_rings(notation) is not None ]
+
+        index = (flooded, PolygonIndex([ self.area_rings(notation) for notation in flooded ]))
+
+        with self._lock:
+            self._index = index
+            self.floods = floods
+            self.refreshed_at = self.clock()
+
+    @property
+    def stale(self) -> bool:
+        return self.refreshed_at is None or self.clock() - self.refreshed_at >= self.refresh_interval
+
+    def index(self) -> tuple:
+
+        if self.stale:
+
+            ''' stations hydrated concurrently all find the flood list stale, only one of them refreshes it '''
+            with self._refresh_lock:
+                if self.stale:
+                    self.refresh()
+
+        with self._lock:
+            return self._index
+
+    '''
+    queries
+    '''
+
+    def status(self, lats, longs) -> np.ndarray:
+
+        ''' boolean array, True where a position is within dist km of a flooded area '''
+
+        _, polygons = self.index()
+
+        return polygons.within(lats, longs, self.dist)
+
+    def in_flood(self, lat : float, long : float) -> bool:
+        return bool(self.status(lat, long))
+
+    def flooded_areas(self, lat : float, long : float) -> list[str]:
+
+        ''' notations of the flooded areas within dist km of a position '''
+
+        flooded, polygons = self.index()
+
+        return [ flooded[idx] for idx in polygons.near(lat, long, self.dist) ]
+
+    def in_flood_many(self, stations : list) -> dict[str, bool]:
+
+        ''' flood status of many stations keyed by station_id, lazily created stations are hydrated first '''
+
+        lats = [ station_.latitude for station_ in stations ]
+        longs = [ station_.longitude for station_ in stations ]
+
+        return dict(zip([ station_.station_id for station_ in stations ], self.status(lats, longs).tolist()))
+
+    '''
+    refreshing in the background
+    '''
+
+    def run(self) -> None:
+
+        ''' refreshes the flood list every refresh_interval seconds until stop is called '''
+
+        self._stop.clear()
+        self.refresh_loop()
+
+    def refresh_loop(self) -> None:
+
+        while not self._stop.is_set():
+
+            try:
+                with self._refresh_lock:
+                    self.refresh()
+                self.errors.pop('refresh', None)
+            except Exception as error:
+                self.errors['refresh'] = error
+
+            self._stop.wait(self.refresh_interval)
+
+    def start(self) -> 'FloodStatus':
+
+        ''' starts refreshing in a background thread '''
+
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target = self.refresh_loop, daemon = True)
+            self._thread.start()
+
+        return self
+
+    def stop(self) -> None:
+
+        self._stop.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+'''
+flood status used by RiverLevel stations, None (the default) means each station requests its own flood status
+'''
+
+_flood_status = None
+
+
+def get_flood_status() -> FloodStatus | None:
+    return _flood_status
+
+
+def set_flood_status(flood_status : FloodStatus | None) -> None:
+
+    ''' sets the flood status RiverLevel stations read in_flood from, passing None restores per station requests '''
+
+    global _flood_status
+    _flood_status = flood_status
@@ -1,40 +1,74 @@
 from .station import FloodMonitoringMixin
-import pandas as pd 
+from .timestamps import parse_timestamps
+from .readings import Readings
+from .instrumentation import timed
 from io import StringIO
 
 import datetime 
+from dataclasses import dataclass 
+from typing import TYPE_CHECKING 
 
 import numpy as np 
+from numpy.lib.stride_tricks import sliding_window_view
 
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_absolute_error, mean_squared_error
+'''
+pandas, scikit-learn and matplotlib are imported by the methods which use them, so importing the package (and
+forecasting with fit_many and predict) does not pay for loading them
+'''
+if TYPE_CHECKING: 
+    import pandas as pd 
+    from matplotlib.figure import Figure 
+    from matplotlib.axes import Axes 
 
-from matplotlib.figure import Figure 
-from matplotlib.axes import Axes 
 
+class Forecast(FloodMonitoringMixin):
 
-import matplotlib.pyplot as plt 
+    @dataclass
+    class coefficients_dclass:
 
-class Forecast(FloodMonitoringMixin):
+        '''
+        dataclass storing the fitted coefficients of the linear model of a single measure, coefficients are
+        ordered as the columns of the lag matrix (lag_1 first)
+        '''
+        coefficients : np.ndarray
+        intercept : float
+        lag_features : int
+        n_samples : int
+        start : str | None = None
+        end : str | None = None
+        fingerprint : str | None = None
 
     def __init__(self):
 
         '''
-        Forecast station requires no initialisation
+        Forecast station requires no initialisation, models fitted with fit_many are stored in coefficients
+        keyed by measure notation
         '''
-        pass 
+        self.coefficients = {} 
 
     def load_data(self,
             measure_notation : str, 
-            date_range : list| None = None ) -> pd.DataFrame: 
+            date_range : list| None = None, 
+            window_days : int | None = None, 
+            max_workers : int | None = None ) -> 'pd.DataFrame': 
         
         '''method which utilises get_readings method to transform the readings for the measure specified
-        into a dataframe using stringIO '''
-
-        readings = self.get_readings(measure_notation = measure_notation, 
-                                     date_range = date_range, 
-                                     csv = True ) 
+        into a dataframe using stringIO. If window_days is given the date range is requested in windows of
+        window_days days, up to max_workers at a time, which is much faster for long date ranges (see get_readings_windowed) '''
+
+        if window_days: 
+            readings = self.get_readings_windowed(measure_notation = measure_notation, 
+                                                  date_range = date_range, 
+                                                  window_days = window_days, 
+                                                  max_workers = max_workers, 
+                                                  csv = True ) 
+        else: 
+            readings = self.get_readings(measure_notation = measure_notation, 
+                                         date_range = date_range, 
+                                         csv = True ) 
         
+        import pandas as pd 
+
         readings = StringIO(readings)
         readings = pd.read_csv(readings) 
 
@@ -42,16 +76,68 @@ class Forecast(FloodMonitoringMixin):
     
 
     @staticmethod
-    def transform_data(dataframe : pd.DataFrame,
+    def lag_matrix(values : np.ndarray,
+                   lag_features : int) -> tuple[np.ndarray, np.ndarray]:
+
+        '''
+        builds the lag feature matrix of a series of values in time order without copying it. Row k of X holds
+        lag_1 .. lag_n of values[k + lag_features], i.e. X[k, i] = values[k + lag_features - 1 - i], and y is
+        values[lag_features:]. Both are strided views of values, so the memory used does not grow with lag_features.
+        '''
+
+        values = np.asarray(values)
+
+        if lag_features == 0:
+            return values[:, None][:, :0], values
+
+        ''' series no longer than lag_features have no complete row of lags '''
+        if len(values) <= lag_features:
+            return np.empty((0, lag_features), dtype = values.dtype), values[:0]
+
+        windows = sliding_window_view(values, lag_features + 1)
+
+        return windows[:, lag_features - 1::-1], windows[:, lag_features]
+
+    def load_readings(self,
+                      measure_notations : list[str],
+                      date_range : list | None = None,
+                      window_days : int | None = None) -> dict[str, Readings]:
+
+        '''
+        downloads the readings of several measures concurrently as Readings keyed by measure notation, long date ranges
+        can be requested in windows of window_days days (see get_readings_windowed). The first error raised is re-raised.
+        '''
+
+        date_range = self.validate_date_range(date_range)
+
+        def download(notation):
+            if window_days:
+                return Readings.from_csv(self.get_readings_windowed(notation, date_range, window_days = window_days, csv = True), notation)
+            return self.get_readings(notation, date_range, as_readings = True)
+
+        results, errors = self.map_concurrently(download, measure_notations, self.max_workers)
+
+        if errors:
+            raise errors[min(errors)]
+
+        return dict(zip(measure_notations, results))
+
+    @staticmethod
+    @timed('transform')
+    def transform_data(dataframe : 'pd.DataFrame',
                         lag_features : int,
                         evaluation_split : bool = False, 
                         split_date : str | None  = None, 
-                        split_size : int  = 5   ) -> tuple: 
+                        split_size : int  = 5, 
+                        dtype = np.float64 ) -> tuple: 
         
         '''
         Transforms the dataframe which stores the measure readings into training/testing arrays which are then
         used to fit our Linear Regression model to. 
 
+        The lag features are built as a strided view over the values (see lag_matrix) and the train/test split is
+        done by slicing, so no copy of the data is made per lag feature. Rows are returned latest first.
+
         Inputs: 
 
             dataframe [pd.DataFrame] - DataFrame storing the readings retrieved from load_data
@@ -60,6 +146,7 @@ class Forecast(FloodMonitoringMixin):
             split_date [str]         - Optional parameter if evaluation_split is True, split_date defines point where the train/test datasets are split
             split_size [int]         - if evaluation_split is True, split_size defines how many of the last n values should be placed in the test set . 
                                        An alternative to split_date which allows you to create a test split of a particular size. 
+            dtype [np.dtype]         - dtype of the returned arrays, np.float32 halves the memory used for long series
 
         Output: 
 
@@ -77,21 +164,28 @@ class Forecast(FloodMonitoringMixin):
                 test_timestamps [np.ndarray] -  array storing the timestamps of the values in test_y 
 
         '''
-        
-        #taking a copy of our dataframe so we arent transforming the original date
-        dataframe = dataframe.loc[:, : ]
 
-        dataframe['dateTime64'] = pd.to_datetime(dataframe.dateTime) 
-        dataframe.drop(['measure'], inplace = True, axis = 'columns' ) 
+        values = dataframe['value'].to_numpy(dtype = dtype) 
+        timestamps = dataframe['dateTime'].to_numpy() 
+        times = parse_timestamps(timestamps) 
 
-        X_columns =  [] 
-        for i in range(1, lag_features + 1 ): 
-            dataframe[f'lag_{i}'] = dataframe.value.shift(i) 
-            X_columns.append(f'lag_{i}' ) 
+        ''' lags are taken in the order the readings were given, as with shifting the value column '''
+        X, y = Forecast.lag_matrix(values, lag_features) 
+        times = times[lag_features: ] 
+        timestamps = timestamps[lag_features: ] 
 
-        dataframe.dropna(inplace = True ) 
-        dataframe.sort_values('dateTime', ascending = False , inplace = True ) 
+        ''' dropping rows with a missing value or lag, boolean indexing copies so it is only done when needed '''
+        valid = ~(np.isnan(y) | np.isnan(X).any(axis = 1) | np.isnat(times)) 
 
+        if not valid.all(): 
+            X, y, times, timestamps = X[valid], y[valid], times[valid], timestamps[valid] 
+
+        ''' ordering the rows latest first, readings from the API are in time order so this is usually a reversed view '''
+        if len(times) > 1 and not (times[1: ] > times[:-1]).all(): 
+            order = np.argsort(times, kind = 'stable') 
+            X, y, times, timestamps = X[order], y[order], times[order], timestamps[order] 
+
+        X, y, times, timestamps = X[::-1], y[::-1], times[::-1], timestamps[::-1] 
 
         if evaluation_split: 
 
@@ -101,20 +195,22 @@ class Forecast(FloodMonitoringMixin):
             using split_size with a value of 5. 
             '''
 
-            train_readings  = dataframe[:-split_size] 
-            test_readings = dataframe[-split_size: ] 
+            train = slice(None, -split_size) 
+            test = slice(-split_size, None) 
 
             if split_date: 
-                split_date = pd.Timestamp(split_date, tz = 'UTC') 
-                train_readings = dataframe[dataframe.dateTime64 < split_date ] 
-                test_readings = dataframe[dataframe.dateTime64 > split_date ]
+                ''' times are descending so each side of the split date is a contiguous slice '''
+                import pandas as pd 
 
-            train_y = train_readings['value'].values 
-            test_y = test_readings['value'].values 
+                split_date = pd.Timestamp(split_date, tz = 'UTC').tz_localize(None).to_datetime64() 
+                ascending = times[::-1] 
+                train = slice(len(times) - np.searchsorted(ascending, split_date, side = 'left'), None) 
+                test = slice(None, len(times) - np.searchsorted(ascending, split_date, side = 'right')) 
 
-            test_timestamps = test_readings['dateTime'].values 
+            train_x, train_y = X[train], y[train] 
+            test_y = y[test] 
 
-            train_x = train_readings[X_columns ].values 
+            test_timestamps = timestamps[test] 
 
             test_x = np.concatenate(( train_x[0, 1:  ],  [train_y[0 ] ]), axis = -1 ) 
             return train_x, train_y, test_x, test_y , test_timestamps
@@ -122,12 +218,10 @@ class Forecast(FloodMonitoringMixin):
         '''
         if evaluation split is False then simply the feature matrix and target array will be returned. 
         '''
-            
-        X = dataframe[X_columns ].values 
-        y = dataframe['value'].values 
 
         return X, y 
 
+    @timed('fit')
     def fit(self, 
             X : np.ndarray,
             y : np.ndarray) -> None: 
@@ -136,31 +230,230 @@ class Forecast(FloodMonitoringMixin):
         instantiates a linerRegression model and fits to the data. 
         '''
         
+        from sklearn.linear_model import LinearRegression
+
         self.model = LinearRegression() 
 
         self.model.fit(X, y )
     
+    @staticmethod
+    def recursive_forecast(coefficients : np.ndarray,
+                           intercept : float | np.ndarray,
+                           x_last : np.ndarray,
+                           n_predictions : int) -> np.ndarray:
+
+        '''
+        Autoregressively forecasts n_predictions steps for a batch of starting states using the coefficients of a
+        linear model directly. The states and predictions share one preallocated buffer, each step is a single
+        vectorised dot product over the batch written into the next column, so nothing is reallocated per step.
+
+        Inputs:
+
+            coefficients [np.ndarray] - coefficients of the model, shape (lag,) shared by every state or (batch, lag), one row per state
+            intercept [float]         - intercept of the model, a scalar or one per state
+            x_last [np.ndarray]       - starting states, shape (lag,) or (batch, lag), in the same order as the model's features
+            n_predictions [int]       - number of steps to forecast
+
+        Output:
+
+            predictions [np.ndarray] - shape (n_predictions,) for a single state or (batch, n_predictions)
+        '''
+
+        x_last = np.asarray(x_last)
+        coefficients = np.asarray(coefficients)
+        intercept = np.asarray(intercept)
+
+        states = np.atleast_2d(x_last)
+        batch_size, lag = states.shape
+
+        dtype = np.result_type(states, coefficients, intercept, np.float32)
+
+        buffer = np.empty((batch_size, lag + n_predictions), dtype = dtype)
+        buffer[:, :lag] = states
+
+        for step in range(n_predictions):
+
+            window = buffer[:, step : step + lag]
+
+            if coefficients.ndim == 1:
+                buffer[:, lag + step] = window @ coefficients + intercept
+            else:
+                buffer[:, lag + step] = np.einsum('ij,ij->i', window, coefficients) + intercept
+
+        predictions = buffer[:, lag: ]
+
+        return predictions[0] if x_last.ndim == 1 else predictions
+
+    @staticmethod
+    def solve_least_squares(X : list[np.ndarray],
+                            y : list[np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+
+        '''
+        fits a linear model with an intercept to each (X, y) pair, where every X has the same number of columns.
+        Each series is centred and reduced to its normal equations, then every system is solved with a single
+        batched np.linalg.solve call. Singular systems (e.g. a constant series) fall back to the pseudo inverse,
+        which gives the same minimum norm solution as LinearRegression.
+
+        Output:
+
+            coefficients [np.ndarray] - shape (n_series, n_features)
+            intercepts [np.ndarray]   - shape (n_series,)
+        '''
+
+        n_features = X[0].shape[1]
+
+        gram = np.empty((len(X), n_features, n_features))
+        moments = np.empty((len(X), n_features))
+        x_means = np.empty((len(X), n_features))
+        y_means = np.empty(len(X))
+
+        for idx, (features, target) in enumerate(zip(X, y)):
+
+            x_means[idx] = features.mean(axis = 0, dtype = np.float64)
+            y_means[idx] = target.mean(dtype = np.float64)
+
+            centred = features - x_means[idx]
+
+            gram[idx] = centred.T @ centred
+            moments[idx] = centred.T @ (target - y_means[idx])
+
+        try:
+            coefficients = np.linalg.solve(gram, moments[..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            coefficients = (np.linalg.pinv(gram) @ moments[..., None])[..., 0]
+
+        intercepts = y_means - np.einsum('ij,ij->i', x_means, coefficients)
+
+        return coefficients, intercepts
+
+    @timed('fit')
+    def fit_many(self,
+                 data : dict[str, tuple[np.ndarray, np.ndarray]]) -> dict:
+
+        '''
+        fits a linear model for each of many measures at once and stores the coefficients in self.coefficients
+        keyed by measure notation. Measures are grouped by their number of lag features and each group is solved
+        in one vectorised call (see solve_least_squares).
+
+        Inputs:
+
+            data [dict] - (X, y) arrays returned by transform_data keyed by measure notation
+
+        Output:
+
+            coefficients [dict] - coefficients_dclass objects of the fitted measures keyed by measure notation
+        '''
+
+        groups = {} 
+        for notation, (X, y) in data.items(): 
+
+            if len(y) == 0: 
+                raise Exception(f'No training data for measure {notation}') 
+
+            groups.setdefault(X.shape[1], []).append(notation) 
+
+        fitted = {} 
+        for lag_features, notations in groups.items(): 
+
+            coefficients, intercepts = self.solve_least_squares([ data[notation][0] for notation in notations ],
+                                                                [ data[notation][1] for notation in notations ])
+
+            for notation, coefficient, intercept in zip(notations, coefficients, intercepts): 
+                fitted[notation] = self.coefficients_dclass(coefficients = coefficient,
+                                                            intercept = float(intercept),
+                                                            lag_features = lag_features,
+                                                            n_samples = len(data[notation][1]))
+
+        self.coefficients.update(fitted) 
+
+        return fitted 
+
+    def fit_measures(self,
+                     measure_notations : list[str],
+                     date_range : list | None = None,
+                     lag_features : int = 3,
+                     registry = None,
+                     max_age : datetime.timedelta | None = None,
+                     window_days : int | None = None) -> dict:
+
+        '''
+        downloads the readings of several measures and fits a model for each with fit_many. If a ModelRegistry is given,
+        measures whose stored model is still valid for the readings (see ModelRegistry.is_stale) are loaded instead of
+        refitted, and newly fitted models are saved to it together with their training window and data fingerprint.
+
+        Output:
+
+            coefficients [dict] - coefficients_dclass objects of every measure keyed by measure notation
+        '''
+
+        series = self.load_readings(measure_notations, date_range, window_days) 
+
+        models, data = {}, {} 
+        for notation, readings in series.items(): 
+
+            if registry is not None and not registry.is_stale(notation, lag_features, readings, max_age): 
+                models[notation] = registry.load(notation) 
+                continue 
+
+            data[notation] = self.transform_data(readings.to_frame(), lag_features) 
+
+        fitted = self.fit_many(data) if data else {} 
+
+        for notation, model in fitted.items(): 
+
+            if registry is not None: 
+                model.start, model.end = registry.training_window(series[notation]) 
+                model.fingerprint = registry.fingerprint(series[notation]) 
+                registry.save(notation, model) 
+
+        models.update(fitted) 
+        self.coefficients.update(models) 
+
+        return models 
+
     def predict(self,
                 x_last : np.ndarray,
-                n_predictions : int) -> np.ndarray: 
+                n_predictions : int, 
+                measure_notation : str | None = None) -> np.ndarray: 
         
         '''
         Autoregressively produces predictions based on the values stored in x_last, where the previous predictions are
         fed into future predictions until we have reached the number of predictions defined by n_predictions. 
+
+        x_last may be a single state or a 2D array of states, one per row, which are forecast together (see recursive_forecast). 
+        If measure_notation is given the coefficients fitted for that measure by fit_many are used instead of self.model. 
         '''
 
-        predictions = np.array([]) 
+        if measure_notation is not None: 
+            fitted = self.coefficients[measure_notation] 
+            return self.recursive_forecast(fitted.coefficients, fitted.intercept, x_last, n_predictions) 
 
-        for _ in range(n_predictions):  
+        return self.recursive_forecast(self.model.coef_, self.model.intercept_, x_last, n_predictions) 
 
-            prediction= self.model.predict([x_last]) 
-        
-            x_last = np.concatenate( (x_last[1:  ], prediction), axis = 0 )
-            
-        
-            predictions = np.concatenate((predictions,prediction) ) 
+    def predict_many(self,
+                     x_last : dict[str, np.ndarray],
+                     n_predictions : int) -> dict[str, np.ndarray]: 
+
+        '''
+        forecasts n_predictions steps for many measures fitted by fit_many, x_last stores the last state of each
+        measure keyed by measure notation. Measures with the same number of lag features are forecast as one batch. 
+        '''
+
+        groups = {} 
+        for notation in x_last: 
+            groups.setdefault(self.coefficients[notation].lag_features, []).append(notation) 
+
+        predictions = {} 
+        for notations in groups.values(): 
 
-        return predictions
+            states = np.stack([ x_last[notation] for notation in notations ]) 
+            coefficients = np.stack([ self.coefficients[notation].coefficients for notation in notations ]) 
+            intercepts = np.array([ self.coefficients[notation].intercept for notation in notations ]) 
+
+            for notation, prediction in zip(notations, self.recursive_forecast(coefficients, intercepts, states, n_predictions)): 
+                predictions[notation] = prediction 
+
+        return predictions 
     
     @staticmethod
     def timestamps_to_date_str(timestamp : str) -> str:
@@ -184,32 +477,40 @@ class Forecast(FloodMonitoringMixin):
         results are returned in dictionary format. 
         '''
             
+        from sklearn.metrics import mean_absolute_error, mean_squared_error
+
         mae = mean_absolute_error(predictions, ground_truth) 
         mse = mean_squared_error(predictions, ground_truth)
         
         return {'Mean Squared Error' : round(mse, 2), 
                 'Mean Absolute Error' : round(mae, 2)  }
     
+    @timed('render')
     def visualise_predictions(self,
                               predictions: np.ndarray,
                               measure : FloodMonitoringMixin.measure_dclass, 
                               test_timestamps : list, 
-                              ground_truth : np.ndarray | None ) -> tuple[Figure, Axes]: 
+                              ground_truth : np.ndarray | None ) -> tuple['Figure', 'Axes']: 
         
         '''
         Function used to plot the values of predictions and their associated timestamp.  ground_truth is an optinal argument to the function,
         if it is provided then metrics will be computed as well as the ground_truth values being plotted alongside the predicted ones. 
         '''
 
+        ''' parsing the timestamps in one vectorised call so the predictions are plotted against a time axis '''
+        times = self.parse_timestamps(test_timestamps) 
+
+        import matplotlib.pyplot as plt 
+
         fig, ax = plt.subplots(1, figsize = (7,7)) 
-        ax.plot(np.arange(len(predictions)), predictions, label  = 'predictions' )
+        ax.plot(times, predictions, label  = 'predictions' )
 
         ax.set_title(f'predictions for {measure.parameter}')
 
 
         if isinstance(ground_truth, np.ndarray): 
 
-            ax.plot(np.arange(len(ground_truth)), ground_truth , label = 'ground truth' )
+            ax.plot(times, ground_truth , label = 'ground truth' )
 
             metrics = self.compute_metrics(predictions, ground_truth) 
 
@@ -223,12 +524,13 @@ class Forecast(FloodMonitoringMixin):
                     transform = ax.transAxes )
 
 
-        date_range = [*map(self.timestamps_to_date_str, [test_timestamps[i] for i in [0, -1]]) ] 
+        date_range = [*np.datetime_as_string(times[[0, -1]], unit = 'D')] 
         units = self.configure_units(date_range) 
 
-        test_timestamps  = [self.format_date(timestamp, units) for timestamp in test_timestamps] 
+        ''' labelling at most 10 timestamps, formatted in bulk '''
+        step_size = max(len(times) // 10, 1) 
 
-        ax.set_xticks( np. arange(len(test_timestamps)),  test_timestamps, rotation = 90 ) 
+        ax.set_xticks(times[::step_size], self.format_timestamps(times[::step_size], units), rotation = 90 ) 
         ax.set_xlabel('time') 
 
         ax.set_ylabel(measure.units) 
@@ -239,12 +541,47 @@ class Forecast(FloodMonitoringMixin):
 
         return fig, ax
 
+    def backtest(self,
+                 measure_notations : list[str],
+                 date_range : list | None = None,
+                 lag_features : list[int] = [3],
+                 horizon : int = 4,
+                 n_origins : int = 10,
+                 step : int | None = None,
+                 window : int | None = None,
+                 window_days : int | None = None,
+                 max_workers : int | None = None) -> 'pd.DataFrame':
+
+        '''
+        Backtests forecasts of many measures from several rolling (window set) or expanding (window None) origins and for
+        several numbers of lag features, without rendering any figures. Readings are downloaded once per measure, concurrently,
+        then the measures are backtested over a process pool (see backtest.backtest_series for the arguments).
+
+        Output:
+
+            metrics [pd.DataFrame] - one row per measure, lag_features, origin and horizon step with the prediction, actual value,
+                                     absolute error (MAE) and squared error (MSE), e.g. metrics.groupby(['lag_features', 'horizon']).mean()
+        '''
+
+        from .backtest import run_backtest
+
+        series = self.load_readings(measure_notations, date_range, window_days) 
+
+        return run_backtest(series,
+                            lag_features,
+                            max_workers = max_workers,
+                            horizon = horizon,
+                            n_origins = n_origins,
+                            step = step,
+                            window = window)
+
+    @timed('evaluate_forecast')
     def evaluate_forecast(self,
                          measure : FloodMonitoringMixin.measure_dclass, 
                          date_range : list | None = None, 
                          split_date  : str | None = None, 
                          split_size : int = 5, 
-                         lag_features : int = 3 ) -> tuple[Figure, Axes]:  
+                         lag_features : int = 3 ) -> tuple['Figure', 'Axes']:  
     
         '''
         method which strings all of the previous methods together to to perform a full evaluation and plot a figure.
@@ -0,0 +1,332 @@
+import bisect
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+'''
+path segments following these resources are identifiers, they are replaced by a placeholder so requests for
+different stations or measures are grouped under one endpoint
+'''
+IDENTIFIED_RESOURCES = {'stations' : '{id}', 'measures' : '{notation}', 'floods' : '{id}', 'floodAreas' : '{id}'}
+
+
+def endpoint(query : str) -> str:
+
+    ''' endpoint a query belongs to, e.g. id/measures/1412-temperature-dry_bulb-i-1_h-deg_C/readings.csv -> id/measures/{notation}/readings.csv '''
+
+    parts = query.split('?', 1)[0].split('/')
+
+    if len(parts) > 2 and parts[0] == 'id' and parts[1] in IDENTIFIED_RESOURCES:
+
+        suffix = '.csv' if len(parts) == 3 and parts[2].endswith('.csv') else ''
+        parts[2] = IDENTIFIED_RESOURCES[parts[1]] + suffix
+
+    return '/'.join(parts)
+
+
+class Histogram:
+
+    '''
+    cumulative histogram of observations in the style of a Prometheus histogram, with the sum and count of observations
+    '''
+
+    def __init__(self, buckets : tuple = LATENCY_BUCKETS) -> None:
+
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value : float) -> None:
+
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+
+        ''' (upper bound, number of observations at or below it) of every bucket, ending with +Inf '''
+
+        total, cumulative = 0, []
+
+        for bound, count in zip([ str(bucket) for bucket in self.buckets ] + ['+Inf'], self.counts):
+            total += count
+            cumulative.append((bound, total))
+
+        return cumulative
+
+    def quantile(self, q : float) -> float:
+
+        ''' estimate of the q quantile, the upper bound of the bucket it falls in '''
+
+        if self.count == 0:
+            return float('nan')
+
+        rank = q * self.count
+
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return float(bound)
+
+        return float('inf')
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else float('nan')
+
+
+@dataclass
+class RequestEvent:
+
+    '''
+    details of a request passed to post request hooks
+
+        query [str]       - query sent, relative to the API root
+        params [dict]     - parameters sent with the query
+        endpoint [str]    - endpoint the query belongs to (see endpoint)
+        seconds [float]   - time taken to receive the response, including retries
+        status_code [int] - status code of the response, None if no response was received
+        bytes [int]       - size of the response body
+        rows [int]        - number of rows (items or CSV lines) decoded from the response
+        retries [int]     - number of retries made by the transport
+        error [Exception] - exception raised while sending or decoding the request, if any
+    '''
+
+    query : str
+    params : dict
+    endpoint : str
+    seconds : float = 0.0
+    status_code : int | None = None
+    bytes : int = 0
+    rows : int = 0
+    retries : int = 0
+    error : Exception | None = field(default = None, repr = False)
+
+
+class Metrics:
+
+    '''
+    Collects metrics about the requests sent by make_request and the time spent in named phases of the library.
+
+    For each endpoint a latency histogram is kept, along with counters of requests by status code, bytes received,
+    rows decoded and retries. Phases (fetch, parse, transform, fit, render, ...) are timed into a histogram per phase
+    name, phases may nest, e.g. fetch and parse both happen during get_readings.
+
+    Functions registered with add_pre_request_hook are called as hook(query, params) before each request is sent,
+    functions registered with add_post_request_hook are called with a RequestEvent once it has completed.
+
+    Metrics are only collected once installed with set_metrics, they can be exported with to_prometheus or log.
+    '''
+
+    def __init__(self, latency_buckets : tuple = LATENCY_BUCKETS) -> None:
+
+        self.latency_buckets = tuple(latency_buckets)
+
+        self.pre_request_hooks = []
+        self.post_request_hooks = []
+
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+
+        with self._lock:
+            self.latency = {}
+            self.requests = {}
+            self.bytes = {}
+            self.rows = {}
+            self.retries = {}
+            self.phases = {}
+
+    def add_pre_request_hook(self, hook) -> None:
+        self.pre_request_hooks.append(hook)
+
+    def add_post_request_hook(self, hook) -> None:
+        self.post_request_hooks.append(hook)
+
+    def before_request(self, query : str, params : dict) -> None:
+
+        for hook in self.pre_request_hooks:
+            hook(query, params)
+
+    def after_request(self, event : RequestEvent) -> None:
+
+        status = 'error' if event.status_code is None else str(event.status_code)
+
+        with self._lock:
+
+            self.latency.setdefault(event.endpoint, Histogram(self.latency_buckets)).observe(event.seconds)
+
+            key = (event.endpoint, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+            for counter, value in [(self.bytes, event.bytes), (self.rows, event.rows), (self.retries, event.retries)]:
+                counter[event.endpoint] = counter.get(event.endpoint, 0) + value
+
+        for hook in self.post_request_hooks:
+            hook(event)
+
+    def observe_phase(self, name : str, seconds : float) -> None:
+
+        with self._lock:
+            self.phases.setdefault(name, Histogram(self.latency_buckets)).observe(seconds)
+
+    @contextmanager
+    def phase(self, name : str):
+
+        ''' times the body of a with block as the phase name '''
+
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.observe_phase(name, time.perf_counter() - start)
+
+    def snapshot(self) -> dict:
+
+        ''' summary of the metrics collected, keyed by endpoint and phase '''
+
+        with self._lock:
+
+            endpoints = {}
+            for name, histogram in self.latency.items():
+                endpoints[name] = {'requests' : histogram.count,
+                                   'status' : { status : count for (endpoint_, status), count in self.requests.items() if endpoint_ == name },
+                                   'seconds' : histogram.sum,
+                                   'mean_seconds' : histogram.mean,
+                                   'p95_seconds' : histogram.quantile(0.95),
+                                   'bytes' : self.bytes.get(name, 0),
+                                   'rows' : self.rows.get(name, 0),
+                                   'retries' : self.retries.get(name, 0)}
+
+            phases = { name : {'count' : histogram.count, 'seconds' : histogram.sum, 'mean_seconds' : histogram.mean}
+                       for name, histogram in self.phases.items() }
+
+        return {'endpoints' : endpoints, 'phases' : phases}
+
+    def to_prometheus(self, prefix : str = 'flood_monitoring') -> str:
+
+        ''' metrics in the Prometheus text exposition format '''
+
+        lines = []
+
+        def histogram(name, help_text, label, histograms):
+
+            lines.extend([f'# HELP {prefix}_{name} {help_text}', f'# TYPE {prefix}_{name} histogram'])
+
+            for value, hist in sorted(histograms.items()):
+                for bound, total in hist.cumulative():
+                    lines.append(f'{prefix}_{name}_bucket{{{label}="{value}",le="{bound}"}} {total}')
+                lines.append(f'{prefix}_{name}_sum{{{label}="{value}"}} {hist.sum}')
+                lines.append(f'{prefix}_{name}_count{{{label}="{value}"}} {hist.count}')
+
+        def counter(name, help_text, values):
+
+            lines.extend([f'# HELP {prefix}_{name} {help_text}', f'# TYPE {prefix}_{name} counter'])
+
+            for labels, value in sorted(values.items()):
+                lines.append(f'{prefix}_{name}{{{labels}}} {value}')
+
+        with self._lock:
+
+            histogram('request_seconds', 'Time taken to receive responses from the API.', 'endpoint', self.latency)
+
+            counter('requests_total', 'Requests sent to the API by status code.',
+                    { f'endpoint="{name}",status="{status}"' : count for (name, status), count in self.requests.items() })
+            counter('response_bytes_total', 'Bytes received from the API.', { f'endpoint="{name}"' : count for name, count in self.bytes.items() })
+            counter('rows_total', 'Rows decoded from API responses.', { f'endpoint="{name}"' : count for name, count in self.rows.items() })
+            counter('retries_total', 'Requests retried by the transport.', { f'endpoint="{name}"' : count for name, count in self.retries.items() })
+
+            histogram('phase_seconds', 'Time spent in each phase.', 'phase', self.phases)
+
+        return '\n'.join(lines) + '\n'
+
+    def log(self, logger : logging.Logger | None = None, level : int = logging.INFO) -> None:
+
+        ''' writes a summary line per endpoint and phase to logger (the flood_monitoring logger by default) '''
+
+        logger = logger or logging.getLogger('flood_monitoring')
+        snapshot = self.snapshot()
+
+        for name, stats in sorted(snapshot['endpoints'].items()):
+            logger.log(level, 'endpoint=%s requests=%d status=%s mean=%.1fms p95<=%.3fs bytes=%d rows=%d retries=%d',
+                       name, stats['requests'], stats['status'], stats['mean_seconds'] * 1000, stats['p95_seconds'],
+                       stats['bytes'], stats['rows'], stats['retries'])
+
+        for name, stats in sorted(snapshot['phases'].items()):
+            logger.log(level, 'phase=%s count=%d total=%.3fs mean=%.1fms', name, stats['count'], stats['seconds'], stats['mean_seconds'] * 1000)
+
+
+def logging_hook(logger : logging.Logger | None = None, level : int = logging.DEBUG):
+
+    ''' post request hook logging every request, e.g. metrics.add_post_request_hook(logging_hook()) '''
+
+    logger = logger or logging.getLogger('flood_monitoring')
+
+    def hook(event : RequestEvent) -> None:
+        logger.log(level, '%s %s status=%s %.1fms bytes=%d rows=%d retries=%d', event.query, event.params, event.status_code,
+                   event.seconds * 1000, event.bytes, event.rows, event.retries)
+
+    return hook
+
+
+def response_retries(response) -> int:
+
+    ''' number of retries urllib3 made for a requests.Response, 0 for other responses '''
+
+    retries = getattr(getattr(response, 'raw', None), 'retries', None)
+
+    return len(getattr(retries, 'history', ()) or ())
+
+
+'''
+metrics collected by make_request and the library's phases, None (the default) disables instrumentation
+'''
+
+_metrics = None
+
+
+def get_metrics() -> Metrics | None:
+    return _metrics
+
+
+def set_metrics(metrics : Metrics | None) -> None:
+
+    ''' installs the metrics make_request and the library's phases report to, passing None disables instrumentation '''
+
+    global _metrics
+    _metrics = metrics
+
+
+def phase(name : str):
+
+    ''' context manager timing its body as the phase name, does nothing unless metrics are installed '''
+
+    return nullcontext() if _metrics is None else _metrics.phase(name)
+
+
+def timed(name : str):
+
+    ''' decorator timing every call of a function as the phase name '''
+
+    def decorator(function):
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+
+            if _metrics is None:
+                return function(*args, **kwargs)
+
+            with _metrics.phase(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,175 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+
+    '''
+    Thread safe least recently used cache whose entries expire ttl seconds after they were stored.
+
+    Inputs:
+
+        maxsize [int]    - maximum number of entries, the least recently used entry is evicted when full
+        ttl [float]      - number of seconds an entry is valid for
+        clock [callable] - function returning the current time in seconds, time.monotonic by default
+    '''
+
+    def __init__(self, maxsize : int = 1024, ttl : float = 3600, clock = time.monotonic) -> None:
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key, default = None):
+
+        ''' returns the value stored for key, or default if it is missing or has expired '''
+
+        with self._lock:
+
+            entry = self._entries.get(key)
+
+            if entry is None or entry[0] <= self.clock():
+
+                if entry is not None:
+                    del self._entries[key]
+
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[1]
+
+    def set(self, key, value) -> None:
+
+        with self._lock:
+
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last = False)
+
+    def invalidate(self, key = None) -> None:
+
+        ''' removes key from the cache, or every entry if key is None '''
+
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        return {'hits' : self.hits, 'misses' : self.misses, 'size' : len(self._entries)}
+
+
+class MetadataCache:
+
+    '''
+    Cache of id/stations and id/measures responses keyed by station reference, used when constructing stations.
+
+    Station metadata and measure catalogues rarely change so they are kept for static_ttl seconds, whereas the
+    latest reading of each measure (the latestReading fields of id/measures) changes every 15 minutes and is kept
+    for latest_ttl seconds. Once the latest readings expire they are refreshed with a single station wide request
+    rather than downloading the measure catalogue again.
+
+    Inputs:
+
+        maxsize [int]      - maximum number of stations kept in each cache
+        static_ttl [float] - seconds station metadata and measure catalogues are kept for, 6 hours by default
+        latest_ttl [float] - seconds latest readings are kept for, 5 minutes by default
+    '''
+
+    def __init__(self,
+                 maxsize : int = 1024,
+                 static_ttl : float = 6 * 60 * 60,
+                 latest_ttl : float = 5 * 60,
+                 clock = time.monotonic) -> None:
+
+        self.stations = TTLCache(maxsize, static_ttl, clock)
+        self.measures = TTLCache(maxsize, static_ttl, clock)
+        self.latest = TTLCache(maxsize, latest_ttl, clock)
+
+    def invalidate(self, station_id : str | None = None) -> None:
+
+        ''' removes everything cached for a station, or for every station if station_id is None '''
+
+        for cache in [self.stations, self.measures, self.latest]:
+            cache.invalidate(station_id)
+
+    def stats(self) -> dict:
+
+        ''' hit/miss counters and size of each cache '''
+
+        return {'stations' : self.stations.stats(), 'measures' : self.measures.stats(), 'latest' : self.latest.stats()}
+
+    @staticmethod
+    def split_measures(response : dict) -> tuple[dict, dict]:
+
+        '''
+        splits an id/measures response into the measure catalogue (without the latestReading fields)
+        and a dictionary of latest readings keyed by measure notation
+        '''
+
+        catalogue, latest = [], {}
+
+        for measure in response['items']:
+
+            measure = dict(measure)
+            latest_reading = measure.pop('latestReading', None)
+
+            if isinstance(latest_reading, dict):
+                latest[measure.get('notation')] = latest_reading
+
+            catalogue.append(measure)
+
+        return {'items' : catalogue}, latest
+
+    @staticmethod
+    def join_measures(catalogue : dict, latest : dict) -> dict:
+
+        ''' rebuilds an id/measures response from a measure catalogue and its latest readings '''
+
+        items = []
+
+        for measure in catalogue['items']:
+
+            measure = dict(measure)
+
+            if measure.get('notation') in latest:
+                measure['latestReading'] = latest[measure.get('notation')]
+
+            items.append(measure)
+
+        return {'items' : items}
+
+
+'''
+process wide cache used by station constructors, None (the default) disables caching
+'''
+
+_metadata_cache = None
+
+
+def get_metadata_cache() -> MetadataCache | None:
+    return _metadata_cache
+
+
+def set_metadata_cache(cache : MetadataCache | None) -> None:
+
+    ''' sets the cache used when constructing stations, passing None disables it '''
+
+    global _metadata_cache
+    _metadata_cache = cache
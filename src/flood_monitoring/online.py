@@ -0,0 +1,206 @@
+import json
+from dataclasses import dataclass
+
+import numpy as np
+
+from .forecast import Forecast
+from .readings import Readings
+from .timestamps import parse_timestamps
+
+
+@dataclass
+class RLSState:
+
+    '''
+    Recursive least squares state of the linear model of a single measure.
+
+    Inputs:
+
+        theta [np.ndarray]  - coefficients followed by the intercept, coefficients are ordered lag_1 first as in transform_data
+        P [np.ndarray]      - inverse correlation matrix of the features, shape (lag + 1, lag + 1)
+        window [np.ndarray] - last lag_features values, latest first. NaN until enough readings have been seen
+        forgetting [float]  - forgetting factor, 1.0 weights every reading equally, lower values favour recent readings
+        n_updates [int]     - number of readings the coefficients have been updated with
+        last_time [str]     - timestamp of the last reading seen, readings at or before it are ignored
+    '''
+
+    theta : np.ndarray
+    P : np.ndarray
+    window : np.ndarray
+    forgetting : float = 1.0
+    n_updates : int = 0
+    last_time : str | None = None
+
+    @classmethod
+    def initial(cls,
+                lag_features : int,
+                coefficients : Forecast.coefficients_dclass | None = None,
+                forgetting : float = 1.0,
+                delta : float = 1e4) -> 'RLSState':
+
+        '''
+        creates the state of a measure which has not seen any readings. The coefficients start at zero or at
+        coefficients fitted by Forecast.fit_many, and P at delta times the identity.
+        '''
+
+        theta = np.zeros(lag_features + 1)
+
+        if coefficients is not None:
+            theta[:-1] = coefficients.coefficients
+            theta[-1] = coefficients.intercept
+
+        return cls(theta = theta,
+                   P = np.eye(lag_features + 1) * delta,
+                   window = np.full(lag_features, np.nan),
+                   forgetting = forgetting)
+
+    @property
+    def lag_features(self) -> int:
+        return len(self.window)
+
+    @property
+    def ready(self) -> bool:
+
+        ''' whether enough readings have been seen to fill the lag window '''
+
+        return not np.isnan(self.window).any()
+
+    def update(self, value : float) -> None:
+
+        '''
+        updates the coefficients with a new reading in O(lag_features ** 2), then adds the reading to the window.
+        Missing values are skipped.
+        '''
+
+        if np.isnan(value):
+            return
+
+        if self.ready:
+
+            x = np.append(self.window, 1.0)
+            Px = self.P @ x
+
+            gain = Px / (self.forgetting + x @ Px)
+
+            self.theta += gain * (value - x @ self.theta)
+            self.P = (self.P - np.outer(gain, Px)) / self.forgetting
+
+            self.n_updates += 1
+
+        self.window[1:] = self.window[:-1]
+        self.window[0] = value
+
+    def forecast(self, n_predictions : int) -> np.ndarray:
+
+        ''' forecasts n_predictions steps from the latest readings seen '''
+
+        if not self.ready:
+            raise Exception('Not enough readings to forecast')
+
+        # recursive_forecast appends predictions to the end of the state, so the window is passed oldest first
+        return Forecast.recursive_forecast(self.theta[-2::-1], self.theta[-1], self.window[::-1], n_predictions)
+
+    def to_dict(self) -> dict:
+
+        ''' JSON serialisable representation of the state '''
+
+        return {'theta' : self.theta.tolist(),
+                'P' : self.P.tolist(),
+                'window' : [ None if np.isnan(value) else value for value in self.window.tolist() ],
+                'forgetting' : self.forgetting,
+                'n_updates' : self.n_updates,
+                'last_time' : self.last_time}
+
+    @classmethod
+    def from_dict(cls, state : dict) -> 'RLSState':
+
+        return cls(theta = np.array(state['theta'], dtype = np.float64),
+                   P = np.array(state['P'], dtype = np.float64),
+                   window = np.array([ np.nan if value is None else value for value in state['window'] ], dtype = np.float64),
+                   forgetting = state['forgetting'],
+                   n_updates = state['n_updates'],
+                   last_time = state['last_time'])
+
+
+class OnlineForecast(Forecast):
+
+    '''
+    Forecast which keeps a recursive least squares state per measure, so models are updated with each new
+    reading instead of being refitted over the full history. States can be saved and loaded as JSON so a
+    restarted worker continues where it left off.
+
+    Inputs:
+
+        lag_features [int] - number of lag features of new states
+        forgetting [float] - forgetting factor of new states, see RLSState
+    '''
+
+    def __init__(self, lag_features : int = 3, forgetting : float = 1.0) -> None:
+
+        super().__init__()
+
+        self.lag_features = lag_features
+        self.forgetting = forgetting
+        self.states = {}
+
+    def state(self, measure_notation : str) -> RLSState:
+
+        '''
+        returns the state of a measure, creating it if needed. New states start from the coefficients fitted by
+        fit_many if the measure has been fitted with the same number of lag features.
+        '''
+
+        if measure_notation not in self.states:
+
+            fitted = self.coefficients.get(measure_notation)
+
+            if fitted is not None and fitted.lag_features != self.lag_features:
+                fitted = None
+
+            self.states[measure_notation] = RLSState.initial(self.lag_features, fitted, self.forgetting)
+
+        return self.states[measure_notation]
+
+    def update(self, measure_notation : str, readings : Readings) -> RLSState:
+
+        '''
+        updates the state of a measure with new readings, e.g. those returned by get_readings(..., as_readings = True)
+        or a poll. Readings at or before the last reading seen are ignored, so overlapping polls are safe.
+        '''
+
+        state = self.state(measure_notation)
+        readings = readings.sorted()
+
+        times = readings.times
+        values = readings.values
+
+        if state.last_time is not None:
+            new = times > parse_timestamps([state.last_time])[0]
+            times, values = times[new], values[new]
+
+        for value in values:
+            state.update(value)
+
+        if len(times):
+            state.last_time = np.datetime_as_string(times[-1], unit = 's') + 'Z'
+
+        return state
+
+    def forecast(self, measure_notation : str, n_predictions : int) -> np.ndarray:
+        return self.states[measure_notation].forecast(n_predictions)
+
+    def state_dict(self) -> dict:
+        return { notation : state.to_dict() for notation, state in self.states.items() }
+
+    def load_state_dict(self, states : dict) -> None:
+        self.states.update({ notation : RLSState.from_dict(state) for notation, state in states.items() })
+
+    def save(self, path : str) -> None:
+
+        with open(path, 'w') as file:
+            json.dump(self.state_dict(), file)
+
+    def load(self, path : str) -> None:
+
+        with open(path) as file:
+            self.load_state_dict(json.load(file))
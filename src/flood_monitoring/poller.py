@@ -0,0 +1,177 @@
+import asyncio
+import datetime
+import threading
+import time
+
+import numpy as np
+
+from .station import FloodMonitoringMixin
+from .readings import Readings
+from .timestamps import parse_timestamps
+
+
+class ReadingsPoller(FloodMonitoringMixin):
+
+    '''
+    Polls the readings of many measures and delivers only the readings which are new since the previous poll.
+
+    A watermark (the timestamp of the latest reading seen) is kept for each measure and each poll requests the
+    readings since it with the API's since parameter, so a cycle downloads a handful of readings per measure rather
+    than whole days. Polls are lined up with the 15 minute cadence readings are published on, and the requests of
+    a cycle are spread over spread seconds rather than sent in one burst.
+
+    New readings are passed to every callback registered with add_callback as callback(measure_notation, readings),
+    or can be consumed with an async for loop over the poller (see stream).
+
+    Inputs:
+
+        measure_notations [list] - notations of the measures to poll
+        interval [float]         - seconds between polls, 15 minutes by default
+        offset [float]           - seconds after each multiple of interval to poll at, giving stations time to publish
+        spread [float]           - seconds the requests of each poll are spread over
+        lookback [timedelta]     - how far back the first poll of a measure without a watermark requests readings from
+        watermarks [dict]        - watermarks to resume from, keyed by measure notation (e.g. poller.watermarks of a previous run)
+        max_workers [int]        - maximum number of requests sent at the same time
+    '''
+
+    def __init__(self,
+                 measure_notations : list[str],
+                 interval : float = 15 * 60,
+                 offset : float = 60,
+                 spread : float = 60,
+                 lookback : datetime.timedelta = datetime.timedelta(hours = 1),
+                 watermarks : dict | None = None,
+                 max_workers : int = 8) -> None:
+
+        self.measure_notations = list(measure_notations)
+        self.interval = interval
+        self.offset = offset
+        self.spread = spread
+        self.lookback = lookback
+        self.max_workers = max_workers
+
+        self.watermarks = dict(watermarks or {})
+        self.callbacks = []
+        self.errors = {}
+
+        self._stop = threading.Event()
+
+    def add_callback(self, callback) -> None:
+
+        ''' registers a function called as callback(measure_notation, readings) with the new readings of each measure '''
+
+        self.callbacks.append(callback)
+
+    def next_poll_time(self, now : float | None = None) -> float:
+
+        ''' the next time (seconds since the epoch) which is offset seconds after a multiple of interval '''
+
+        now = time.time() if now is None else now
+
+        return ((now - self.offset) // self.interval + 1) * self.interval + self.offset
+
+    def since_query(self, measure_notation : str) -> tuple[str, dict]:
+
+        ''' query and params requesting the readings of a measure since its watermark, or since lookback ago without one '''
+
+        since = self.watermarks.get(measure_notation)
+
+        if since is None:
+            since = (datetime.datetime.now(datetime.timezone.utc) - self.lookback).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+        return f'id/measures/{measure_notation}/readings.csv', {'since' : since}
+
+    def poll_measure(self, measure_notation : str) -> Readings:
+
+        ''' requests the readings of a measure since its watermark, advances the watermark and returns the new readings '''
+
+        query, params = self.since_query(measure_notation)
+        readings = Readings.from_csv(self.make_request(query, params, return_json = False), measure_notation).sorted()
+
+        # since is inclusive, so the reading at the watermark is returned again
+        watermark = self.watermarks.get(measure_notation)
+        if watermark is not None and len(readings):
+            new = readings.times > parse_timestamps([watermark])[0]
+            readings = Readings(readings.times[new], readings.values[new], measure_notation)
+
+        if len(readings):
+            self.watermarks[measure_notation] = np.datetime_as_string(readings.times[-1], unit = 's') + 'Z'
+
+        return readings
+
+    def poll(self) -> dict[str, Readings]:
+
+        '''
+        polls every measure once, spreading the requests over spread seconds. Returns the new readings keyed by measure
+        notation, measures without new readings are left out. Errors are stored in self.errors keyed by measure notation.
+        '''
+
+        start = time.monotonic()
+        n_measures = max(len(self.measure_notations), 1)
+
+        def poll_measure(idx):
+            self._stop.wait(max(0.0, start + self.spread * idx / n_measures - time.monotonic()))
+            return self.poll_measure(self.measure_notations[idx])
+
+        results, errors = self.map_concurrently(poll_measure, range(len(self.measure_notations)), self.max_workers)
+
+        self.errors = { self.measure_notations[idx] : error for idx, error in errors.items() }
+
+        return { notation : readings for notation, readings in zip(self.measure_notations, results)
+                 if readings is not None and len(readings) }
+
+    def dispatch(self, new_readings : dict[str, Readings]) -> None:
+
+        for notation, readings in new_readings.items():
+            for callback in self.callbacks:
+                callback(notation, readings)
+
+    def run(self, cycles : int | None = None, poll_now : bool = True) -> None:
+
+        '''
+        polls the measures until stop is called (or cycles polls have been made), passing new readings to the callbacks.
+        The first poll is made straight away if poll_now is True, later polls are lined up with next_poll_time.
+        '''
+
+        self._stop.clear()
+        cycle = 0
+
+        while not self._stop.is_set() and (cycles is None or cycle < cycles):
+
+            if cycle or not poll_now:
+                if self._stop.wait(max(0.0, self.next_poll_time() - time.time())):
+                    break
+
+            self.dispatch(self.poll())
+            cycle += 1
+
+    def stop(self) -> None:
+
+        ''' stops run, or a stream, after the current poll '''
+
+        self._stop.set()
+
+    async def stream(self, cycles : int | None = None, poll_now : bool = True):
+
+        '''
+        asynchronous generator yielding (measure_notation, readings) for every measure with new readings, polling as run
+        does. Polls run in a worker thread so the event loop is not blocked.
+        '''
+
+        loop = asyncio.get_running_loop()
+
+        self._stop.clear()
+        cycle = 0
+
+        while not self._stop.is_set() and (cycles is None or cycle < cycles):
+
+            if cycle or not poll_now:
+                await asyncio.sleep(max(0.0, self.next_poll_time() - time.time()))
+
+            for notation, readings in (await loop.run_in_executor(None, self.poll)).items():
+                yield notation, readings
+
+            cycle += 1
+
+    def __aiter__(self):
+        return self.stream()
@@ -0,0 +1,144 @@
+from io import StringIO
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .timestamps import parse_timestamps
+from .instrumentation import timed
+from .downsample import downsample
+
+''' pandas is imported on first use, it is only needed to parse CSV responses and to convert readings to pandas objects '''
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class Readings:
+
+    '''
+    Columnar container for the readings of a measure. Values are stored as a float64 array and timestamps
+    (in UTC) as a datetime64[ns] array, so readings can be processed with vectorised NumPy operations instead
+    of lists of dictionaries. Readings are built straight from the CSV returned by the API (see from_csv).
+
+    Inputs:
+
+        times [np.ndarray]  - timestamps of the readings, converted to datetime64[ns]
+        values [np.ndarray] - values of the readings, converted to float64. Missing values are NaN
+        measure [str]       - notation of the measure the readings belong to
+    '''
+
+    def __init__(self,
+                 times : np.ndarray,
+                 values : np.ndarray,
+                 measure : str | None = None) -> None:
+
+        self.times = np.asarray(times, dtype = 'datetime64[ns]')
+        self.values = np.asarray(values, dtype = np.float64)
+        self.measure = measure
+
+        if self.times.shape != self.values.shape:
+            raise Exception('times and values must have the same length')
+
+    @classmethod
+    @timed('parse')
+    def from_csv(cls, csv : str, measure : str | None = None) -> 'Readings':
+
+        '''
+        builds readings from a CSV readings response (dateTime,measure,value). Parsing is done by pandas'
+        C parser so no Python object is created per reading.
+        '''
+
+        import pandas as pd
+
+        frame = pd.read_csv(StringIO(csv), usecols = ['dateTime', 'value'], dtype = {'dateTime' : str, 'value' : str})
+
+        times = parse_timestamps(frame['dateTime'].to_numpy(dtype = str))
+        values = pd.to_numeric(frame['value'], errors = 'coerce').to_numpy(dtype = np.float64)
+
+        return cls(times, values, measure)
+
+    @classmethod
+    @timed('parse')
+    def from_json(cls, response : dict, measure : str | None = None) -> 'Readings':
+
+        ''' builds readings from a JSON readings response, readings without a numeric value are NaN '''
+
+        items = response['items']
+
+        times = parse_timestamps(np.array([ item['dateTime'] for item in items ], dtype = str))
+        values = np.fromiter(( item.get('value') if isinstance(item.get('value'), (int, float)) else np.nan for item in items ),
+                             dtype = np.float64, count = len(items))
+
+        return cls(times, values, measure)
+
+    @classmethod
+    def concatenate(cls, readings : list['Readings'], measure : str | None = None) -> 'Readings':
+
+        ''' joins several Readings objects, e.g. the pages yielded by iter_readings '''
+
+        if not readings:
+            return cls(np.array([], dtype = 'datetime64[ns]'), np.array([]), measure)
+
+        return cls(np.concatenate([ reading.times for reading in readings ]),
+                   np.concatenate([ reading.values for reading in readings ]),
+                   measure or readings[0].measure)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __repr__(self) -> str:
+        return f'Readings(measure = {self.measure!r}, n = {len(self)})'
+
+    def sorted(self) -> 'Readings':
+
+        ''' returns the readings in time order, without copying if they are already sorted '''
+
+        if len(self) < 2 or (self.times[1:] >= self.times[:-1]).all():
+            return self
+
+        order = np.argsort(self.times, kind = 'stable')
+
+        return Readings(self.times[order], self.values[order], self.measure)
+
+    def exclude(self, times : np.ndarray) -> 'Readings':
+
+        ''' returns the readings whose timestamps are not in times '''
+
+        if len(times) == 0:
+            return self
+
+        mask = ~np.isin(self.times, times)
+
+        return Readings(self.times[mask], self.values[mask], self.measure)
+
+    def downsample(self, n_points : int, method : str = 'minmax') -> 'Readings':
+
+        ''' about n_points of the (sorted) readings chosen to keep the shape of the series, see downsample.py '''
+
+        times, values = downsample(self.times, self.values, n_points, method)
+
+        return Readings(times, values, self.measure)
+
+    def min(self) -> float:
+        return float(np.nanmin(self.values))
+
+    def max(self) -> float:
+        return float(np.nanmax(self.values))
+
+    def mean(self) -> float:
+        return float(np.nanmean(self.values))
+
+    def to_series(self) -> 'pd.Series':
+
+        ''' pandas Series of values indexed by time, sharing memory with the readings '''
+
+        import pandas as pd
+
+        return pd.Series(self.values, index = pd.DatetimeIndex(self.times, copy = False), name = self.measure, copy = False)
+
+    def to_frame(self) -> 'pd.DataFrame':
+
+        ''' pandas DataFrame with dateTime and value columns, sharing memory with the readings '''
+
+        import pandas as pd
+
+        return pd.DataFrame({'dateTime' : self.times, 'value' : self.values}, copy = False)
@@ -0,0 +1,172 @@
+import datetime
+import hashlib
+import sqlite3
+import threading
+
+import numpy as np
+
+from .forecast import Forecast
+from .readings import Readings
+
+
+class ModelRegistry:
+
+    '''
+    On disk registry of fitted forecast models backed by SQLite, keyed by measure notation.
+
+    Each model is stored as its coefficients (raw float64 bytes), intercept and number of lag features, together with
+    the training window and a fingerprint of the readings it was trained on. Loading the registry into a Forecast
+    (see load_into) restores every model with one query, and Forecast.fit_measures only refits models which are stale.
+
+    Inputs:
+
+        path [str] - path of the SQLite database, ':memory:' keeps the registry in memory for the lifetime of the object
+    '''
+
+    def __init__(self, path : str = ':memory:') -> None:
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread = False)
+
+        with self._lock, self._connection:
+
+            if path != ':memory:':
+                self._connection.execute('PRAGMA journal_mode = WAL')
+
+            self._connection.execute('''CREATE TABLE IF NOT EXISTS models (
+                                            measure TEXT PRIMARY KEY,
+                                            lag_features INTEGER NOT NULL,
+                                            coefficients BLOB NOT NULL,
+                                            intercept REAL NOT NULL,
+                                            n_samples INTEGER NOT NULL,
+                                            start TEXT,
+                                            end TEXT,
+                                            fingerprint TEXT,
+                                            fitted_at TEXT NOT NULL) WITHOUT ROWID''')
+
+    def close(self) -> None:
+
+        with self._lock:
+            self._connection.close()
+
+    def __len__(self) -> int:
+
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM models').fetchone()[0]
+
+    @staticmethod
+    def fingerprint(readings : Readings) -> str:
+
+        ''' short hash of the timestamps and values of readings, used to detect whether training data has changed '''
+
+        digest = hashlib.blake2b(digest_size = 16)
+        digest.update(np.ascontiguousarray(readings.times).view(np.int64).tobytes())
+        digest.update(np.ascontiguousarray(readings.values).tobytes())
+
+        return digest.hexdigest()
+
+    @staticmethod
+    def training_window(readings : Readings) -> tuple[str | None, str | None]:
+
+        ''' first and last timestamps of readings in the format used by the API '''
+
+        if len(readings) == 0:
+            return None, None
+
+        start, end = np.datetime_as_string(np.array([readings.times.min(), readings.times.max()]), unit = 's')
+
+        return f'{start}Z', f'{end}Z'
+
+    def save(self, measure_notation : str, model : Forecast.coefficients_dclass) -> None:
+
+        row = (measure_notation,
+               model.lag_features,
+               np.asarray(model.coefficients, dtype = np.float64).tobytes(),
+               model.intercept,
+               model.n_samples,
+               model.start,
+               model.end,
+               model.fingerprint,
+               datetime.datetime.now(datetime.timezone.utc).isoformat())
+
+        with self._lock, self._connection:
+            self._connection.execute('INSERT OR REPLACE INTO models VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', row)
+
+    @staticmethod
+    def from_row(row : tuple) -> tuple[str, Forecast.coefficients_dclass]:
+
+        measure, lag_features, coefficients, intercept, n_samples, start, end, fingerprint = row
+
+        return measure, Forecast.coefficients_dclass(coefficients = np.frombuffer(coefficients, dtype = np.float64),
+                                                     intercept = intercept,
+                                                     lag_features = lag_features,
+                                                     n_samples = n_samples,
+                                                     start = start,
+                                                     end = end,
+                                                     fingerprint = fingerprint)
+
+    def load(self, measure_notation : str) -> Forecast.coefficients_dclass | None:
+
+        ''' returns the stored model of a measure, or None if there is none '''
+
+        with self._lock:
+            row = self._connection.execute('''SELECT measure, lag_features, coefficients, intercept, n_samples, start, end, fingerprint
+                                              FROM models WHERE measure = ?''', (measure_notation,)).fetchone()
+
+        return None if row is None else self.from_row(row)[1]
+
+    def load_all(self) -> dict[str, Forecast.coefficients_dclass]:
+
+        ''' returns every stored model keyed by measure notation '''
+
+        with self._lock:
+            rows = self._connection.execute('''SELECT measure, lag_features, coefficients, intercept, n_samples, start, end, fingerprint
+                                               FROM models''').fetchall()
+
+        return dict( self.from_row(row) for row in rows )
+
+    def load_into(self, forecast : Forecast) -> int:
+
+        ''' adds every stored model to forecast.coefficients so it can predict straight away, returns the number of models loaded '''
+
+        models = self.load_all()
+        forecast.coefficients.update(models)
+
+        return len(models)
+
+    def is_stale(self,
+                 measure_notation : str,
+                 lag_features : int,
+                 readings : Readings,
+                 max_age : datetime.timedelta | None = None) -> bool:
+
+        '''
+        whether the stored model of a measure needs refitting on readings. A model is stale if there is none, it has a
+        different number of lag features, or it was trained on different readings. If max_age is given, a model whose
+        training window ends less than max_age before the latest reading is kept even if newer readings have arrived.
+        '''
+
+        model = self.load(measure_notation)
+
+        if model is None or model.lag_features != lag_features:
+            return True
+
+        if model.fingerprint == self.fingerprint(readings):
+            return False
+
+        if max_age is not None and model.end is not None and len(readings):
+            age = readings.times.max() - np.datetime64(model.end.rstrip('Z'))
+            return age > np.timedelta64(max_age)
+
+        return True
+
+    def remove(self, measure_notation : str | None = None) -> None:
+
+        ''' removes the model of a measure, or every model if measure_notation is None '''
+
+        with self._lock, self._connection:
+            if measure_notation is None:
+                self._connection.execute('DELETE FROM models')
+            else:
+                self._connection.execute('DELETE FROM models WHERE measure = ?', (measure_notation,))
@@ -0,0 +1,143 @@
+import json
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlencode
+
+from .transport import get_transport, set_transport
+
+
+class RecordedResponse:
+
+    '''
+    response returned by ReplayTransport, with the status_code, text and json() used by make_request
+    '''
+
+    def __init__(self, status_code : int, text : str) -> None:
+
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def request_key(query : str, params : dict | None = None) -> str:
+
+    ''' key a request is recorded under, the query followed by its params in sorted order '''
+
+    params = sorted( (key, '' if value is None else str(value)) for key, value in (params or {}).items() )
+
+    return f'{query}?{urlencode(params)}' if params else query
+
+
+class RecordingTransport:
+
+    '''
+    Transport which sends requests through another transport (the current one by default) and records every
+    response, so they can be replayed later with ReplayTransport without access to the API.
+
+    Inputs:
+
+        path [str]            - path of the JSON file responses are saved to by save()
+        transport [transport] - transport requests are sent through, the current transport if None
+    '''
+
+    def __init__(self, path : str | None = None, transport = None) -> None:
+
+        self.path = path
+        self.transport = transport if transport is not None else get_transport()
+        self.recordings = {}
+
+        self._lock = threading.Lock()
+
+    def get(self, query : str, params : dict | None = None, timeout = None):
+
+        response = self.transport.get(query, params = params, timeout = timeout)
+
+        with self._lock:
+            self.recordings[request_key(query, params)] = {'status_code' : response.status_code, 'text' : response.text}
+
+        return response
+
+    def save(self, path : str | None = None) -> None:
+
+        with self._lock, open(path or self.path, 'w') as file:
+            json.dump(self.recordings, file)
+
+
+class ReplayTransport:
+
+    '''
+    Transport which answers requests from recorded responses instead of the API.
+
+    Requests which were not recorded are sent to fallback if one is given, otherwise a 404 response is returned
+    which make_request raises as an invalid query.
+
+    Inputs:
+
+        recordings [str | dict] - path of a file saved by RecordingTransport, or the recordings themselves
+        fallback [transport]    - transport used for requests which were not recorded
+    '''
+
+    def __init__(self, recordings : str | dict, fallback = None) -> None:
+
+        if isinstance(recordings, str):
+            with open(recordings) as file:
+                recordings = json.load(file)
+
+        self.recordings = recordings
+        self.fallback = fallback
+
+        self.misses = []
+
+    def get(self, query : str, params : dict | None = None, timeout = None):
+
+        recording = self.recordings.get(request_key(query, params))
+
+        if recording is not None:
+            return RecordedResponse(recording['status_code'], recording['text'])
+
+        self.misses.append(request_key(query, params))
+
+        if self.fallback is not None:
+            return self.fallback.get(query, params = params, timeout = timeout)
+
+        return RecordedResponse(404, json.dumps({'items' : [], 'error' : 'No recorded response'}))
+
+
+@contextmanager
+def recording(path : str, transport = None):
+
+    '''
+    records every request sent through make_request inside the with block and saves the responses to path
+
+        with recording('responses.json'):
+            RiverLevel('F1906').plot_data_range()
+    '''
+
+    previous = get_transport()
+    recorder = RecordingTransport(path, transport or previous)
+
+    set_transport(recorder)
+
+    try:
+        yield recorder
+    finally:
+        set_transport(previous)
+        recorder.save()
+
+
+@contextmanager
+def replaying(recordings : str | dict, fallback = None):
+
+    ''' answers every request sent through make_request inside the with block from recorded responses '''
+
+    previous = get_transport()
+    replayer = ReplayTransport(recordings, fallback)
+
+    set_transport(replayer)
+
+    try:
+        yield replayer
+    finally:
+        set_transport(previous)
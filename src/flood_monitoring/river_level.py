@@ -1,4 +1,5 @@
 from .station import station 
+from .floods import get_flood_status 
 
 class RiverLevel(station):
 	
@@ -6,39 +7,74 @@ class RiverLevel(station):
 	RiverLevel class which inherits from the station class 
 	'''
 
+    def flood_query(self) -> tuple[str, dict]:
+
+        ''' query and params used to request floods within 1km of the station '''
+
+        return 'id/floods', {'lat' : self.latitude , 'long' : self.longitude , 'dist' : 1 , 'min-severity' : 1 }
+
     def set_in_flood(self) -> None:
 
         '''
         Queries the flood status of the current stations location, in_flood is set to true 
-        if there is a flood within 1km of the station
+        if there is a flood within 1km of the station. When a FloodStatus is installed (see floods.py) 
+        the status is read from it instead of sending a request. 
         '''
-        query = 'id/floods' 
-        params = {'lat' : self.latitude , 'long' : self.longitude , 'dist' : 1 , 'min-severity' : 1 }
+
+        flood_status = get_flood_status() 
+
+        if flood_status is not None: 
+            self.__in_flood = flood_status.in_flood(self.latitude, self.longitude) 
+            return 
+
+        query, params = self.flood_query() 
 
         response = self.make_request(query, params) 
 
-        self.__in_flood = True 
+        self.apply_in_flood(response) 
 
-        if response['items'] != []: 
-            self.__in_flood = False 
+    def apply_in_flood(self, response : dict) -> None:
+
+        ''' sets in_flood from an id/floods response, the station is in flood if any floods were returned '''
+
+        self.__in_flood = response['items'] != [] 
 
     @property
     def in_flood(self):
 
-        ''' getter method for in_flood using the @property decator, making in_flood a read only attribute '''
+        ''' 
+        getter method for in_flood using the @property decator, making in_flood a read only attribute. 
+        When a FloodStatus is installed the current status is read from it, which refreshes on its own schedule. 
+        '''
 
-        return self.__in_flood 
+        flood_status = get_flood_status() 
 
-    def __init__(self, station_id : str) -> None:
+        if flood_status is not None: 
+            return flood_status.in_flood(self.latitude, self.longitude) 
 
-        ''' initialsing River Level station by passing the parameter and qualifier values which signify River Level measures 
-        to the constructor. measure_type stores the name of the station type'''
+        if self.__in_flood is None:
+            self.hydrate()
+
+        ''' stations created without loading, e.g. from a StationCatalogue, request their flood status on first access '''
+        if self.__in_flood is None:
+            self.set_in_flood()
+
+        return self.__in_flood 
+
+    def load(self) -> None:
 
-        super().__init__(station_id, parameter = 'level', qualifier = ['Stage', 'Downstream Stage', 'Height' ], measure_type = 'River Level'  ) 
-        
         ''' 
-        extending the functionality of the init function through polymoprhism,
+        extending the functionality of load through polymoprhism,
         the flood status is now set during initialisation for RiverLevel stations   ''' 
+
+        super().load() 
         self.set_in_flood() 
 
-    
\ No newline at end of file
+    def __init__(self, station_id : str, lazy : bool = False) -> None:
+
+        ''' initialsing River Level station by passing the parameter and qualifier values which signify River Level measures 
+        to the constructor. measure_type stores the name of the station type'''
+
+        self.__in_flood = None 
+
+        super().__init__(station_id, parameter = 'level', qualifier = ['Stage', 'Downstream Stage', 'Height' ], measure_type = 'River Level', lazy = lazy  ) 
@@ -0,0 +1,548 @@
+import json
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from .floods import KM_PER_DEGREE, PolygonIndex, parse_polygon
+from .replay import request_key
+
+
+ROOT_URL = 'http://environment.data.gov.uk/flood-monitoring/'
+
+'''
+stations used by the test suite, with the measures the live API serves for them. Any other station is generated
+'''
+KNOWN_STATIONS = [('F1906', 'Foss Barrier', 53.9534, -1.0735, [('level', 'Stage', 'mASD', None),
+                                                                ('flow', '', 'm3/s', None)]),
+                  ('2200TH', 'Kingston', 51.4152, -0.3085, [('flow', '', 'm3/s', None),
+                                                             ('level', 'Stage', 'mASD', None)]),
+                  ('2928TH', 'Days Weir', 51.6383, -1.1796, [('flow', '', 'm3/s', None)]),
+                  ('3901', 'Greenwich', 51.4800, -0.0050, [('temperature', 'Dry Bulb', 'deg C', None)]),
+                  ('1412', 'Wisley', 51.3100, -0.4700, [('temperature', 'Dry Bulb', 'deg C', '1412-temperature-dry_bulb-i-1_h-deg_C')]),
+                  ('E71524', 'Dover', 51.1146, 1.3225, [('level', 'Tidal Level', 'mAOD', None)])]
+
+'''
+measures of generated stations, stations cycle through the types
+'''
+STATION_TYPES = [[('level', 'Stage', 'mASD')],
+                 [('flow', '', 'm3/s')],
+                 [('level', 'Tidal Level', 'mAOD')],
+                 [('temperature', 'Dry Bulb', 'deg C')]]
+
+'''
+bounding box (lat, long) generated stations are placed in, roughly England
+'''
+BOUNDS = ((50.0, 55.5), (-5.5, 1.7))
+
+
+def slug(text : str) -> str:
+    return text.lower().replace(' ', '_').replace('/', '_')
+
+
+def distance_km(lat, long, lats, longs) -> np.ndarray:
+
+    ''' great circle distance in km from (lat, long) to each of (lats, longs) '''
+
+    lat, long, lats, longs = map(np.radians, [lat, long, np.asarray(lats, dtype = np.float64), np.asarray(longs, dtype = np.float64)])
+
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((longs - long) / 2) ** 2
+
+    return 2 * 6371.0 * np.arcsin(np.sqrt(a))
+
+
+class SyntheticNetwork:
+
+    '''
+    Deterministic synthetic monitoring network answering the same queries as the flood monitoring API: stations,
+    measures, measure and station readings, floods and flood areas.
+
+    Readings are a function of the measure and time, so any date range can be served without storing anything.
+    Readings are generated every 86400 / readings_per_day seconds up to the current time.
+
+    Inputs:
+
+        n_stations [int]           - number of generated stations, added to the stations in KNOWN_STATIONS
+        measures_per_station [int] - number of measures of each generated station
+        readings_per_day [int]     - number of readings per measure per day, 96 (every 15 minutes) by default
+        flood_fraction [float]     - fraction of flood areas with a flood in force
+        row_limit [int]            - maximum number of rows returned for a request, as the API's 10000 limit
+        seed [int]                 - seed used to place stations and flood areas
+        clock [callable]           - function returning the current time (seconds since the epoch)
+    '''
+
+    def __init__(self,
+                 n_stations : int = 100,
+                 measures_per_station : int = 1,
+                 readings_per_day : int = 96,
+                 flood_fraction : float = 0.1,
+                 row_limit : int = 10000,
+                 seed : int = 0,
+                 clock = time.time) -> None:
+
+        self.readings_per_day = readings_per_day
+        self.period = 86400 // readings_per_day
+        self.row_limit = row_limit
+        self.clock = clock
+
+        rng = np.random.default_rng(seed)
+
+        self.stations = {}
+        self.measures = {}
+
+        for reference, label, lat, long, measures in KNOWN_STATIONS:
+            self.add_station(reference, label, lat, long, measures)
+
+        lats = rng.uniform(*BOUNDS[0], size = n_stations)
+        longs = rng.uniform(*BOUNDS[1], size = n_stations)
+
+        for idx in range(n_stations):
+
+            parameter, qualifier, unit = STATION_TYPES[idx % len(STATION_TYPES)][0]
+            measures = [ (parameter, qualifier, unit, None) for _ in range(measures_per_station) ]
+
+            self.add_station(f'SYN{idx:05d}', f'Synthetic Station {idx}', round(float(lats[idx]), 6), round(float(longs[idx]), 6), measures)
+
+        self.station_references = list(self.stations)
+        self.station_lats = np.array([ self.stations[reference]['lat'] for reference in self.station_references ])
+        self.station_longs = np.array([ self.stations[reference]['long'] for reference in self.station_references ])
+
+        # flood areas sit next to half of the stations, a fraction of them have a flood in force
+        self.flood_areas = []
+        self.floods = []
+
+        ''' polygons of the flood areas keyed by notation, drawn from their own generator so stations and floods do not change '''
+        self.polygons = {}
+        shape_rng = np.random.default_rng([seed, 1])
+
+        for idx, reference in enumerate(self.station_references[::2]):
+
+            station = self.stations[reference]
+            notation = f'{idx:03d}FW{reference}'
+
+            area = {'@id' : f'{ROOT_URL}id/floodAreas/{notation}',
+                    'notation' : notation,
+                    'fwdCode' : notation,
+                    'label' : f'Flood area near {station["label"]}',
+                    'county' : 'Synthetic',
+                    'riverOrSea' : 'Synthetic River',
+                    'lat' : round(station['lat'] + float(rng.normal(scale = 0.002)), 6),
+                    'long' : round(station['long'] + float(rng.normal(scale = 0.002)), 6),
+                    'polygon' : f'{ROOT_URL}id/floodAreas/{notation}/polygon'}
+
+            self.flood_areas.append(area)
+            self.polygons[notation] = self.area_polygon(area['lat'], area['long'], shape_rng)
+
+            if rng.random() < flood_fraction:
+
+                severity_level = int(rng.integers(1, 4))
+
+                self.floods.append({'@id' : f'{ROOT_URL}id/floods/{notation}',
+                                    'description' : area['label'],
+                                    'eaAreaName' : 'Synthetic',
+                                    'floodAreaID' : notation,
+                                    'floodArea' : {'@id' : area['@id'], 'county' : area['county'], 'notation' : notation,
+                                                   'polygon' : area['polygon'], 'riverOrSea' : area['riverOrSea']},
+                                    'isTidal' : False,
+                                    'message' : '',
+                                    'severity' : ['Severe Flood Warning', 'Flood Warning', 'Flood Alert'][severity_level - 1],
+                                    'severityLevel' : severity_level,
+                                    'timeMessageChanged' : '2025-06-05T00:00:00',
+                                    'timeRaised' : '2025-06-05T00:00:00',
+                                    'timeSeverityChanged' : '2025-06-05T00:00:00'})
+
+        self.area_index = PolygonIndex([ parse_polygon(self.polygons[area['notation']]) for area in self.flood_areas ])
+
+    @staticmethod
+    def area_polygon(lat : float, long : float, rng : np.random.Generator, n_vertices : int = 12) -> dict:
+
+        '''
+        irregular polygon a few km across around a flood area's centre, as the GeoJSON FeatureCollection served by
+        id/floodAreas/{notation}/polygon
+        '''
+
+        angles = np.linspace(0, 2 * np.pi, n_vertices, endpoint = False)
+        radii = rng.uniform(1.5, 4.0, size = n_vertices) / KM_PER_DEGREE
+
+        lats = lat + radii * np.sin(angles)
+        longs = long + radii * np.cos(angles) / np.cos(np.radians(lat))
+
+        ring = [ [round(float(long_), 6), round(float(lat_), 6)] for lat_, long_ in zip(lats, longs) ]
+
+        return {'type' : 'FeatureCollection',
+                'features' : [{'type' : 'Feature', 'properties' : {},
+                               'geometry' : {'type' : 'MultiPolygon', 'coordinates' : [[ring + ring[:1]]]}}]}
+
+    def add_station(self, reference : str, label : str, lat : float, long : float, measures : list) -> None:
+
+        ''' adds a station with measures given as (parameter, qualifier, unit, notation) tuples, notation may be None '''
+
+        items = []
+
+        for idx, (parameter, qualifier, unit, notation) in enumerate(measures):
+
+            if notation is None:
+                notation = f'{reference}-{parameter}-{slug(qualifier)}-i-15_min-{slug(unit)}' + (f'-{idx}' if idx and
+                           (parameter, qualifier) == measures[0][:2] else '')
+
+            measure = {'@id' : f'{ROOT_URL}id/measures/{notation}',
+                       'label' : f'{label} - {parameter}-{slug(qualifier)}-Instantaneous-{unit}',
+                       'notation' : notation,
+                       'parameter' : parameter,
+                       'parameterName' : parameter.title(),
+                       'period' : self.period,
+                       'qualifier' : qualifier,
+                       'station' : f'{ROOT_URL}id/stations/{reference}',
+                       'stationReference' : reference,
+                       'unitName' : unit,
+                       'valueType' : 'instantaneous'}
+
+            self.measures[notation] = measure
+            items.append(measure)
+
+        self.stations[reference] = {'@id' : f'{ROOT_URL}id/stations/{reference}',
+                                    'label' : label,
+                                    'lat' : lat,
+                                    'long' : long,
+                                    'notation' : reference,
+                                    'stationReference' : reference,
+                                    'measures' : items}
+
+    '''
+    readings
+    '''
+
+    def values(self, notation : str, seconds : np.ndarray) -> np.ndarray:
+
+        ''' reading values of a measure at times given in seconds since the epoch '''
+
+        seed = zlib.crc32(notation.encode())
+        parameter = self.measures[notation]['parameter']
+
+        base = {'temperature' : 10.0, 'flow' : 20.0}.get(parameter, 1.0) + (seed % 100) / 50
+        amplitude = 2.0 if 'Tidal' in self.measures[notation]['qualifier'] else 0.5
+        period = 44712.0 if 'Tidal' in self.measures[notation]['qualifier'] else 86400.0
+
+        return np.round(base + amplitude * np.sin(2 * np.pi * seconds / period + seed % 628 / 100), 3)
+
+    def reading_times(self, params : dict) -> np.ndarray:
+
+        '''
+        times (seconds since the epoch, newest first) of the readings requested by the params of a readings query:
+        latest, since, date or startdate/enddate (today if none are given), never later than the current time
+        '''
+
+        now = int(self.clock()) // self.period * self.period
+
+        if 'latest' in params:
+            return np.array([now])
+
+        def day_start(date):
+            return int(np.datetime64(date, 's').astype(np.int64))
+
+        if 'since' in params:
+            start, end = int(np.datetime64(params['since'].rstrip('Z'), 's').astype(np.int64)), now
+        elif 'date' in params:
+            start = day_start(params['date'])
+            end = start + 86399
+        elif 'startdate' in params:
+            start = day_start(params['startdate'])
+            end = day_start(params.get('enddate', params['startdate'])) + 86399
+        else:
+            start = now // 86400 * 86400
+            end = now
+
+        first = -(-start // self.period) * self.period
+        last = min(end, now)
+
+        return np.arange(last // self.period * self.period, first - 1, -self.period)
+
+    def reading_rows(self, notations : list[str], params : dict) -> tuple[list[str], list[str], list[float]]:
+
+        ''' (dateTime, measure url, value) columns of the readings of measures, newest first, after _offset and _limit '''
+
+        seconds = self.reading_times(params)
+        offset = int(params.get('_offset', 0))
+        limit = min(int(params.get('_limit', self.row_limit)), self.row_limit)
+
+        timestamps = np.char.add(np.datetime_as_string(seconds.astype('datetime64[s]'), unit = 's'), 'Z')
+
+        if len(notations) == 1:
+            times, measures = timestamps, np.full(len(seconds), notations[0], dtype = object)
+            values = self.values(notations[0], seconds)
+        else:
+            times = np.repeat(timestamps, len(notations))
+            measures = np.tile(np.array(notations, dtype = object), len(seconds))
+            values = np.concatenate([ self.values(notation, seconds)[:, None] for notation in notations ], axis = 1).ravel() \
+                     if notations else np.array([])
+
+        rows = slice(offset, offset + limit)
+
+        return times[rows].tolist(), [ ROOT_URL + 'id/measures/' + notation for notation in measures[rows] ], values[rows].tolist()
+
+    def readings_response(self, notations : list[str], params : dict, csv : bool) -> str:
+
+        times, measures, values = self.reading_rows(notations, params)
+
+        if csv:
+            return 'dateTime,measure,value\n' + ''.join( f'{date_time},{measure},{value}\n' for date_time, measure, value in zip(times, measures, values) )
+
+        items = [ {'@id' : f'{measure}/readings/{date_time}', 'dateTime' : date_time, 'measure' : measure, 'value' : value}
+                  for date_time, measure, value in zip(times, measures, values) ]
+
+        return json.dumps({'items' : items})
+
+    def latest_reading(self, notation : str) -> dict:
+
+        now = int(self.clock()) // self.period * self.period
+        date_time = str(np.datetime64(now, 's')) + 'Z'
+
+        return {'@id' : f'{ROOT_URL}data/readings/{notation}/{date_time}',
+                'date' : date_time[:10],
+                'dateTime' : date_time,
+                'measure' : f'{ROOT_URL}id/measures/{notation}',
+                'value' : float(self.values(notation, np.array([now]))[0])}
+
+    '''
+    stations, measures and floods
+    '''
+
+    @staticmethod
+    def page(items : list, params : dict) -> list:
+
+        offset = int(params.get('_offset', 0))
+
+        return items[offset:offset + int(params['_limit'])] if '_limit' in params else items[offset:]
+
+    def near(self, lats : np.ndarray, longs : np.ndarray, params : dict) -> np.ndarray:
+
+        ''' mask of positions within dist km of lat, long, all positions if they are not given '''
+
+        if 'lat' not in params or 'long' not in params:
+            return np.ones(len(lats), dtype = bool)
+
+        return distance_km(float(params['lat']), float(params['long']), lats, longs) <= float(params.get('dist', 1))
+
+    def station_items(self, params : dict) -> list:
+
+        if 'stationReference' in params:
+            station = self.stations.get(params['stationReference'])
+            return [] if station is None else [station]
+
+        stations = [ self.stations[reference] for reference, near in zip(self.station_references, self.near(self.station_lats, self.station_longs, params))
+                     if near ]
+
+        for key in ['parameter', 'qualifier']:
+            if key in params:
+                stations = [ station for station in stations if any(measure[key] == params[key] for measure in station['measures']) ]
+
+        return self.page(stations, params)
+
+    def measure_items(self, params : dict) -> list:
+
+        if 'stationReference' in params:
+            station = self.stations.get(params['stationReference'])
+            measures = [] if station is None else station['measures']
+        else:
+            measures = list(self.measures.values())
+
+        if 'parameter' in params:
+            measures = [ measure for measure in measures if measure['parameter'] == params['parameter'] ]
+
+        return [ dict(measure, latestReading = self.latest_reading(measure['notation'])) for measure in self.page(measures, params) ]
+
+    def near_areas(self, params : dict) -> list[dict]:
+
+        ''' flood areas whose polygon is within dist km of lat, long, all areas if they are not given '''
+
+        if 'lat' not in params or 'long' not in params:
+            return list(self.flood_areas)
+
+        indices = self.area_index.near(float(params['lat']), float(params['long']), float(params.get('dist', 1)))
+
+        return [ self.flood_areas[idx] for idx in indices ]
+
+    def flood_items(self, params : dict) -> list:
+
+        areas = { area['notation'] for area in self.near_areas(params) }
+
+        floods = [ flood for flood in self.floods if flood['floodAreaID'] in areas ]
+
+        if 'min-severity' in params:
+            floods = [ flood for flood in floods if flood['severityLevel'] <= int(params['min-severity']) ]
+
+        return self.page(floods, params)
+
+    def flood_area_items(self, params : dict) -> list:
+
+        return self.page(self.near_areas(params), params)
+
+    def respond(self, path : str, params : dict) -> tuple[int, str, str]:
+
+        '''
+        answers a query (relative to the API root, e.g. id/stations) with its params, returning the status code,
+        content type and body of the response
+        '''
+
+        csv = path.endswith('.csv')
+        parts = path.removesuffix('.csv').strip('/').split('/')
+
+        def found(items):
+            return 200, 'application/json', json.dumps({'meta' : {'limit' : params.get('_limit')}, 'items' : items})
+
+        not_found = (404, 'application/json', json.dumps({'items' : []}))
+
+        if parts[:1] != ['id'] or len(parts) < 2:
+            return not_found
+
+        resource, rest = parts[1], parts[2:]
+
+        if rest and rest[-1] == 'readings':
+
+            if resource == 'measures' and rest[0] in self.measures:
+                notations = [rest[0]]
+            elif resource == 'stations' and rest[0] in self.stations:
+                notations = [ measure['notation'] for measure in self.stations[rest[0]]['measures'] ]
+            else:
+                return not_found
+
+            return 200, 'text/csv' if csv else 'application/json', self.readings_response(notations, params, csv)
+
+        if resource == 'stations':
+            if rest:
+                return not_found if rest[0] not in self.stations else found(self.stations[rest[0]])
+            return found(self.station_items(params))
+
+        if resource == 'measures':
+            if rest:
+                return not_found if rest[0] not in self.measures else found(dict(self.measures[rest[0]], latestReading = self.latest_reading(rest[0])))
+            return found(self.measure_items(params))
+
+        if resource == 'floods':
+            return found(self.flood_items(params))
+
+        if resource == 'floodAreas':
+            if rest[1:] == ['polygon']:
+                return not_found if rest[0] not in self.polygons else (200, 'application/json', json.dumps(self.polygons[rest[0]]))
+            if rest:
+                areas = [ area for area in self.flood_areas if area['notation'] == rest[0] ]
+                return not_found if not areas else found(areas[0])
+            return found(self.flood_area_items(params))
+
+        return not_found
+
+
+class StandInServer:
+
+    '''
+    Local HTTP server standing in for the flood monitoring API, serving recorded responses (see replay.RecordingTransport)
+    and answering every other query from a SyntheticNetwork. Point the library at it with
+
+        with StandInServer(latency = 0.05) as server:
+            set_transport(HTTPTransport(base_url = server.base_url))
+
+    Inputs:
+
+        network [SyntheticNetwork] - network answering queries, a default SyntheticNetwork if None
+        latency [float]            - seconds every response is delayed by
+        recordings [dict]          - recorded responses keyed by request (see replay.request_key), served instead of the network
+        host [str]                 - address to listen on
+        port [int]                 - port to listen on, 0 picks a free port
+    '''
+
+    def __init__(self,
+                 network : SyntheticNetwork | None = None,
+                 latency : float = 0.0,
+                 recordings : dict | None = None,
+                 host : str = '127.0.0.1',
+                 port : int = 0) -> None:
+
+        self.network = network if network is not None else SyntheticNetwork()
+        self.latency = latency
+        self.recordings = recordings or {}
+
+        self.requests = 0
+        self._lock = threading.Lock()
+
+        self._server = ThreadingHTTPServer((host, port), self.handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+
+        host, port = self._server.server_address[:2]
+
+        return f'http://{host}:{port}/flood-monitoring/'
+
+    def respond(self, path : str, params : dict) -> tuple[int, str, str]:
+
+        with self._lock:
+            self.requests += 1
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        recording = self.recordings.get(request_key(path, params))
+
+        if recording is not None:
+            return recording['status_code'], 'application/json', recording['text']
+
+        return self.network.respond(path, params)
+
+    def handler(self):
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            protocol_version = 'HTTP/1.1'
+
+            # headers and body are written separately, without TCP_NODELAY each response waits on a delayed ACK
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+
+                url = urlparse(self.path)
+                path = url.path.removeprefix('/flood-monitoring/')
+                params = { key : values[-1] for key, values in parse_qs(url.query, keep_blank_values = True).items() }
+
+                status, content_type, body = server.respond(path, params)
+                body = body.encode()
+
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'StandInServer':
+
+        if self._thread is None:
+            self._thread = threading.Thread(target = self._server.serve_forever, daemon = True)
+            self._thread.start()
+
+        return self
+
+    def stop(self) -> None:
+
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+
+        self._server.server_close()
+
+    def __enter__(self) -> 'StandInServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
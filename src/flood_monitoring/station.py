@@ -1,15 +1,51 @@
 from abc import ABC
 
-import requests 
 import datetime 
-
-import matplotlib.pyplot as plt 
-from matplotlib.figure import Figure
-from matplotlib.axes import Axes 
+import logging 
+import warnings 
 
 from dataclasses import dataclass 
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time 
+from typing import TYPE_CHECKING 
 import numpy as np 
+from requests import RequestException
+
+from .transport import get_transport
+from .store import ReadingsStore, get_readings_store
+from .metadata_cache import MetadataCache, get_metadata_cache
+from .readings import Readings
+from .timestamps import parse_timestamps, format_timestamps
+from .instrumentation import Metrics, RequestEvent, endpoint, get_metrics, phase, response_retries, timed
+
+'''
+matplotlib is only imported when a plot is drawn, so importing the package stays fast for code which never plots
+'''
+if TYPE_CHECKING: 
+	from matplotlib.figure import Figure 
+
+
+logger = logging.getLogger('flood_monitoring') 
+
+
+class ReadingsTruncatedWarning(UserWarning): 
+
+	''' warning raised when a readings response reaches the maximum number of rows returned by the API ''' 
+
+
+class RequestError(Exception): 
+
+	''' raised by make_request when the API answers with a status code other than 200 ''' 
+
 
+class ReadingsTruncatedError(Exception): 
+
+	''' raised when a station wide readings response reaches its row limit, so some readings are missing ''' 
+
+
+''' errors after which a single station wide request is replaced by a request per measure '''
+FALLBACK_ERRORS = (RequestError, ReadingsTruncatedError, RequestException) 
 
 
 class FloodMonitoringMixin: 
@@ -38,24 +74,35 @@ class FloodMonitoringMixin:
 	def convert_to_datetime(date: str):
 		return datetime.datetime.strptime(date , '%Y-%m-%dT%H:%M:%SZ')
 
+	'''
+	vectorised counterparts of convert_to_datetime and format_date which parse and format whole arrays 
+	of timestamps at once (see timestamps.py) 
+	'''
+	parse_timestamps = staticmethod(parse_timestamps) 
+	format_timestamps = staticmethod(format_timestamps) 
+
 	@staticmethod
 	def make_request(query : str,
 					 params : dict  = {},
-					 return_json = True ) -> dict | str:
+					 return_json = True,
+					 timeout : float | tuple | None = None ) -> dict | str:
 
 		'''
-		Function to send and process a requests using the python requests library.
-		Query string, parameter dictionary and return_json flag are passed to the function. 
+		Function to send and process a requests using the shared transport (see transport.py), which keeps 
+		connections to the API alive and retries failed requests. Query string, parameter dictionary, 
+		return_json flag and an optional timeout overriding the transports default are passed to the function. 
 		'''
 
-		base_url = 'https://environment.data.gov.uk/flood-monitoring/' 
-		query = base_url + query 
+		metrics = get_metrics() 
 
-		response = requests.get(query, params = params) 
+		if metrics is not None: 
+			return FloodMonitoringMixin.make_instrumented_request(metrics, query, params, return_json, timeout) 
+
+		response = get_transport().get(query, params = params, timeout = timeout) 
 
 		'''raising an exception if the status_code is not 200 (successful request) '''
 		if response.status_code != 200: 
-			raise Exception(f'Invalid Query, status code : {response.status_code}')
+			raise RequestError(f'Invalid Query, status code : {response.status_code}')
 		
 		
 		if return_json: 
@@ -63,6 +110,59 @@ class FloodMonitoringMixin:
 		
 		return response.text
 
+	@staticmethod
+	def make_instrumented_request(metrics : Metrics,
+								  query : str,
+								  params : dict = {},
+								  return_json = True,
+								  timeout : float | tuple | None = None ) -> dict | str:
+
+		'''
+		make_request when metrics are installed (see instrumentation.py). Runs the pre and post request hooks and records 
+		the latency, status, size, retries and number of rows decoded of the request, timing the fetch and parse phases. 
+		'''
+
+		event = RequestEvent(query = query, params = dict(params or {}), endpoint = endpoint(query)) 
+		metrics.before_request(query, event.params) 
+
+		start = time.perf_counter() 
+
+		try: 
+			with metrics.phase('fetch'): 
+				response = get_transport().get(query, params = params, timeout = timeout) 
+
+			event.seconds = time.perf_counter() - start 
+			event.status_code = response.status_code 
+			event.retries = response_retries(response) 
+
+			content = getattr(response, 'content', None) 
+			event.bytes = len(content) if isinstance(content, bytes) else len(response.text.encode()) 
+
+			if response.status_code != 200: 
+				raise RequestError(f'Invalid Query, status code : {response.status_code}')
+
+			with metrics.phase('parse'): 
+
+				if return_json: 
+					result = response.json() 
+					items = result.get('items') if isinstance(result, dict) else None 
+					event.rows = len(items) if isinstance(items, list) else int(items is not None) 
+
+				else: 
+					result = response.text 
+					# every line but the header is a row, the last line may not end with a newline 
+					event.rows = max(result.count('\n') + (not result.endswith('\n')) - 1, 0) if result else 0 
+
+			return result 
+
+		except Exception as error: 
+			event.error = error 
+			event.seconds = event.seconds or time.perf_counter() - start 
+			raise 
+
+		finally: 
+			metrics.after_request(event) 
+
 	@staticmethod
 	def validate_date_range(date_range : list | None ,
 						    return_str : bool = True  ) -> list[datetime.datetime] | list[str] : 
@@ -136,31 +236,68 @@ class FloodMonitoringMixin:
 		return label_format 
 
 
-	def get_readings(self,
-				measure_notation : str,
-				date_range : list[datetime.datetime] | None  = None, 
-				limit : int | None = None, 
-				csv : bool =  False) -> dict | str: 
-		
+	'''
+	maximum number of requests sent concurrently when a method fetches data for several measures 
+	'''
+	max_workers : int = 8 
+
+	'''
+	maximum number of rows the API returns in a single readings response 
+	'''
+	api_row_limit : int = 10000 
+
+	@staticmethod
+	def map_concurrently(function, 
+						 items : list, 
+						 max_workers : int = 8 ) -> tuple[list, dict]: 
+
 		'''
-		Creating a get readings helper funciton, which returns readings for a particular measure
-		provided a date_range and a record limit. Also with the option to return results as a csv for analysis 
+		calls function on every item using a bounded thread pool, so requests for several measures are 
+		sent at the same time rather than one after another. 
 
 		Inputs: 
 
-			measure_notation [str] - id/notation of particular measure you wish to retrieve readings for 
-			date_range [list]      - range of dates to retreive the readings for 
-			limit [int]            - maximum number of readings returned
-			csv [bool]             - if True will return results of query in csv format otherwise JSON 
+			function [callable] - function called with each item 
+			items [list]        - items to call the function on 
+			max_workers [int]   - maximum number of threads used 
 
 		Output: 
-			result [dict | str] - returns results as either a JSON object or a CSV string. 
+
+			results [list] - return values in the same order as items, None where the call raised an exception 
+			errors [dict]  - exceptions raised keyed by the index of the item which raised them 
 		'''
 
+		results, errors = [None] * len(items), {} 
+
+		def call(idx): 
+			try: 
+				results[idx] = function(items[idx]) 
+			except Exception as error: 
+				errors[idx] = error 
+
+		if len(items) <= 1 or max_workers <= 1: 
+			for idx in range(len(items)): 
+				call(idx) 
+
+			return results, errors 
+
+		with ThreadPoolExecutor(min(max_workers, len(items))) as executor: 
+			list(executor.map(call, range(len(items)))) 
+
+		return results, errors 
+
+	@classmethod
+	def readings_query(cls,
+				measure_notation : str,
+				date_range : list | None  = None, 
+				limit : int | None = None, 
+				csv : bool =  False) -> tuple[str, dict, bool]: 
 
 		'''
-		adjusting the query and params to the functions inputs
+		builds the query, params and return_json flag used to request readings for a measure, shared by 
+		get_readings and the async client so both send identical requests. 
 		'''
+
 		params= {}
 		query = f'id/measures/{measure_notation}/readings'
 		return_json = True 
@@ -172,14 +309,279 @@ class FloodMonitoringMixin:
 		if limit: 
 			params['_limit'] = limit 
 
-		date_range_= self.validate_date_range(date_range, return_str = True )
+		date_range_= cls.validate_date_range(date_range, return_str = True )
 
 		params['startdate'] = date_range_[0]
 		params['enddate'] = date_range_[1] 	
 
+		return query, params, return_json 
+
+	@timed('get_readings')
+	def get_readings(self,
+				measure_notation : str,
+				date_range : list[datetime.datetime] | None  = None, 
+				limit : int | None = None, 
+				csv : bool =  False, 
+				as_readings : bool = False) -> dict | str | Readings: 
+		
+		'''
+		Creating a get readings helper funciton, which returns readings for a particular measure
+		provided a date_range and a record limit. Also with the option to return results as a csv for analysis 
+
+		Inputs: 
+
+			measure_notation [str] - id/notation of particular measure you wish to retrieve readings for 
+			date_range [list]      - range of dates to retreive the readings for 
+			limit [int]            - maximum number of readings returned
+			csv [bool]             - if True will return results of query in csv format otherwise JSON 
+			as_readings [bool]     - if True the CSV response is parsed into a columnar Readings object (see readings.py) 
+
+		Output: 
+			result [dict | str | Readings] - returns results as either a JSON object, a CSV string or a Readings object. 
+		'''
+
+		if as_readings: 
+			return Readings.from_csv(self.request_readings(measure_notation, date_range, limit, csv = True ), measure_notation ) 
+
+		return self.request_readings(measure_notation, date_range, limit, csv ) 
+
+	def request_readings(self,
+					  measure_notation : str,
+					  date_range : list[datetime.datetime] | None  = None, 
+					  limit : int | None = None, 
+					  csv : bool =  False) -> dict | str: 
+
+		'''
+		requests the readings returned by get_readings as JSON or a CSV string, not timed itself so the 
+		get_readings phase is only observed once when the response is parsed into Readings 
+		'''
+
+		'''
+		if a readings store has been set (see store.py) readings are answered from it and only the days 
+		missing from the store are requested 
+		'''
+		store = get_readings_store() 
+
+		if store is not None and not limit: 
+			return self.readings_from_store(store, measure_notation, date_range, csv) 
+
+		query, params, return_json = self.readings_query(measure_notation, date_range, limit, csv) 
+
 		result = self.make_request(query, params , return_json ) 
 
+		'''
+		the API caps the number of rows in a response, reaching the cap without asking for a limit means the 
+		readings have almost certainly been truncated, iter_readings should be used for such date ranges 
+		'''
+		if not limit and self.row_count(result, return_json) >= self.api_row_limit: 
+			warnings.warn(f'{self.api_row_limit} readings returned for {measure_notation}, the response may have been truncated. '
+						   'Use iter_readings to page through long date ranges', ReadingsTruncatedWarning, stacklevel = 2 ) 
+
 		return result 
+
+	@classmethod
+	def split_date_range(cls, 
+						 date_range : list | None, 
+						 window_days : int ) -> list[list[str]]: 
+
+		'''
+		splits a date range into consecutive windows of at most window_days days, the windows do not overlap 
+		as startdate and enddate are both inclusive 
+		'''
+
+		if window_days < 1: 
+			raise Exception('window_days must be at least 1') 
+
+		start, end = cls.validate_date_range(date_range, return_str = False ) 
+
+		windows = [] 
+
+		while start <= end: 
+			window_end = min(start + datetime.timedelta(days = window_days - 1), end) 
+			windows.append([start.strftime('%Y-%m-%d'), window_end.strftime('%Y-%m-%d')]) 
+			start = window_end + datetime.timedelta(days = 1) 
+
+		return windows 
+
+	def get_readings_windowed(self, 
+							  measure_notation : str, 
+							  date_range : list | None = None, 
+							  window_days : int = 7, 
+							  max_workers : int | None = None, 
+							  csv : bool = False ) -> dict | str: 
+
+		'''
+		Retrieves the readings for a long date range by splitting it into windows of window_days days which are 
+		requested concurrently with get_readings, rather than sending one large request. Readings repeated at the 
+		window boundaries are removed and the result is returned in time order, in the same format as get_readings. 
+
+		Inputs: 
+
+			measure_notation [str] - id/notation of particular measure you wish to retrieve readings for 
+			date_range [list]      - range of dates to retreive the readings for 
+			window_days [int]      - number of days requested in each request 
+			max_workers [int]      - maximum number of windows requested at once, defaults to max_workers 
+			csv [bool]             - if True will return results of query in csv format otherwise JSON 
+		'''
+
+		windows = self.split_date_range(date_range, window_days) 
+
+		responses, errors = self.map_concurrently(lambda window : self.get_readings(measure_notation, date_range = window, csv = csv ), 
+												 windows, 
+												 max_workers or self.max_workers ) 
+
+		''' a partial backfill would silently leave gaps so the first failed window is raised '''
+		if errors: 
+			raise errors[min(errors)] 
+
+		if csv: 
+			return self.merge_csv(responses) 
+
+		readings = {} 
+		for response in responses: 
+			readings.update({ item.get('dateTime') : item for item in response['items'] }) 
+
+		return {'items' : [ readings[date_time] for date_time in sorted(readings) ] } 
+
+	@staticmethod
+	def merge_csv(responses : list[str]) -> str: 
+
+		''' merges CSV readings responses into one, removing repeated timestamps and sorting by time '''
+
+		header, rows = None, {} 
+
+		for response in responses: 
+
+			lines = response.strip('\n').split('\n') 
+			header = header or lines[0] 
+
+			# the timestamp is the first column of each row 
+			rows.update({ line.split(',', 1)[0].strip() : line for line in lines[1:] if line }) 
+
+		return '\n'.join([header or 'dateTime,measure,value'] + [ rows[date_time] for date_time in sorted(rows) ]) + '\n' 
+
+	@staticmethod
+	def row_count(result : dict | str, return_json : bool = True ) -> int: 
+
+		''' number of readings in a JSON or CSV readings response '''
+
+		if return_json: 
+			return len(result['items']) 
+
+		return max(result.count('\n', 0, len(result.rstrip('\n'))), 0) 
+
+	def iter_readings(self, 
+					  measure_notation : str, 
+					  date_range : list | None = None, 
+					  page_size : int = 2000, 
+					  as_readings : bool = False ): 
+
+		'''
+		Generator which pages through the readings of a measure with the _limit and _offset parameters, yielding 
+		each page as a list of readings (newest first). Unlike get_readings the number of readings is not capped by 
+		the API and only one page is held in memory at a time. 
+
+		Inputs: 
+
+			measure_notation [str] - id/notation of particular measure you wish to retrieve readings for 
+			date_range [list]      - range of dates to retreive the readings for 
+			page_size [int]        - number of readings requested per page, at most api_row_limit 
+			as_readings [bool]     - if True pages are requested as CSV and yielded as Readings objects 
+
+		Yields: 
+			items [list | Readings] - readings in the same format as get_readings()['items'], or a Readings object 
+		'''
+
+		page_size = min(page_size, self.api_row_limit) 
+
+		query, params, return_json = self.readings_query(measure_notation, date_range, csv = as_readings ) 
+		params.update({'_sorted' : '', '_limit' : page_size }) 
+
+		offset, previous_page = 0, None 
+
+		while True: 
+
+			params['_offset'] = offset 
+			response = self.make_request(query, dict(params), return_json ) 
+
+			'''
+			readings arriving while paging shift later rows to the next page, these duplicates are removed 
+			by comparing against the timestamps of the previous page 
+			'''
+			if as_readings: 
+				items = Readings.from_csv(response, measure_notation ) 
+				page = items if previous_page is None else items.exclude(previous_page) 
+				timestamps = items.times 
+
+			else: 
+				items = response['items'] 
+				page = [ item for item in items if item.get('dateTime') not in (previous_page or ()) ] 
+				timestamps = { item.get('dateTime') for item in items } 
+
+			if len(page): 
+				yield page 
+
+			if len(items) < page_size: 
+				return 
+
+			offset += page_size 
+			previous_page = timestamps 
+
+	@staticmethod
+	def contiguous_runs(days : list[datetime.date]) -> list[tuple[datetime.date, datetime.date]]: 
+
+		''' groups a sorted list of days into (first, last) tuples of consecutive days '''
+
+		runs = [] 
+
+		for day in days: 
+			if runs and (day - runs[-1][1]).days == 1: 
+				runs[-1] = (runs[-1][0], day) 
+			else: 
+				runs.append((day, day)) 
+
+		return runs 
+
+	def readings_from_store(self, 
+							store : ReadingsStore, 
+							measure_notation : str, 
+							date_range : list | None = None, 
+							csv : bool = False ) -> dict | str: 
+
+		'''
+		Answers a readings request from the readings store. Settled days missing from the store (see ReadingsStore) 
+		are requested in as few requests as possible (one per run of consecutive missing days) and marked complete, 
+		readings for the current day and days which have not settled yet are topped up with the since parameter. 
+		The result has the same format as get_readings. 
+		'''
+
+		start, end = [ date.date() for date in self.validate_date_range(date_range, return_str = False ) ] 
+
+		# timestamps returned by the API are in UTC, so days start and end in UTC 
+		now = datetime.datetime.now(datetime.timezone.utc) 
+		today = now.date() 
+
+		''' readings for recent days may still arrive late, they are only requested in full once they have settled '''
+		unsettled = store.first_unsettled_day(now) 
+
+		missing = [ day for day in store.missing_days(measure_notation, start, end) if day < unsettled ] 
+
+		for first, last in self.contiguous_runs(missing): 
+
+			for page in self.iter_readings(measure_notation, [first.isoformat(), last.isoformat()], page_size = self.api_row_limit ): 
+				store.insert(measure_notation, page) 
+
+			store.mark_complete(measure_notation, [ day for day in missing if first <= day <= last ]) 
+
+		if start <= today and end >= unsettled: 
+
+			first = max(start, unsettled) 
+			since = store.latest_timestamp(measure_notation, first, today) or f'{first.isoformat()}T00:00:00Z' 
+
+			response = self.make_request(f'id/measures/{measure_notation}/readings', {'since' : since }) 
+			store.insert(measure_notation, response['items']) 
+
+		return store.to_response(measure_notation, store.readings(measure_notation, start, end), csv) 
 	
 	@dataclass 
 	class measure_dclass:
@@ -216,6 +618,18 @@ class station(ABC, FloodMonitoringMixin) :
 	'''
 
 	
+	def metadata_query(self) -> tuple[str, dict]: 
+
+		''' query and params used to request the stations metadata '''
+
+		return 'id/stations', {'stationReference' : self.station_id} 
+
+	def measures_query(self) -> tuple[str, dict]: 
+
+		''' query and params used to request all measures available at the station '''
+
+		return 'id/measures', {'stationReference' : self.station_id} 
+
 	def get_station_metadata(self) -> dict: 
 
 		'''
@@ -223,10 +637,28 @@ class station(ABC, FloodMonitoringMixin) :
 		about the monitoring station inc posisiton, name etc. 
 		'''
 
-		query = 'id/stations' 
-		params = {'stationReference' : self.station_id} 
+		cache = get_metadata_cache() 
+		response = None if cache is None else cache.stations.get(self.station_id) 
 
-		response = self.make_request(query, params, return_json = True )['items'] 
+		if response is None: 
+
+			query, params = self.metadata_query() 
+
+			response = self.validate_metadata(self.make_request(query, params, return_json = True )) 
+
+			if cache is not None: 
+				cache.stations.set(self.station_id, response) 
+
+		return response 
+
+	@staticmethod
+	def validate_metadata(response : dict) -> list: 
+
+		'''
+		returns the items of an id/stations response, raising an exception if there are none 
+		'''
+
+		response = response['items'] 
 
 		# if items is empty its likely that the stationID Queried for doesnt exist 	
 		if response == []: 
@@ -251,7 +683,19 @@ class station(ABC, FloodMonitoringMixin) :
 
 		pass 
 
+	def apply_metadata(self, response : list) -> None: 
 
+		'''
+		setting latitude,longitude as private attributes from the output of get_station_metadata
+		'''
+
+		lat,long = self.parse_position(response) 
+
+		self.__lat = lat 
+		self.__long = long 
+
+
+	@timed('set_measures')
 	def set_measures(self) -> None:  
 
 		'''
@@ -260,10 +704,63 @@ class station(ABC, FloodMonitoringMixin) :
 		TidalLevel station by specifying 'Tidal Level' as the parameter. 
 		'''
 
-		query = 'id/measures'
-		params = {'stationReference' : self.station_id} 
+		self.apply_measures(self.get_measures()) 
+
+	def get_measures(self) -> dict: 
+
+		'''
+		returns the id/measures response for the station, from the metadata cache (see metadata_cache.py) when 
+		one has been set 
+		'''
+
+		cache = get_metadata_cache() 
+
+		if cache is None: 
+			query, params = self.measures_query() 
+			return self.make_request(query = query , params = params  )
+
+		return self.cached_measures(cache) 
+
+	def cached_measures(self, cache : MetadataCache) -> dict: 
+
+		'''
+		returns the id/measures response for the station using the metadata cache. The measure catalogue and latest 
+		readings are cached separately, if only the latest readings have expired they are refreshed with the station 
+		wide readings endpoint. 
+		'''
+
+		catalogue = cache.measures.get(self.station_id) 
+		latest = cache.latest.get(self.station_id) 
+
+		if catalogue is not None and latest is None: 
+
+			try: 
+				readings = self.make_request(*self.station_readings_query(latest = True ))['items'] 
+				latest = { item['measure'].rsplit('/', 1)[-1] : item for item in readings if 'measure' in item } 
+				cache.latest.set(self.station_id, latest) 
 
-		response = self.make_request(query = query , params = params  )['items']
+			except FALLBACK_ERRORS as error: 
+				logger.info('latest readings of station %s could not be requested, requesting its measures instead: %s', self.station_id, error) 
+				catalogue = None 
+
+		if catalogue is None: 
+
+			query, params = self.measures_query() 
+			catalogue, latest = cache.split_measures(self.make_request(query = query , params = params  )) 
+
+			cache.measures.set(self.station_id, catalogue) 
+			cache.latest.set(self.station_id, latest) 
+
+		return cache.join_measures(catalogue, latest) 
+
+	def apply_measures(self, response : dict) -> None: 
+
+		'''
+		filters the measures in an id/measures response by the stations parameter and qualifiers and sets the
+		measures, data and timestamps attributes. 
+		'''
+
+		response = response['items'] 
 
 		measures, data, timestamps = [], [] , [] 
 
@@ -318,50 +815,166 @@ class station(ABC, FloodMonitoringMixin) :
 		self.data = data
 		self.timestamps = timestamps 
 
-	def __init__(self, station_id : str , 
-					   parameter :str = '' , 
-					   qualifier : list[str] | None = None,
-					   measure_type: str = '' ): 
+	def load(self) -> None: 
 
+		'''
+		retrieves the station metadata and measures from the API, child classes extend this to load any 
+		additional state. Use hydrate() rather than calling load directly. 
+		'''
 
+		response = self.get_station_metadata() 
 
-		self.station_id = station_id 
-		self.parameter = parameter 
-		self.qualifier = qualifier 
-		self.measure_type = measure_type 
+		self.apply_metadata(response) 
+
+		'''
+		setting the measures depending on the station_id supplied, as well as the qualifer and
+		parameter which are used to filter which measures are set. 
+		'''
+		self.set_measures() 
+
+	def hydrate(self) -> 'station': 
 
 		'''
-		retrieving station metadata using the station_id supplied 
+		Loads the station from the API if it has not been loaded yet, this also validates the station_id. 
+		Lazily created stations are hydrated automatically the first time latitude, longitude, measures, data, 
+		timestamps (or in_flood for RiverLevel stations) are accessed. Safe to call from several threads, the 
+		station is only loaded once. 
 		'''
 
-		response = self.get_station_metadata() 
+		if self._hydrated: 
+			return self 
 
-		lat,long = self.parse_position(response) 
+		with self._hydration_lock: 
+
+			''' load reads attributes of the station while it is being loaded, which must not hydrate it again '''
+			if self._hydrated or self._hydrating: 
+				return self 
+
+			self._hydrating = True 
+
+			try: 
+				self.load() 
+				self._hydrated = True 
+
+			finally: 
+				self._hydrating = False 
+
+		return self 
+
+	def mark_hydrated(self) -> None: 
+
+		''' marks a lazily created station as loaded after its state has been set with the apply_* methods '''
+
+		self._hydrated = True 
+
+	@property 
+	def hydrated(self) -> bool: 
+		return self._hydrated 
+
+	@classmethod 
+	def hydrate_many(cls, 
+					 stations : list, 
+					 max_workers : int = 8 ) -> dict: 
 
 		'''
-		setting latitude,longitude as private attributes 
+		hydrates many lazily created stations concurrently, returns the exceptions raised keyed by station_id 
 		'''
-		self.__lat = lat 
-		self.__long = long 
+
+		_, errors = cls.map_concurrently(lambda station_ : station_.hydrate(), stations, max_workers ) 
+
+		return { stations[idx].station_id : error for idx, error in errors.items() } 
+
+	def __init__(self, station_id : str , 
+					   parameter :str = '' , 
+					   qualifier : list[str] | None = None,
+					   measure_type: str = '', 
+					   lazy : bool = False ): 
 
 		'''
-		setting the measures depending on the station_id supplied, as well as the qualifer and
-		parameter which are used to filter which measures are set. 
+		if lazy is True no requests are sent during initialisation and the station_id is not validated until the 
+		station is hydrated, either on first access of its attributes or by calling hydrate(). 
 		'''
-		self.set_measures() 
+
+		self.station_id = station_id 
+		self.parameter = parameter 
+		self.qualifier = qualifier 
+		self.measure_type = measure_type 
+
+		''' attributes loaded from the API, None until the station has been hydrated '''
+		self.__lat = None 
+		self.__long = None 
+		self._measures = None 
+		self._data = None 
+		self._timestamps = None 
+
+		self._hydrated = False 
+		self._hydrating = False 
+		self._hydration_lock = threading.RLock() 
+
+		if not lazy: 
+			self.hydrate() 
+
+	def __getstate__(self) -> dict: 
+
+		''' locks cannot be pickled so the hydration lock is recreated when a station is unpickled '''
+
+		state = self.__dict__.copy() 
+		del state['_hydration_lock'] 
+
+		return state 
+
+	def __setstate__(self, state : dict) -> None: 
+
+		self.__dict__.update(state) 
+		self._hydration_lock = threading.RLock() 
 
 	'''
 	defining getter methods using the @property decorator so that both 
-	the latitude and longitude of a sation are read only 
+	the latitude and longitude of a sation are read only, accessing an attribute which has not been 
+	loaded yet hydrates lazily created stations 
 	'''
 
 	@property
 	def latitude(self) -> float:
+		if self.__lat is None: 
+			self.hydrate() 
 		return self.__lat
 
 	@property 
 	def longitude(self) -> float: 
+		if self.__long is None: 
+			self.hydrate() 
 		return self.__long 
+
+	@property 
+	def measures(self) -> list: 
+		if self._measures is None: 
+			self.hydrate() 
+		return self._measures 
+
+	@measures.setter 
+	def measures(self, measures : list) -> None: 
+		self._measures = measures 
+
+	@property 
+	def data(self) -> list: 
+		if self._data is None: 
+			self.hydrate() 
+		return self._data 
+
+	@data.setter 
+	def data(self, data : list) -> None: 
+		self._data = data 
+
+	@property 
+	def timestamps(self) -> list: 
+		if self._timestamps is None: 
+			self.hydrate() 
+		return self._timestamps 
+
+	@timestamps.setter 
+	def timestamps(self, timestamps : list) -> None: 
+		self._timestamps = timestamps 
 	
 
 	def __str__(self) -> str: 
@@ -370,30 +983,136 @@ class station(ABC, FloodMonitoringMixin) :
 		ovewriting the __str__ method such that a summary of the station type is returned when the object is printed. 
 		'''
 
-		return f'\n----Station Summary----\n\nStation Type : {self.measure_type}\nStation ID : {self.station_id}\nLocation : {(self.__lat, self.__long)}\n\n-----Summary Ended-----\n'
+		return f'\n----Station Summary----\n\nStation Type : {self.measure_type}\nStation ID : {self.station_id}\nLocation : {(self.latitude, self.longitude)}\n\n-----Summary Ended-----\n'
+
+
+	'''
+	maximum number of rows requested from the station wide readings endpoint, if a response reaches this limit 
+	it may have been truncated and the readings are requested per measure instead. 
+	'''
+	station_readings_limit : int = 10000 
+
+	def station_readings_query(self, 
+							   date_range : list | None = None, 
+							   latest : bool = False ) -> tuple[str, dict]: 
+
+		'''
+		query and params used to request the readings of every measure at the station in a single request, 
+		either the latest reading of each measure or all readings within the date range. 
+		'''
+
+		query = f'id/stations/{self.station_id}/readings' 
+
+		if latest: 
+			return query + '?latest', {} 
+
+		date_range_ = self.validate_date_range(date_range, return_str = True ) 
+
+		params = {'startdate' : date_range_[0], 'enddate' : date_range_[1], '_limit' : self.station_readings_limit } 
+
+		return query, params 
+
+	def get_station_readings(self, 
+							 date_range : list | None = None, 
+							 latest : bool = False ) -> dict: 
+
+		'''
+		Retrieves the readings for all of the stations measures with a single request and splits the rows by measure. 
+
+		Inputs: 
+
+			date_range [list] - range of dates to retreive the readings for 
+			latest [bool]     - if True only the latest reading of each measure is returned and date_range is ignored 
+
+		Output: 
+
+			readings [dict] - dictionary keyed by measure notation storing each measures readings in the same format 
+							  returned by get_readings i.e. {'items' : [...]} 
+		'''
+
+		query, params = self.station_readings_query(date_range, latest) 
+
+		items = self.make_request(query, params)['items'] 
+
+		if not latest and len(items) >= self.station_readings_limit: 
+			raise ReadingsTruncatedError('Station readings truncated, too many readings in date range') 
+
+		readings = { measure.notation : {'items' : [] } for measure in self.measures } 
+
+		for item in items: 
+
+			# measure is the full url of the measure, the notation is the last segment 
+			notation = item.get('measure', '').rsplit('/', 1)[-1] 
+
+			if notation in readings: 
+				readings[notation]['items'].append(item) 
+
+		return readings 
+
+	def get_measure_readings(self, 
+							 date_range : list | None = None, 
+							 limit : int | None = None, 
+							 latest : bool = False ) -> list: 
+
+		'''
+		Returns the readings of each measure in self.measures (in the same order) using one station wide request. 
+		If a limit per measure is required, or the station wide request fails or is truncated, the readings are requested 
+		per measure concurrently instead and the error of the station wide request is stored in station_readings_error. 
+		Measures whose request failed are None and their errors are stored in measure_errors. 
+		'''
+
+		self.measure_errors = {} 
+		self.station_readings_error = None 
+
+		if limit is None: 
+			try: 
+				readings = self.get_station_readings(date_range = date_range, latest = latest ) 
+				return [ readings[measure.notation] for measure in self.measures ] 
+
+			except FALLBACK_ERRORS as error: 
+				self.station_readings_error = error 
+				logger.info('station wide readings of %s failed, requesting %d measures individually: %s', self.station_id, len(self.measures), error) 
 
+		if latest: 
+			limit = 1 
+
+		responses, errors = self.map_concurrently(lambda measure : self.get_readings(measure.notation, date_range = date_range, limit = limit ), 
+												 self.measures, 
+												 self.max_workers ) 
+
+		self.measure_errors = { self.measures[idx].notation : error for idx, error in errors.items() } 
+
+		return responses 
 
 	def get_latest_measurement(self, limit : int = 1 ) -> dict:
 
-		''' Returns a dictionary which stores the latest measurements from a particular station type '''
+		''' 
+		Returns a dictionary which stores the latest measurements from a particular station type. The latest readings 
+		of every measure are retrieved with a single request (see get_measure_readings), measures without a reading 
+		are set to None and any exceptions raised while requesting them are stored in measure_errors. 
+		'''
+
+		if limit == 1: 
+			responses = self.get_measure_readings(latest = True ) 
+		else: 
+			responses = self.get_measure_readings(limit = limit ) 
 
 		latest_measurements = {}
 
-		for measure in self.measures: 
-			measure_notation = measure.notation
+		for measure, response in zip(self.measures, responses): 
 
 			try:
-				reading = self.get_readings(measure_notation, limit = limit  )['items'][0]['value'] 
+				reading = response['items'][0]['value'] 
 		
-			except: 
+			except (TypeError, KeyError, IndexError): 
 				reading = None 
 
-			latest_measurements[measure_notation] = reading
+			latest_measurements[measure.notation] = reading
 
 		return latest_measurements
 	
 
-	def plot_data(self) -> tuple[Figure, np.ndarray ]: 
+	def plot_data(self) -> tuple['Figure', np.ndarray ]: 
 
 		'''
 
@@ -410,6 +1129,8 @@ class station(ABC, FloodMonitoringMixin) :
 			(fig, ax) - Returns fig, ax tuple which stores our plot 
 
 		'''
+		import matplotlib.pyplot as plt 
+
 		current_measures  = [ *zip(self.measures, self.data , self.timestamps) ] 
 		mask = [*map( lambda x: None not in  x  , current_measures ) ] 
 
@@ -420,41 +1141,52 @@ class station(ABC, FloodMonitoringMixin) :
 			raise Exception('No Readings data available for station at the point of initialisation ')
 
 
-		fig, ax = plt.subplots(len(filtered_measures)) 
+		''' only drawing the figure is timed as the render phase, not requesting the readings '''
+		with phase('render'): 
 
-		ax = np.array([ax]) if len(filtered_measures) == 1 else  ax 
+			fig, ax = plt.subplots(len(filtered_measures)) 
 
-		# Iterating through each of the measures with values and plotting the results. 
+			ax = np.array([ax]) if len(filtered_measures) == 1 else  ax 
 
-		for idx, ( measure, value, time ) in enumerate(filtered_measures):
-			if value == None or time == None: 
-				continue 
+			# Iterating through each of the measures with values and plotting the results. 
+
+			for idx, ( measure, value, timestamp ) in enumerate(filtered_measures):
+				if value == None or timestamp == None: 
+					continue 
 
-			ax[idx].bar( self.format_date(time, "%H:%M" ) , value, width = 0.2 )
+				ax[idx].bar( self.format_date(timestamp, "%H:%M" ) , value, width = 0.2 )
 
-			ax[idx].set_ylabel(measure.units)   
+				ax[idx].set_ylabel(measure.units)   
 
-			ax[idx].set_xlabel('time') 
+				ax[idx].set_xlabel('time') 
 
-			ax[idx].set_title(f'{measure.notation}') 
+				ax[idx].set_title(f'{measure.notation}') 
 
 
-		plt.suptitle(f'{self.measure_type}@{self.station_id}') 
-		plt.tight_layout() 
+			plt.suptitle(f'{self.measure_type}@{self.station_id}') 
+			plt.tight_layout() 
 
 		return (fig, ax )
 
 	def plot_data_range(self,
-					 	date_range : list | None = None ) -> tuple[Figure, np.ndarray]:
+					 	date_range : list | None = None, 
+					 	downsample : str | None = 'minmax', 
+					 	max_points : int | None = None ) -> tuple['Figure', np.ndarray]:
 
 		''' 
 		plot_date_range will plot all values for all of the measures for a particular measure station between a user
 		specified date_range provided they are available. By default if no date range is specified then all readings
 		from the current day will be requested from the API and plotted. 
 
+		Long series are downsampled before plotting as an axis cannot show more than one value per pixel column. 
+		With 'minmax' the lowest and highest reading of each pixel column are kept so peaks remain visible, 'lttb' 
+		keeps max_points points following the shape of the series and None plots every reading. 
+
 		
 		Inputs:
 			date_range [list] - date range to plot measures over 
+			downsample [str]  - downsampling method, 'minmax', 'lttb' or None 
+			max_points [int]  - number of points each measure is reduced to, twice the width of the figure in pixels by default 
 
 		Returns: 
 
@@ -463,6 +1195,8 @@ class station(ABC, FloodMonitoringMixin) :
 		'''
 
 
+		import matplotlib.pyplot as plt 
+
 		available_readings = []
 
 
@@ -475,24 +1209,29 @@ class station(ABC, FloodMonitoringMixin) :
 
 		''' 
 		
-		iterating through all measures attached to the class and retrieving all of the readings
-		within the date range specified, if the readings are none for particular measures then they 
-		are excluded from the plot 
+		retrieving the readings within the date range specified for all measures attached to the class 
+		(see get_measure_readings), if the readings are none for particular measures or the request fails then they 
+		are excluded from the plot and the error is stored in measure_errors 
 		
 		'''
 
-		for idx, measure in enumerate(self.measures):
+		responses = self.get_measure_readings(date_range = date_range ) 
 
-			measure_notation = measure.notation
-			response = self.get_readings(measure_notation= measure_notation, date_range = date_range)
+		''' if every request failed there is nothing to plot so the first error is raised '''
+		if self.measure_errors and len(self.measure_errors) == len(self.measures): 
+			raise next(iter(self.measure_errors.values())) 
 
-			values = [ reading['value'] for reading in response['items'] ] 
-			times = [ reading['dateTime'] for reading in response['items'] ]
+		for measure, response in zip(self.measures, responses):
 
-			#if both values and times are avaialble for a given measure append to available readings
-			if values != [] and times != []:
+			if response is None: 
+				continue 
+
+			readings = Readings.from_json(response, measure.notation ).sorted() 
+
+			#if readings are avaialble for a given measure append to available readings
+			if len(readings) > 0:
 
-				available_readings.append({'measure' : measure , 'values' : values, 'times' : times  } ) 
+				available_readings.append({'measure' : measure , 'readings' : readings } ) 
 		
 
 		''' In the case that there are no readings available for any of an objects methods
@@ -502,43 +1241,55 @@ class station(ABC, FloodMonitoringMixin) :
 
 			raise Exception('No Readings data available for station and date_range')
 
-		'''
-		Creating as many subplots as available readings and plotting them
-		'''
-		fig, ax = plt.subplots(len(available_readings)) 
+		''' only drawing the figure is timed as the render phase, not requesting the readings '''
+		with phase('render'): 
+
+			'''
+			Creating as many subplots as available readings and plotting them
+			'''
+			fig, ax = plt.subplots(len(available_readings)) 
 
 		
-		''' to index list of axes, casting it to an array incase it happens to be a single axis '''
+			''' to index list of axes, casting it to an array incase it happens to be a single axis '''
+
+			ax = np.array([ax]) if len(available_readings) == 1 else  ax 
+
+			''' a minimum and maximum per pixel column ''' 
+			max_points = max_points or 2 * int(fig.get_figwidth() * fig.dpi) 
+
+			for idx, measure_reading in enumerate(available_readings): 
 
-		ax = np.array([ax]) if len(available_readings) == 1 else  ax 
+				readings = measure_reading['readings'] 
 
-		for idx, measure_reading in enumerate(available_readings): 
+				if downsample is not None: 
+					readings = readings.downsample(max_points, downsample) 
 
-			times = measure_reading['times']
-			values = measure_reading['values']
+				times = readings.times
+				values = readings.values
 
-			ax[idx].plot(times, values  )
+				''' plotting against a time axis, so gaps in the readings are shown to scale ''' 
+				ax[idx].plot(times, values  )
 
 			
-			''' splitting the date_range up into 10 time markers''' 
-			step_size =   int((len(times) / 10) ) 
+				''' splitting the date_range up into 10 time markers''' 
+				step_size =   int((len(times) / 10) ) 
 
-			if len(times) < 10: 
-				step_size = 1
+				if len(times) < 10: 
+					step_size = 1
 
-			'''transforming timetamps to the correct format '''
-			labels = [ self.format_date(date, label_format) for date in times[::step_size] ] 
+				'''transforming timetamps to the correct format '''
+				labels = self.format_timestamps(times[::step_size], label_format) 
 
 
-			ax[idx].set_xticks([*range(0, len(times), step_size ) ],labels  , rotation = 90 ) 
+				ax[idx].set_xticks(times[::step_size], labels  , rotation = 90 ) 
 
-			ax[idx].set_title(f'{measure_reading["measure"].notation}' ) 
+				ax[idx].set_title(f'{measure_reading["measure"].notation}' ) 
 
-			ax[idx].set_ylabel(measure_reading["measure"].units) 
+				ax[idx].set_ylabel(measure_reading["measure"].units) 
 
 
-		fig.suptitle(f'{self.measure_type}@{self.station_id}') 
-		fig.supxlabel('time')
+			fig.suptitle(f'{self.measure_type}@{self.station_id}') 
+			fig.supxlabel('time')
 
 		return fig, ax 
 	
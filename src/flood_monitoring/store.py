@@ -0,0 +1,166 @@
+import datetime
+import sqlite3
+import threading
+
+
+MEASURE_URL = 'http://environment.data.gov.uk/flood-monitoring/id/measures/'
+
+
+class ReadingsStore:
+
+    '''
+    On disk store of readings backed by SQLite, keyed by measure notation and timestamp.
+
+    Alongside the readings the store records which days have been downloaded in full for each measure.
+    Once a day is marked complete get_readings answers requests for it from the store without sending a request.
+    Readings often reach the API hours after they were taken, so a day is only marked complete once settle_period
+    has passed since it ended (in UTC). Until then the day is treated like the current day and topped up using the
+    API's since parameter.
+
+    Inputs:
+
+        path [str]                    - path of the SQLite database, ':memory:' keeps the store in memory for the lifetime of the object
+        settle_period [timedelta]     - time after the end of a day before its readings are assumed to be final
+    '''
+
+    def __init__(self, path : str = ':memory:', settle_period : datetime.timedelta = datetime.timedelta(days = 1)) -> None:
+
+        self.path = path
+        self.settle_period = settle_period
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread = False)
+
+        with self._lock, self._connection:
+
+            if path != ':memory:':
+                self._connection.execute('PRAGMA journal_mode = WAL')
+
+            self._connection.execute('''CREATE TABLE IF NOT EXISTS readings (
+                                            measure TEXT NOT NULL,
+                                            date_time TEXT NOT NULL,
+                                            value REAL,
+                                            PRIMARY KEY (measure, date_time)) WITHOUT ROWID''')
+
+            self._connection.execute('''CREATE TABLE IF NOT EXISTS coverage (
+                                            measure TEXT NOT NULL,
+                                            day TEXT NOT NULL,
+                                            PRIMARY KEY (measure, day)) WITHOUT ROWID''')
+
+    def close(self) -> None:
+
+        with self._lock:
+            self._connection.close()
+
+    def complete_days(self, measure_notation : str, start : datetime.date, end : datetime.date) -> set[datetime.date]:
+
+        ''' returns the days between start and end (inclusive) which have been downloaded in full '''
+
+        with self._lock:
+            rows = self._connection.execute('SELECT day FROM coverage WHERE measure = ? AND day BETWEEN ? AND ?',
+                                            (measure_notation, start.isoformat(), end.isoformat())).fetchall()
+
+        return { datetime.date.fromisoformat(day) for day, in rows }
+
+    def missing_days(self, measure_notation : str, start : datetime.date, end : datetime.date) -> list[datetime.date]:
+
+        ''' returns the days between start and end (inclusive) which are not stored in full, in order '''
+
+        complete = self.complete_days(measure_notation, start, end)
+        n_days = (end - start).days + 1
+
+        return [ day for day in (start + datetime.timedelta(days = i) for i in range(n_days)) if day not in complete ]
+
+    def first_unsettled_day(self, now : datetime.datetime) -> datetime.date:
+
+        ''' the first day which has not been over for settle_period at now (a timezone aware UTC datetime), earlier days are final '''
+
+        return (now - self.settle_period).date()
+
+    def mark_complete(self, measure_notation : str, days : list[datetime.date]) -> None:
+
+        with self._lock, self._connection:
+            self._connection.executemany('INSERT OR IGNORE INTO coverage (measure, day) VALUES (?, ?)',
+                                         [(measure_notation, day.isoformat()) for day in days])
+
+    def insert(self, measure_notation : str, items : list[dict]) -> int:
+
+        '''
+        stores readings in the format returned by the API, readings without a numeric value are skipped.
+        Returns the number of readings stored.
+        '''
+
+        rows = [ (measure_notation, item['dateTime'], item['value']) for item in items
+                 if isinstance(item.get('value'), (int, float)) and 'dateTime' in item ]
+
+        with self._lock, self._connection:
+            self._connection.executemany('INSERT OR REPLACE INTO readings (measure, date_time, value) VALUES (?, ?, ?)', rows)
+
+        return len(rows)
+
+    def latest_timestamp(self, measure_notation : str, start : datetime.date, end : datetime.date) -> str | None:
+
+        ''' returns the latest timestamp stored for the measure between start and end (inclusive) '''
+
+        with self._lock:
+            row = self._connection.execute('SELECT MAX(date_time) FROM readings WHERE measure = ? AND date_time BETWEEN ? AND ?',
+                                           (measure_notation, *self.bounds(start, end))).fetchone()
+
+        return row[0]
+
+    def readings(self, measure_notation : str, start : datetime.date, end : datetime.date) -> list[tuple[str, float]]:
+
+        ''' returns the (dateTime, value) readings stored for the measure between start and end (inclusive) in time order '''
+
+        with self._lock:
+            return self._connection.execute('SELECT date_time, value FROM readings WHERE measure = ? AND date_time BETWEEN ? AND ? ORDER BY date_time',
+                                            (measure_notation, *self.bounds(start, end))).fetchall()
+
+    def clear(self, measure_notation : str | None = None) -> None:
+
+        ''' removes the readings and coverage of a measure, or of every measure if measure_notation is None '''
+
+        with self._lock, self._connection:
+            for table in ['readings', 'coverage']:
+                if measure_notation is None:
+                    self._connection.execute(f'DELETE FROM {table}')
+                else:
+                    self._connection.execute(f'DELETE FROM {table} WHERE measure = ?', (measure_notation,))
+
+    @staticmethod
+    def bounds(start : datetime.date, end : datetime.date) -> tuple[str, str]:
+
+        ''' timestamps bounding the days from start to end in the format used by the API '''
+
+        return f'{start.isoformat()}T00:00:00Z', f'{end.isoformat()}T23:59:59Z'
+
+    @staticmethod
+    def to_response(measure_notation : str, rows : list[tuple[str, float]], csv : bool = False) -> dict | str:
+
+        ''' formats stored readings the same way the API returns them, either as JSON or as a CSV string '''
+
+        measure = MEASURE_URL + measure_notation
+
+        if csv:
+            lines = ['dateTime,measure,value'] + [ f'{date_time},{measure},{value}' for date_time, value in rows ]
+            return '\n'.join(lines) + '\n'
+
+        return {'items' : [ {'dateTime' : date_time, 'measure' : measure, 'value' : value} for date_time, value in rows ]}
+
+
+'''
+the store used by get_readings, None (the default) disables the store and every request is sent to the API
+'''
+
+_readings_store = None
+
+
+def get_readings_store() -> ReadingsStore | None:
+    return _readings_store
+
+
+def set_readings_store(store : ReadingsStore | None) -> None:
+
+    ''' sets the store used by get_readings, passing None disables it '''
+
+    global _readings_store
+    _readings_store = store
@@ -1,5 +1,7 @@
 from .station import station 
 
+import numpy as np 
+
 class Temperature(station):
 
 	'''
@@ -7,13 +9,13 @@ class Temperature(station):
 
 	'''
 
-	def __init__(self, station_id : str ) -> None :
+	def __init__(self, station_id : str, lazy : bool = False ) -> None :
 
 		'''
 		initialising Temperature station by passing 'temperature' as a parameter and setting measure_type to 'Temperature'
 		'''
 
-		super().__init__(station_id, parameter = 'temperature', qualifier = [], measure_type = 'Temperature' ) 
+		super().__init__(station_id, parameter = 'temperature', qualifier = [], measure_type = 'Temperature', lazy = lazy ) 
 
 
 	def average_temp(self, date_range : list | None = None ) -> float :
@@ -35,8 +37,20 @@ class Temperature(station):
 
 		measure_notation = self.measures[0].notation
 
-		response = self.get_readings(measure_notation= measure_notation, date_range=date_range ) 
+		''' 
+		paging through the readings and keeping a running total and count, so long date ranges 
+		are processed without holding every reading in memory 
+		'''
+		total, count = 0, 0 
+
+		for page in self.iter_readings(measure_notation= measure_notation, date_range=date_range, as_readings = True ): 
+
+			values = page.values[~np.isnan(page.values)] 
+
+			total += float(values.sum()) 
+			count += len(values) 
 
-		values = [ reading['value'] for reading in response['items']] 
+		if count == 0: 
+			raise Exception('No Readings data available for station and date_range') 
 
-		return sum(values) / len(values)  
\ No newline at end of file
+		return total / count 
@@ -6,14 +6,14 @@ class TidalLevel(station):
 	TidalLevel station which inherits from the station class
 	'''
 
-	def __init__(self, station_id : str) -> None:  
+	def __init__(self, station_id : str, lazy : bool = False) -> None:  
 
 		'''
 		Initialising a Tidal Level station by passing 'level' as a paramter and 'Tidal Level' as a qualifer.
 		measure_type is set to the station type 'Tidal Level' 
 		'''
 
-		super().__init__(station_id, parameter = 'level', qualifier = ['Tidal Level'] , measure_type = 'Tidal Level')  
+		super().__init__(station_id, parameter = 'level', qualifier = ['Tidal Level'] , measure_type = 'Tidal Level', lazy = lazy)  
 
 	def calculate_tidal_range(self, date_range : list | None  = None )-> float: 
 
@@ -31,12 +31,19 @@ class TidalLevel(station):
 		'''
 
 		measure_notation = self.measures[0].notation 
-		response = self.get_readings(measure_notation=measure_notation, date_range = date_range ) 
 
-		values = [ reading['value'] for reading in response['items']] 
-	
-		return max(values) - min(values) 
+		''' 
+		paging through the readings and keeping a running minimum and maximum, so long date ranges 
+		are processed without holding every reading in memory 
+		'''
+		highest, lowest = None, None 
 
+		for page in self.iter_readings(measure_notation=measure_notation, date_range = date_range, as_readings = True ): 
 
-      
+			highest = page.max() if highest is None else max(highest, page.max()) 
+			lowest = page.min() if lowest is None else min(lowest, page.min()) 
 
+		if highest is None: 
+			raise Exception('No Readings data available for station and date_range') 
+	
+		return highest - lowest
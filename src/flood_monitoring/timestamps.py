@@ -0,0 +1,53 @@
+import numpy as np
+
+
+'''
+offsets into the minute resolution ISO string ('%Y-%m-%d %H:%M') of the label formats produced by
+FloodMonitoringMixin.configure_units, these can be formatted by slicing instead of calling strftime
+'''
+ISO_SUFFIX_FORMATS = {'%Y-%m-%d %H:%M' : 0,
+                      '%m-%d %H:%M' : 5,
+                      '%d %H:%M' : 8,
+                      '%H:%M' : 11}
+
+
+def parse_timestamps(timestamps) -> np.ndarray:
+
+    '''
+    parses an array of timestamps returned by the API (e.g. '2025-06-05T00:00:00Z') into a datetime64[ns] array
+    in a single vectorised call, surrounding whitespace and the trailing Z (all timestamps are UTC) are removed
+    '''
+
+    timestamps = np.asarray(timestamps)
+
+    if np.issubdtype(timestamps.dtype, np.datetime64):
+        return timestamps.astype('datetime64[ns]')
+
+    timestamps = np.char.rstrip(np.char.strip(timestamps.astype(str)), 'Z')
+
+    return timestamps.astype('datetime64[ns]')
+
+
+def format_timestamps(timestamps : np.ndarray, frmt : str) -> np.ndarray:
+
+    '''
+    formats an array of datetime64 timestamps as strings. Formats which are a suffix of '%Y-%m-%d %H:%M'
+    (those used for tick labels) are formatted without a Python call per timestamp.
+    '''
+
+    timestamps = parse_timestamps(timestamps)
+
+    if frmt not in ISO_SUFFIX_FORMATS:
+        return np.array([ timestamp.strftime(frmt) for timestamp in timestamps.astype('datetime64[us]').astype(object) ], dtype = str)
+
+    labels = np.char.replace(np.datetime_as_string(timestamps, unit = 'm'), 'T', ' ')
+
+    if len(labels) == 0:
+        return labels
+
+    start = ISO_SUFFIX_FORMATS[frmt]
+
+    # viewing each label as an array of characters so the prefix can be dropped from every label at once
+    characters = labels.view('U1').reshape(len(labels), -1)
+
+    return np.ascontiguousarray(characters[:, start:]).view(f'U{characters.shape[1] - start}').ravel()
@@ -0,0 +1,141 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+BASE_URL = 'https://environment.data.gov.uk/flood-monitoring/'
+
+
+class HTTPTransport:
+
+    '''
+    Transport used by FloodMonitoringMixin.make_request to talk to the flood monitoring API.
+
+    A single requests.Session is shared by every caller (and every thread) so that TCP/TLS
+    connections to the API are kept alive and reused from a connection pool rather than being
+    re-established for every request. Failed requests (connection errors, 429 and 5xx responses)
+    are retried with exponential backoff by urllib3 before the response is handed back.
+
+    Inputs:
+
+        base_url [str]          - url which every query is appended to
+        pool_size [int]         - maximum number of connections kept open to the API host
+        timeout [float | tuple] - default (connect, read) timeout in seconds for each request
+        retries [int]           - maximum number of retries for a single request
+        backoff_factor [float]  - backoff factor between retries, sleeps for backoff_factor * 2 ** (retry - 1) seconds
+        status_forcelist [tuple]- response status codes which trigger a retry
+    '''
+
+    def __init__(self,
+                 base_url : str = BASE_URL,
+                 pool_size : int = 10,
+                 timeout : float | tuple = (5, 30),
+                 retries : int = 3,
+                 backoff_factor : float = 0.5,
+                 status_forcelist : tuple = (429, 500, 502, 503, 504)) -> None:
+
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.status_forcelist = tuple(status_forcelist)
+
+        self._session = None
+        self._lock = threading.Lock()
+
+    def build_session(self) -> requests.Session:
+
+        '''
+        creates the session and mounts an adapter with the connection pool and retry policy
+        '''
+
+        retry = Retry(total = self.retries,
+                      connect = self.retries,
+                      read = self.retries,
+                      status = self.retries,
+                      backoff_factor = self.backoff_factor,
+                      status_forcelist = self.status_forcelist,
+                      allowed_methods = frozenset(['GET']),
+                      respect_retry_after_header = True,
+                      raise_on_status = False)
+
+        adapter = HTTPAdapter(pool_connections = 1,
+                              pool_maxsize = self.pool_size,
+                              max_retries = retry)
+
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
+        return session
+
+    @property
+    def session(self) -> requests.Session:
+
+        ''' the shared session, created on first use '''
+
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self.build_session()
+
+        return self._session
+
+    def get(self,
+            query : str,
+            params : dict | None = None,
+            timeout : float | tuple | None = None) -> requests.Response:
+
+        '''
+        sends a GET request for the query (relative to base_url) and returns the response object
+        '''
+
+        return self.session.get(self.base_url + query,
+                                params = params,
+                                timeout = timeout if timeout is not None else self.timeout)
+
+    def close(self) -> None:
+
+        ''' closes all pooled connections, a new session is created if the transport is used again '''
+
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+'''
+process wide transport shared by every station and forecast object. Any object implementing
+get(query, params, timeout) and returning a response with status_code, text and json() can be
+injected with set_transport, e.g. to route requests through a proxy or a test double.
+'''
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+
+    ''' returns the transport currently used by make_request, creating the default one if needed '''
+
+    global _transport
+
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = HTTPTransport()
+
+    return _transport
+
+
+def set_transport(transport) -> None:
+
+    ''' replaces the transport used by make_request, passing None restores the default transport '''
+
+    global _transport
+
+    with _transport_lock:
+        _transport = transport
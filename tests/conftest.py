@@ -0,0 +1,156 @@
+import json
+import os
+import threading
+
+import pytest
+
+from flood_monitoring import HTTPTransport, get_transport, set_transport
+from flood_monitoring.standin import StandInServer
+
+
+'''
+setting FLOOD_MONITORING_OFFLINE=1 runs the whole suite, including the tests written against the live API, against
+a local StandInServer. The transport is installed here rather than in a fixture as some test modules create stations
+when they are imported.
+'''
+if os.environ.get('FLOOD_MONITORING_OFFLINE'):
+    standin_server = StandInServer().start()
+    set_transport(HTTPTransport(base_url = standin_server.base_url))
+
+
+class FakeResponse:
+
+    ''' minimal stand in for requests.Response '''
+
+    def __init__(self, payload, status_code : int = 200):
+
+        self.payload = payload
+        self.status_code = status_code
+
+    @property
+    def text(self) -> str:
+
+        if isinstance(self.payload, str):
+            return self.payload
+
+        return json.dumps(self.payload)
+
+    def json(self):
+
+        if isinstance(self.payload, str):
+            return json.loads(self.payload)
+
+        return self.payload
+
+
+class FakeTransport:
+
+    '''
+    Transport which answers queries from registered routes instead of the live API. A route is either
+    a payload or a callable taking the request params and returning a payload (or a FakeResponse).
+    Every call is recorded in calls as a (query, params) tuple.
+    '''
+
+    def __init__(self):
+
+        self.routes = {}
+        self.stations = {}
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def add(self, query : str, payload) -> None:
+
+        self.routes[query] = payload
+
+    def get(self, query : str, params : dict | None = None, timeout = None) -> FakeResponse:
+
+        params = dict(params or {})
+
+        with self._lock:
+            self.calls.append((query, params))
+
+        if query not in self.routes:
+            return FakeResponse({'items' : []}, status_code = 404)
+
+        payload = self.routes[query]
+
+        if callable(payload):
+            payload = payload(params)
+
+        if isinstance(payload, FakeResponse):
+            return payload
+
+        return FakeResponse(payload)
+
+    def add_station(self,
+                    station_id : str,
+                    measures : list[dict],
+                    lat : float = 51.5,
+                    long : float = -0.1,
+                    floods : list | None = None) -> None:
+
+        '''
+        registers id/stations, id/measures and id/floods routes for a station, measures are dicts with
+        notation, parameter, qualifier and optionally latestReading
+        '''
+
+        stations = self.stations
+        stations[station_id] = {'lat' : lat, 'long' : long, 'stationReference' : station_id,
+                                'measures' : measures, 'floods' : floods or []}
+
+        def by_reference(key):
+            def route(params):
+                station = stations.get(params.get('stationReference'))
+                return {'items' : [] if station is None else station[key]}
+            return route
+
+        def metadata(params):
+            station = stations.get(params.get('stationReference'))
+            return {'items' : [] if station is None else [{'lat' : station['lat'], 'long' : station['long'],
+                                                           'stationReference' : params['stationReference']}]}
+
+        def floods(params):
+            items = [flood for station in stations.values() if (station['lat'], station['long']) == (params.get('lat'), params.get('long'))
+                     for flood in station['floods']]
+            return {'items' : items}
+
+        self.routes['id/stations'] = metadata
+        self.routes['id/measures'] = by_reference('measures')
+        self.routes['id/floods'] = floods
+
+    def count(self, query : str) -> int:
+
+        ''' number of requests sent for a given query '''
+
+        return sum(1 for call, _ in self.calls if call == query)
+
+
+def make_measure(notation : str,
+                 parameter : str = 'level',
+                 qualifier : str = 'Stage',
+                 value : float | None = 1.0,
+                 date_time : str | None = '2025-06-05T00:00:00Z') -> dict:
+
+    ''' builds an id/measures item in the format returned by the API '''
+
+    measure = {'notation' : notation, 'parameter' : parameter, 'qualifier' : qualifier, 'unitName' : 'm'}
+
+    if value is not None:
+        measure['latestReading'] = {'value' : value, 'dateTime' : date_time}
+
+    return measure
+
+
+@pytest.fixture
+def fake_transport():
+
+    ''' installs a FakeTransport for the duration of a test '''
+
+    previous = get_transport()
+
+    transport = FakeTransport()
+    set_transport(transport)
+
+    yield transport
+
+    set_transport(previous)
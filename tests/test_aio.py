@@ -0,0 +1,140 @@
+from flood_monitoring import AsyncFloodMonitoringClient, MetadataCache, RiverLevel, Temperature, set_metadata_cache
+
+import asyncio
+import pytest
+
+from conftest import make_measure
+
+
+@pytest.fixture
+def stations(fake_transport):
+
+    for idx in range(20):
+        fake_transport.add_station(f'S{idx}', [make_measure(f'S{idx}-level-stage', value = float(idx)),
+                                               make_measure(f'S{idx}-temperature', parameter = 'temperature', qualifier = 'Dry Bulb')])
+
+    fake_transport.add('id/measures/S0-level-stage/readings', {'items' : [{'value' : 3.2, 'dateTime' : '2025-06-05T00:00:00Z'}]})
+
+    return fake_transport
+
+
+def test_async_factory(stations):
+
+    ''' stations created by the async factories should match those created by the constructor '''
+
+    async def main():
+        async with AsyncFloodMonitoringClient() as client:
+            return await client.river_level('S3')
+
+    station = asyncio.run(main())
+
+    assert isinstance(station, RiverLevel)
+    assert (station.latitude, station.longitude) == (51.5, -0.1)
+    assert [measure.notation for measure in station.measures] == ['S3-level-stage']
+    assert station.data == [3.0]
+    assert isinstance(station.in_flood, bool)
+
+    ''' the async client should populate the station without the station loading itself '''
+    assert stations.count('id/stations') == 1
+    assert stations.count('id/measures') == 1
+
+
+def test_create_many(stations):
+
+    async def main():
+        async with AsyncFloodMonitoringClient(max_concurrency = 4) as client:
+            return await client.create_many(Temperature, [f'S{idx}' for idx in range(20)])
+
+    created = asyncio.run(main())
+
+    assert len(created) == 20
+    assert all(isinstance(station, Temperature) for station in created)
+    assert stations.count('id/stations') == 20
+
+
+def test_invalid_station(stations):
+
+    async def main():
+        async with AsyncFloodMonitoringClient() as client:
+            return await client.river_level('999')
+
+    with pytest.raises(Exception, match = 'Incorrect Station ID'):
+        asyncio.run(main())
+
+
+def test_bounded_concurrency(fake_transport):
+
+    ''' no more than max_concurrency requests should be in flight at once '''
+
+    import threading
+    import time
+
+    lock = threading.Lock()
+    in_flight = {'current' : 0, 'max' : 0}
+
+    def slow_route(params):
+        with lock:
+            in_flight['current'] += 1
+            in_flight['max'] = max(in_flight['max'], in_flight['current'])
+        time.sleep(0.01)
+        with lock:
+            in_flight['current'] -= 1
+        return {'items' : []}
+
+    fake_transport.add('id/measures/m/readings', slow_route)
+
+    async def main():
+        async with AsyncFloodMonitoringClient(max_concurrency = 3) as client:
+            await asyncio.gather(*[client.get_readings('m') for _ in range(12)])
+
+    asyncio.run(main())
+
+    assert in_flight['max'] <= 3
+
+
+def test_get_latest_measurement(stations):
+
+    async def main():
+        async with AsyncFloodMonitoringClient() as client:
+            station = await client.river_level('S0')
+            return await client.get_latest_measurement(station)
+
+    assert asyncio.run(main()) == {'S0-level-stage' : 3.2}
+
+
+def test_get_latest_measurement_lazy(stations, monkeypatch):
+
+    # loading the station itself would block the event loop
+    monkeypatch.setattr(RiverLevel, 'load', lambda self : pytest.fail('station loaded on the event loop'))
+
+    station = RiverLevel('S0', lazy = True)
+
+    async def main():
+        async with AsyncFloodMonitoringClient() as client:
+            return await client.get_latest_measurement(station)
+
+    assert asyncio.run(main()) == {'S0-level-stage' : 3.2}
+    assert station.hydrated
+
+
+def test_hydrate_once(stations):
+
+    set_metadata_cache(MetadataCache())
+
+    created = [ RiverLevel('S1', lazy = True), RiverLevel('S1', lazy = True) ]
+    created[0].hydrate()
+
+    async def main():
+        async with AsyncFloodMonitoringClient() as client:
+            await client.hydrate(created[0])
+            await client.hydrate(created[1])
+
+    try:
+        asyncio.run(main())
+    finally:
+        set_metadata_cache(None)
+
+    # the hydrated station sends no requests, the other reads its metadata and measures from the cache
+    assert stations.count('id/stations') == 1
+    assert stations.count('id/measures') == 1
+    assert created[1].hydrated and created[1].data == [1.0]
@@ -0,0 +1,93 @@
+from flood_monitoring import Forecast, Readings
+from flood_monitoring.backtest import backtest_series, run_backtest
+
+import numpy as np
+import pytest
+
+
+NOTATION = '1412-level-stage-i-15_min-m'
+MEASURE = f'http://environment.data.gov.uk/flood-monitoring/id/measures/{NOTATION}'
+
+
+def ar_readings(n_readings : int = 500, noise : float = 0.0, seed : int = 0, measure : str | None = None) -> Readings:
+
+    ''' 15 minute readings of an autoregressive series with known coefficients '''
+
+    rng = np.random.default_rng(seed)
+
+    values = np.zeros(n_readings)
+    values[:2] = [1.0, 2.0]
+    for idx in range(2, n_readings):
+        values[idx] = 0.6 * values[idx - 1] + 0.3 * values[idx - 2] + 0.5 + (rng.normal(scale = noise) if noise else 0.0)
+
+    times = np.datetime64('2025-06-01T00:00:00') + np.arange(n_readings) * np.timedelta64(15, 'm')
+
+    return Readings(times, values, measure)
+
+
+def test_backtest_series_shape():
+
+    metrics = backtest_series(ar_readings(noise = 0.1, measure = NOTATION), lag_features = [1, 2, 4], horizon = 3, n_origins = 5)
+
+    assert len(metrics) == 3 * 5 * 3
+    assert list(metrics['horizon'].unique()) == [1, 2, 3]
+    assert metrics['origin'].nunique() == 5
+    assert np.allclose(metrics['MSE'], (metrics['prediction'] - metrics['actual']) ** 2)
+
+    # the last origin leaves exactly horizon readings to compare against
+    assert metrics['origin'].max() == np.datetime64('2025-06-01T00:00:00') + np.timedelta64(15 * (500 - 3), 'm')
+
+
+@pytest.mark.parametrize('window', [None, 50])
+def test_backtest_recovers_noise_free_series(window):
+
+    metrics = backtest_series(ar_readings(), lag_features = [2], horizon = 4, n_origins = 3, window = window)
+
+    assert np.allclose(metrics['MAE'], 0.0, atol = 1e-6)
+
+
+def test_backtest_matches_single_fit():
+
+    ''' the forecast of an origin matches fitting the readings before it and forecasting with recursive_forecast '''
+
+    readings = ar_readings(noise = 0.1)
+    metrics = backtest_series(readings, lag_features = [3], horizon = 2, n_origins = 1)
+
+    origin = len(readings) - 2
+    X, y = Forecast.lag_matrix(readings.values[:origin], 3)
+    coefficients, intercepts = Forecast.solve_least_squares([X], [y])
+
+    expected = Forecast.recursive_forecast(coefficients[0, ::-1], intercepts[0], readings.values[origin - 3 : origin], 2)
+
+    assert np.allclose(metrics['prediction'], expected)
+
+
+def test_not_enough_readings():
+
+    with pytest.raises(Exception):
+        backtest_series(ar_readings(n_readings = 10), lag_features = [3], horizon = 4)
+
+
+def test_run_backtest_process_pool():
+
+    series = { f'measure-{idx}' : ar_readings(noise = 0.1, seed = idx) for idx in range(3) }
+
+    serial = run_backtest(series, [2, 3], max_workers = 1, horizon = 2, n_origins = 4)
+    parallel = run_backtest(series, [2, 3], max_workers = 2, horizon = 2, n_origins = 4)
+
+    assert set(serial['measure']) == set(series)
+    assert serial.equals(parallel)
+
+
+def test_forecast_backtest(fake_transport):
+
+    readings = ar_readings(n_readings = 200, noise = 0.1)
+    csv = 'dateTime,measure,value\n' + ''.join(f'{time}Z,{MEASURE},{value}\n'
+                                               for time, value in zip(np.datetime_as_string(readings.times, unit = 's'), readings.values))
+
+    fake_transport.add(f'id/measures/{NOTATION}/readings.csv', csv)
+
+    metrics = Forecast().backtest([NOTATION], ['2025-06-01', '2025-06-03'], lag_features = [2, 3], horizon = 4, n_origins = 5)
+
+    assert len(metrics) == 2 * 5 * 4
+    assert (metrics['measure'] == NOTATION).all()
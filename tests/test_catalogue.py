@@ -0,0 +1,150 @@
+from flood_monitoring import HTTPTransport, RiverFlow, RiverLevel, StationCatalogue, TidalLevel, Temperature, get_transport, set_transport
+from flood_monitoring.standin import StandInServer, SyntheticNetwork, distance_km
+
+import json
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope = 'module')
+def network() -> SyntheticNetwork:
+    return SyntheticNetwork(n_stations = 300, flood_fraction = 0.5)
+
+
+@pytest.fixture
+def server(network):
+
+    previous = get_transport()
+
+    with StandInServer(network) as server:
+        set_transport(HTTPTransport(base_url = server.base_url, retries = 0))
+        yield server
+
+    set_transport(previous)
+
+
+@pytest.fixture(scope = 'module')
+def catalogue(network) -> StationCatalogue:
+    return StationCatalogue(json.loads(network.respond('id/stations', {})[2])['items'])
+
+
+def brute_force(network : SyntheticNetwork, lat : float, long : float, parameter : str | None = None) -> tuple[list[str], np.ndarray]:
+
+    references = [ reference for reference in network.station_references
+                   if parameter is None or any(measure['parameter'] == parameter for measure in network.stations[reference]['measures']) ]
+
+    distances = distance_km(lat, long, np.array([ network.stations[reference]['lat'] for reference in references ]),
+                            np.array([ network.stations[reference]['long'] for reference in references ]))
+    order = np.argsort(distances, kind = 'stable')
+
+    return [ references[idx] for idx in order ], distances[order]
+
+
+def test_download(server, network : SyntheticNetwork):
+
+    catalogue = StationCatalogue.download()
+
+    assert len(catalogue) == len(network.stations)
+    assert 'F1906' in catalogue and 'missing' not in catalogue
+    assert server.requests == 1
+
+
+@pytest.mark.parametrize('parameter', [None, 'level', 'temperature'])
+def test_nearest(catalogue : StationCatalogue, network : SyntheticNetwork, parameter):
+
+    for lat, long in [(51.5, -0.1), (53.0, -2.0), (54.5, -3.0)]:
+
+        references, distances = catalogue.nearest(lat, long, n = 5, parameter = parameter, return_distance = True)
+        expected, expected_distances = brute_force(network, lat, long, parameter)
+
+        assert references == expected[:5]
+        np.testing.assert_allclose(distances, expected_distances[:5], rtol = 1e-3)
+
+    assert catalogue.nearest(51.5, -0.1, n = 10_000) == brute_force(network, 51.5, -0.1)[0]
+
+
+def test_within(catalogue : StationCatalogue, network : SyntheticNetwork):
+
+    expected, distances = brute_force(network, 52.5, -1.5, 'flow')
+
+    references = catalogue.within(52.5, -1.5, 60, parameter = 'flow')
+
+    assert references == [ reference for reference, distance in zip(expected, distances) if distance <= 60 ]
+    assert len(references) > 0
+    assert catalogue.within(52.5, -1.5, 0.001) == []
+
+
+def test_bbox(catalogue : StationCatalogue, network : SyntheticNetwork):
+
+    references = catalogue.bbox(51.0, -2.0, 52.0, 0.0, parameter = 'level')
+
+    expected = [ reference for reference in network.station_references
+                 if 51.0 <= network.stations[reference]['lat'] <= 52.0 and -2.0 <= network.stations[reference]['long'] <= 0.0
+                 and any(measure['parameter'] == 'level' for measure in network.stations[reference]['measures']) ]
+
+    assert references == expected
+
+
+def test_station_class_filter(catalogue : StationCatalogue):
+
+    # tidal level stations measure level, but are excluded from RiverLevel queries by their qualifier
+    references = catalogue.nearest(51.5, -0.1, n = 50, station_class = RiverLevel)
+
+    for reference in references:
+        assert any(measure[2] in ['Stage', 'Downstream Stage', 'Height'] for measure in catalogue.measures[catalogue.row(reference)])
+
+    assert catalogue.mask(station_class = TidalLevel).sum() < catalogue.mask(parameter = 'level').sum()
+
+
+def test_missing_positions():
+
+    catalogue = StationCatalogue([{'stationReference' : 'A', 'lat' : 51.0, 'long' : 0.0, 'measures' : []},
+                                  {'stationReference' : 'B', 'measures' : []},
+                                  {'stationReference' : 'C', 'lat' : [52.0, 52.1], 'long' : [0.0, 0.1], 'measures' : []}])
+
+    assert len(catalogue) == 3
+    assert catalogue.nearest(51.0, 0.0, n = 3) == ['A', 'C']
+    assert catalogue.position('C') == (52.0, 0.0)
+
+
+def test_create(server, network : SyntheticNetwork):
+
+    catalogue = StationCatalogue.download()
+
+    stations = catalogue.create_many(['F1906', '2928TH', 'E71524', '1412'])
+
+    assert [ type(station_) for station_ in stations ] == [RiverLevel, RiverFlow, TidalLevel, Temperature]
+    assert server.requests == 1
+
+    river_level = stations[0]
+
+    assert river_level.hydrated
+    assert (river_level.latitude, river_level.longitude) == (network.stations['F1906']['lat'], network.stations['F1906']['long'])
+    assert [ measure.notation for measure in river_level.measures ] == [ measure['notation'] for measure in network.stations['F1906']['measures']
+                                                                         if measure['qualifier'] in ['Stage', 'Downstream Stage', 'Height'] ]
+
+    # the flood status is not part of the catalogue, it is requested on first access
+    assert isinstance(river_level.in_flood, bool)
+    assert server.requests == 2
+
+
+def test_create_wrong_class(catalogue : StationCatalogue):
+
+    with pytest.raises(Exception, match = 'No measurments found'):
+        catalogue.create('1412', RiverLevel)
+
+    with pytest.raises(Exception, match = 'Incorrect Station ID'):
+        catalogue.create('missing')
+
+
+def test_save_load(catalogue : StationCatalogue, tmp_path):
+
+    path = tmp_path / 'catalogue.json'
+    catalogue.save(path)
+
+    loaded = StationCatalogue.load(path)
+
+    assert loaded.references.tolist() == catalogue.references.tolist()
+    assert loaded.measures == catalogue.measures
+    assert loaded.nearest(52.0, -1.0, n = 3) == catalogue.nearest(52.0, -1.0, n = 3)
@@ -0,0 +1,147 @@
+from flood_monitoring import HTTPTransport, Readings, RiverLevel, get_transport, set_transport
+from flood_monitoring.downsample import downsample, lttb_indices, min_max_indices
+from flood_monitoring.standin import StandInServer, SyntheticNetwork
+
+import time
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+
+NOW = 1749081600    # 2025-06-05T00:00:00Z
+
+
+def river_series(n_values : int = 35_040, seed : int = 0) -> tuple[np.ndarray, np.ndarray]:
+
+    ''' a year of 15 minute river levels with a sharp flood peak lasting an hour '''
+
+    rng = np.random.default_rng(seed)
+
+    times = np.datetime64('2025-01-01T00:00:00', 'ns') + np.arange(n_values) * np.timedelta64(15, 'm')
+    values = 1.0 + 0.2 * np.sin(np.arange(n_values) * 2 * np.pi / 96) + rng.normal(scale = 0.01, size = n_values)
+    values[20_000:20_004] = [3.0, 4.5, 4.0, 3.2]
+
+    return times, values
+
+
+def test_min_max_keeps_peaks():
+
+    times, values = river_series()
+
+    indices = min_max_indices(values, 640)
+
+    assert len(indices) <= 2 * 640 + 2
+    assert (np.diff(indices) > 0).all()
+    assert indices[0] == 0 and indices[-1] == len(values) - 1
+
+    # the flood peak and the lowest reading are kept exactly
+    assert values[indices].max() == values.max() == 4.5
+    assert values[indices].min() == values.min()
+
+
+def test_min_max_gaps():
+
+    values = np.arange(1000, dtype = np.float64)
+    values[500:600] = np.nan
+
+    indices = min_max_indices(values, 50)
+
+    # buckets without readings keep a NaN so the plotted line is broken over the gap
+    assert np.isnan(values[indices]).sum() > 0
+    assert np.nanmax(values[indices]) == 999
+
+
+def test_short_series_unchanged():
+
+    values = np.arange(100, dtype = np.float64)
+
+    assert (min_max_indices(values, 50) == np.arange(100)).all()
+    assert (lttb_indices(np.arange(100), values, 100) == np.arange(100)).all()
+
+
+def test_lttb():
+
+    times, values = river_series()
+    x = (times - times[0]) / np.timedelta64(1, 's')
+
+    indices = lttb_indices(x, values, 1000)
+
+    assert len(indices) == 1000
+    assert (np.diff(indices) > 0).all()
+    assert indices[0] == 0 and indices[-1] == len(values) - 1
+
+    # the peak forms the largest triangle of its bucket
+    assert values[indices].max() == 4.5
+
+
+def test_lttb_straight_line():
+
+    # every point of a straight line forms an empty triangle, the first point of each bucket is kept
+    values = np.arange(10, dtype = np.float64)
+
+    assert lttb_indices(np.arange(10), values, 4).tolist() == [0, 1, 5, 9]
+
+
+def test_downsample_readings():
+
+    readings = Readings(*river_series(), measure = 'm')
+
+    downsampled = readings.downsample(1280)
+
+    assert downsampled.measure == 'm'
+    assert len(downsampled) <= 1282
+    assert downsampled.max() == readings.max()
+
+    with pytest.raises(Exception, match = 'Unknown downsampling method'):
+        downsample(readings.times, readings.values, 100, method = 'mean')
+
+
+def test_downsample_is_fast():
+
+    times, values = river_series()
+
+    start = time.perf_counter()
+    downsample(times, values, 1280)
+    downsample(times, values, 1280, method = 'lttb')
+
+    assert time.perf_counter() - start < 0.5
+
+
+@pytest.fixture
+def server():
+
+    previous = get_transport()
+
+    with StandInServer(SyntheticNetwork(n_stations = 0, clock = lambda : NOW)) as server:
+        set_transport(HTTPTransport(base_url = server.base_url, retries = 0))
+        yield server
+
+    set_transport(previous)
+
+
+@pytest.mark.parametrize('downsample_, max_points, expected', [('minmax', 200, range(150, 203)), ('lttb', 200, [200]), (None, None, [31 * 96])])
+def test_plot_data_range(server, downsample_, max_points, expected):
+
+    river_level = RiverLevel('F1906')
+
+    # 31 days of readings every 15 minutes
+    fig, ax = river_level.plot_data_range(['2025-05-05', '2025-06-04'], downsample = downsample_, max_points = max_points)
+
+    try:
+        assert len(ax[0].get_lines()[0].get_xdata()) in expected
+    finally:
+        plt.close(fig)
+
+
+def test_plot_data_range_default(server):
+
+    river_level = RiverLevel('F1906')
+
+    fig, ax = river_level.plot_data_range(['2025-05-05', '2025-06-04'])
+
+    try:
+        # twice the width of the figure in pixels at most
+        assert len(ax[0].get_lines()[0].get_xdata()) <= 2 * fig.get_figwidth() * fig.dpi + 2
+    finally:
+        plt.close(fig)
@@ -0,0 +1,82 @@
+from flood_monitoring import FloodMonitoringMixin, RiverLevel
+
+import threading
+import time
+
+import pytest
+from matplotlib.figure import Figure
+
+from conftest import FakeResponse, make_measure
+
+
+NOTATIONS = [f'F1906-level-stage-{idx}' for idx in range(6)]
+
+
+@pytest.fixture
+def river_level(fake_transport) -> RiverLevel:
+
+    fake_transport.add_station('F1906', [make_measure(notation) for notation in NOTATIONS])
+
+    for idx, notation in enumerate(NOTATIONS):
+        fake_transport.add(f'id/measures/{notation}/readings',
+                           {'items' : [{'value' : float(idx), 'dateTime' : f'2025-06-05T0{hour}:00:00Z'} for hour in range(3)]})
+
+    return RiverLevel('F1906')
+
+
+def test_map_concurrently_order_and_errors():
+
+    ''' results should be returned in input order with errors collected by index '''
+
+    def function(item):
+        time.sleep(0.001 * (10 - item))
+        if item == 3:
+            raise ValueError('bad item')
+        return item * 2
+
+    results, errors = FloodMonitoringMixin.map_concurrently(function, [*range(10)], max_workers = 4)
+
+    assert results == [0, 2, 4, None, 8, 10, 12, 14, 16, 18]
+    assert [*errors] == [3]
+    assert isinstance(errors[3], ValueError)
+
+
+def test_map_concurrently_bounded():
+
+    lock = threading.Lock()
+    in_flight = {'current' : 0, 'max' : 0}
+
+    def function(item):
+        with lock:
+            in_flight['current'] += 1
+            in_flight['max'] = max(in_flight['max'], in_flight['current'])
+        time.sleep(0.005)
+        with lock:
+            in_flight['current'] -= 1
+
+    FloodMonitoringMixin.map_concurrently(function, [*range(20)], max_workers = 3)
+
+    assert in_flight['max'] <= 3
+
+
+def test_latest_measurement_collects_errors(fake_transport, river_level):
+
+    fake_transport.add(f'id/measures/{NOTATIONS[2]}/readings', FakeResponse({}, status_code = 500))
+
+    latest = river_level.get_latest_measurement()
+
+    assert [*latest] == NOTATIONS
+    assert latest[NOTATIONS[0]] == 0.0
+    assert latest[NOTATIONS[2]] is None
+    assert [*river_level.measure_errors] == [NOTATIONS[2]]
+
+
+def test_plot_data_range_skips_failed_measures(fake_transport, river_level):
+
+    fake_transport.add(f'id/measures/{NOTATIONS[0]}/readings', FakeResponse({}, status_code = 503))
+
+    fig, ax = river_level.plot_data_range()
+
+    assert isinstance(fig, Figure)
+    assert len(ax) == len(NOTATIONS) - 1
+    assert [*river_level.measure_errors] == [NOTATIONS[0]]
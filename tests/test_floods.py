@@ -0,0 +1,255 @@
+from flood_monitoring import FloodMonitoringMixin, FloodStatus, HTTPTransport, RiverLevel, StationCatalogue, get_transport, set_flood_status, set_transport
+from flood_monitoring.floods import KM_PER_DEGREE, distance_to_polygon, parse_polygon
+from flood_monitoring.standin import StandInServer, SyntheticNetwork, distance_km
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def network() -> SyntheticNetwork:
+    return SyntheticNetwork(n_stations = 200, flood_fraction = 0.5)
+
+
+@pytest.fixture
+def server(network):
+
+    previous = get_transport()
+
+    with StandInServer(network) as server:
+        set_transport(HTTPTransport(base_url = server.base_url, retries = 0))
+        yield server
+
+    set_transport(previous)
+
+
+@pytest.fixture
+def installed():
+
+    flood_status = FloodStatus()
+    set_flood_status(flood_status)
+
+    yield flood_status
+
+    set_flood_status(None)
+
+
+def expected_status(network : SyntheticNetwork, references : list[str], dist : float = 1, min_severity : int = 1) -> list[bool]:
+
+    ''' the flood status each station would get from its own id/floods query to the stand in '''
+
+    return [ json.loads(network.respond('id/floods', {'lat' : network.stations[reference]['lat'], 'long' : network.stations[reference]['long'],
+                                                      'dist' : dist, 'min-severity' : min_severity})[2])['items'] != []
+             for reference in references ]
+
+
+@pytest.mark.parametrize('dist, min_severity', [(1, 1), (1, 3), (0.2, 2)])
+def test_status(server, network : SyntheticNetwork, dist, min_severity):
+
+    flood_status = FloodStatus(dist = dist, min_severity = min_severity)
+
+    lats, longs = network.station_lats, network.station_longs
+    status = flood_status.status(lats, longs)
+
+    assert status.tolist() == expected_status(network, network.station_references, dist, min_severity)
+    assert status.any()
+
+    # flood areas once, the flood list once and the polygon of each flooded area
+    assert server.requests == 2 + len(flood_status.polygons)
+    assert len(flood_status.polygons) == len({ flood['floodAreaID'] for flood in network.floods if flood['severityLevel'] <= min_severity })
+
+
+def test_inside_large_area(server, network : SyntheticNetwork):
+
+    flood_status = FloodStatus(min_severity = 3)
+
+    flood = network.floods[0]
+    area = next( area for area in network.flood_areas if area['notation'] == flood['floodAreaID'] )
+
+    # a vertex of the polygon is on the edge of the area, several km from its centre
+    ring = parse_polygon(network.polygons[area['notation']])[0]
+    far = np.argmax(distance_km(area['lat'], area['long'], ring[:, 0], ring[:, 1]))
+    lat, long = ring[far]
+
+    assert distance_km(area['lat'], area['long'], lat, long) > 1
+    assert flood['floodAreaID'] in flood_status.flooded_areas(lat, long)
+
+    # positions inside the area are in flood, the whole polygon is within the farthest vertex so twice as far out is not
+    offsets = np.array([0.5, 0.9, 1.0, 2.0])
+    lats, longs = area['lat'] + (lat - area['lat']) * offsets, area['long'] + (long - area['long']) * offsets
+
+    assert FloodStatus(min_severity = 3, dist = 0).status(lats[:3], longs[:3]).all()
+    assert flood['floodAreaID'] not in flood_status.flooded_areas(lats[3], longs[3])
+
+
+def test_distance_to_polygon():
+
+    # a 2km square with a 1km square hole
+    square = np.array([[0, 0], [0, 2], [2, 2], [2, 0], [0, 0]]) / KM_PER_DEGREE
+    hole = 0.5 / KM_PER_DEGREE + square / 2
+
+    lats = np.array([1.0, 0.25, 3.0, 1.0]) / KM_PER_DEGREE
+    longs = np.array([0.25, 1.0, 1.0, 1.0]) / KM_PER_DEGREE
+
+    assert np.allclose(distance_to_polygon(lats, longs, [square]), [0, 0, 1, 0], atol = 1e-6)
+    assert np.allclose(distance_to_polygon(lats, longs, [square, hole]), [0, 0, 1, 0.5], atol = 1e-6)
+
+    # a ring of one point measures the distance to the point
+    assert np.allclose(distance_to_polygon(lats[2], longs[2], [square[:1]]), np.hypot(1, 3), atol = 1e-6)
+
+
+def test_flooded_areas(server, network : SyntheticNetwork):
+
+    flood_status = FloodStatus(min_severity = 3)
+
+    flood = network.floods[0]
+    area = next( area for area in network.flood_areas if area['notation'] == flood['floodAreaID'] )
+
+    assert flood['floodAreaID'] in flood_status.flooded_areas(area['lat'], area['long'])
+    assert flood_status.in_flood(area['lat'], area['long'])
+    assert not flood_status.in_flood(0.0, 0.0)
+
+
+def test_refresh_schedule(server, network : SyntheticNetwork):
+
+    now = [0.0]
+    flood_status = FloodStatus(min_severity = 3, refresh_interval = 60, clock = lambda : now[0])
+
+    flood = network.floods[0]
+    area = next( area for area in network.flood_areas if area['notation'] == flood['floodAreaID'] )
+
+    assert flood_status.in_flood(area['lat'], area['long'])
+
+    # the flood is lifted, the status only changes once the flood list is refreshed
+    network.floods = [ item for item in network.floods if item['floodAreaID'] != flood['floodAreaID'] ]
+
+    now[0] = 59
+    assert flood_status.in_flood(area['lat'], area['long'])
+
+    now[0] = 60
+    assert not flood_status.in_flood(area['lat'], area['long'])
+
+    # the polygons of flooded areas are requested once
+    assert server.requests == 3 + len(flood_status.polygons)
+
+
+def test_missing_area(server, network : SyntheticNetwork):
+
+    flood_status = FloodStatus(min_severity = 3, area_limit = 1)
+
+    flood_status.refresh()
+
+    # the area list was truncated, flooded areas left out of it are requested individually
+    assert len(flood_status.areas) == 1 + len({ flood['floodAreaID'] for flood in network.floods } - {network.flood_areas[0]['notation']})
+    assert flood_status.status(network.station_lats, network.station_longs).tolist() == expected_status(network, network.station_references, 1, 3)
+
+
+def test_river_level(server, network : SyntheticNetwork, installed):
+
+    catalogue = StationCatalogue.download()
+    references = catalogue.mask(station_class = RiverLevel)
+
+    stations = [ RiverLevel(reference, lazy = True) for reference in catalogue.references[references] ]
+    RiverLevel.hydrate_many(stations)
+
+    expected = expected_status(network, [ station_.station_id for station_ in stations ])
+
+    assert [ station_.in_flood for station_ in stations ] == expected
+    assert installed.in_flood_many(stations) == dict(zip([ station_.station_id for station_ in stations ], expected))
+
+    # one request for the catalogue, metadata and measures per station, the flood areas and floods once and the polygon of each flooded area
+    assert server.requests == 1 + 2 * len(stations) + 2 + len(installed.polygons)
+
+
+def test_apply_in_flood():
+
+    river_level = RiverLevel('F1906', lazy = True)
+
+    river_level.apply_in_flood({'items' : [{'floodAreaID' : '000FWF1906'}]})
+    river_level.mark_hydrated()
+
+    assert river_level.in_flood is True
+
+    river_level.apply_in_flood({'items' : []})
+
+    assert river_level.in_flood is False
+
+
+def test_background_refresh(server, network : SyntheticNetwork):
+
+    flood_status = FloodStatus(refresh_interval = 0.05).start()
+
+    try:
+        flood_status.status(np.array([52.0]), np.array([-1.0]))
+    finally:
+        flood_status.stop()
+
+    assert flood_status.refreshed_at is not None
+    assert 'refresh' not in flood_status.errors
+
+
+def test_hand_computed(fake_transport):
+
+    # a 4km square area A, and an area B whose polygon cannot be requested so it is measured from its centre
+    half_lat, half_long = 2 / KM_PER_DEGREE, 2 / (KM_PER_DEGREE * np.cos(np.radians(52.0)))
+    square = [[-1.0 - half_long, 52.0 - half_lat], [-1.0 + half_long, 52.0 - half_lat], [-1.0 + half_long, 52.0 + half_lat],
+              [-1.0 - half_long, 52.0 + half_lat], [-1.0 - half_long, 52.0 - half_lat]]
+
+    fake_transport.add('id/floodAreas', {'items' : [{'notation' : 'A', 'lat' : 52.0, 'long' : -1.0}, {'notation' : 'B', 'lat' : 53.0, 'long' : -1.0}]})
+    fake_transport.add('id/floods', {'items' : [{'floodAreaID' : 'A', 'severityLevel' : 2}, {'floodAreaID' : 'B', 'severityLevel' : 1}]})
+    fake_transport.add('id/floodAreas/A/polygon', {'type' : 'FeatureCollection',
+                                                   'features' : [{'type' : 'Feature', 'geometry' : {'type' : 'MultiPolygon', 'coordinates' : [[square]]}}]})
+
+    flood_status = FloodStatus(min_severity = 3)
+
+    # km north and east of the centre of A: inside far from the centre, 0.5km and 1.5km beyond an edge, 0.71km and 1.13km beyond a corner
+    north, east = np.array([[1.9, 0], [2.5, 0], [3.5, 0], [2.5, 2.5], [2.8, 2.8], [0, -2.5], [0, -3.5]]).T
+
+    lats = 52.0 + north / KM_PER_DEGREE
+    longs = -1.0 + east / (KM_PER_DEGREE * np.cos(np.radians(52.0)))
+
+    assert flood_status.status(lats, longs).tolist() == [True, True, False, True, False, True, False]
+
+    # B is measured from its centre
+    assert flood_status.status(53.0 + np.array([0.5, 1.5]) / KM_PER_DEGREE, np.array([-1.0, -1.0])).tolist() == [True, False]
+    assert 'B' in flood_status.errors and list(flood_status.polygons) == ['A']
+
+    assert flood_status.flooded_areas(lats[1], longs[1]) == ['A']
+    assert FloodStatus(min_severity = 1).flooded_areas(lats[1], longs[1]) == []
+
+
+@pytest.mark.skipif(bool(os.environ.get('FLOOD_MONITORING_OFFLINE')), reason = 'the stand in answers id/floods with FloodStatus geometry')
+def test_matches_id_floods():
+
+    '''
+    against the live API: points on the edges of flooded areas, far from their centres, are in flood as their own
+    id/floods queries return
+    '''
+
+    flood_status = FloodStatus()
+    flooded, _ = flood_status.index()
+
+    if not flooded:
+        pytest.skip('No floods in force')
+
+    # the vertex of the outer ring of each area farthest from the area's centre
+    positions = []
+
+    for notation in flooded[:10]:
+
+        if notation not in flood_status.polygons or flood_status.areas.get(notation) is None:
+            continue
+
+        ring = flood_status.polygons[notation][0]
+        lat, long = flood_status.areas[notation]
+        positions.append(ring[np.argmax(distance_km(lat, long, ring[:, 0], ring[:, 1]))])
+
+    lats, longs = np.array(positions).reshape(-1, 2).T
+
+    expected = [ FloodMonitoringMixin.make_request('id/floods', {'lat' : lat, 'long' : long, 'dist' : 1, 'min-severity' : 1})['items'] != []
+                 for lat, long in zip(lats, longs) ]
+
+    assert flood_status.status(lats, longs).tolist() == expected == [True] * len(positions)
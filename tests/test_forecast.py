@@ -164,3 +164,224 @@ def test_predict(valid_obj, sample_training_data):
 
     #verifying the length of the predictions 
     assert len(predictions) == n_predictions 
+
+
+def reference_transform_data(dataframe, lag_features, evaluation_split = False, split_date = None, split_size = 5):
+
+    '''
+    the original pandas implementation of transform_data, kept to check the NumPy implementation returns the same arrays
+    '''
+
+    dataframe = dataframe.loc[:, : ]
+    dataframe['dateTime64'] = pd.to_datetime(dataframe.dateTime)
+    dataframe.drop(['measure'], inplace = True, axis = 'columns')
+
+    X_columns = []
+    for i in range(1, lag_features + 1):
+        dataframe[f'lag_{i}'] = dataframe.value.shift(i)
+        X_columns.append(f'lag_{i}')
+
+    dataframe.dropna(inplace = True)
+    dataframe.sort_values('dateTime', ascending = False, inplace = True)
+
+    if evaluation_split:
+
+        train_readings = dataframe[:-split_size]
+        test_readings = dataframe[-split_size:]
+
+        if split_date:
+            split_date = pd.Timestamp(split_date, tz = 'UTC')
+            train_readings = dataframe[dataframe.dateTime64 < split_date]
+            test_readings = dataframe[dataframe.dateTime64 > split_date]
+
+        train_x = train_readings[X_columns].values
+        train_y = train_readings['value'].values
+        test_x = np.concatenate((train_x[0, 1:], [train_y[0]]), axis = -1)
+
+        return train_x, train_y, test_x, test_readings['value'].values, test_readings['dateTime'].values
+
+    return dataframe[X_columns].values, dataframe['value'].values
+
+
+@pytest.fixture
+def long_data() -> pd.DataFrame:
+
+    ''' a week of 15 minute readings with a few missing values, shuffled so the rows are not in time order '''
+
+    rng = np.random.default_rng(0)
+    times = pd.date_range('2025-06-01', periods = 7 * 96, freq = '15min', tz = 'UTC')
+
+    values = np.cumsum(rng.normal(size = len(times)))
+    values[[10, 11, 300]] = np.nan
+
+    dataframe = pd.DataFrame({'dateTime' : times.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                              'measure' : 'http://environment.data.gov.uk/flood-monitoring/id/measures/1412-level',
+                              'value' : values})
+
+    return dataframe
+
+
+@pytest.mark.parametrize('lag_features', [1, 3, 24])
+@pytest.mark.parametrize('kwargs', [{},
+                                    {'evaluation_split' : True, 'split_size' : 3},
+                                    {'evaluation_split' : True, 'split_date' : '2025-06-05T10:00:00Z'}])
+def test_transform_data_matches_reference(valid_obj : Forecast, long_data, lag_features, kwargs):
+
+    shuffled = long_data.sample(frac = 1, random_state = 0)
+    frames = [long_data, shuffled]
+
+    # series with no complete row of lags give empty arrays, a train/test split needs at least one training row
+    if not kwargs:
+        frames += [long_data[:lag_features], long_data[:0]]
+
+    for dataframe in frames:
+
+        expected = reference_transform_data(dataframe, lag_features, **kwargs)
+        result = valid_obj.transform_data(dataframe, lag_features, **kwargs)
+
+        assert len(result) == len(expected)
+
+        for array, expected_array in zip(result, expected):
+            assert np.array_equal(array, expected_array)
+
+
+def test_transform_data_sample_matches_reference(valid_obj : Forecast, sample_data):
+
+    expected = reference_transform_data(sample_data, 3, evaluation_split = True, split_size = 3)
+    result = valid_obj.transform_data(sample_data, 3, evaluation_split = True, split_size = 3)
+
+    for array, expected_array in zip(result, expected):
+        assert np.array_equal(array, expected_array)
+
+
+def test_transform_data_float32(valid_obj : Forecast, long_data):
+
+    X, y = valid_obj.transform_data(long_data, 24, dtype = np.float32)
+    expected_X, expected_y = reference_transform_data(long_data, 24)
+
+    assert X.dtype == np.float32 and y.dtype == np.float32
+    assert np.allclose(X, expected_X, atol = 1e-4)
+    assert np.allclose(y, expected_y, atol = 1e-4)
+
+
+def test_transform_data_does_not_copy(valid_obj : Forecast, long_data):
+
+    ''' with no missing values and readings in time order the lag matrix is a view of a single value array '''
+
+    dataframe = long_data.fillna(0.0)
+
+    X, y = valid_obj.transform_data(dataframe, 96)
+
+    assert X.shape == (len(dataframe) - 96, 96)
+    assert np.shares_memory(X, y)
+    assert X.base is not None
+
+
+def reference_predict(model, x_last, n_predictions):
+
+    ''' the original implementation of predict, one call to the model per step '''
+
+    predictions = np.array([])
+
+    for _ in range(n_predictions):
+        prediction = model.predict([x_last])
+        x_last = np.concatenate((x_last[1:], prediction), axis = 0)
+        predictions = np.concatenate((predictions, prediction))
+
+    return predictions
+
+
+def test_predict_matches_reference(valid_obj, sample_training_data):
+
+    X, y = sample_training_data
+    valid_obj.fit(X, y)
+
+    x_last = np.array([0.2, 0.5, 0.7])
+
+    assert np.allclose(valid_obj.predict(x_last, 50), reference_predict(valid_obj.model, x_last, 50))
+
+
+def test_predict_batch(valid_obj, sample_training_data):
+
+    X, y = sample_training_data
+    valid_obj.fit(X, y)
+
+    states = np.random.random((6, 3))
+    predictions = valid_obj.predict(states, 10)
+
+    assert predictions.shape == (6, 10)
+
+    for state, prediction in zip(states, predictions):
+        assert np.allclose(prediction, reference_predict(valid_obj.model, state, 10))
+
+
+def test_recursive_forecast_per_state_coefficients():
+
+    coefficients = np.array([[0.0, 1.0], [0.5, 0.5]])
+    states = np.array([[1.0, 2.0], [2.0, 4.0]])
+
+    predictions = Forecast.recursive_forecast(coefficients, np.array([1.0, 0.0]), states, 3)
+
+    # the first state adds one to its latest value each step, the second averages its last two values
+    assert np.allclose(predictions[0], [3.0, 4.0, 5.0])
+    assert np.allclose(predictions[1], [3.0, 3.5, 3.25])
+    assert len(Forecast.recursive_forecast(coefficients[0], 0.0, states[0], 0)) == 0
+
+
+@pytest.fixture
+def many_series() -> dict:
+
+    rng = np.random.default_rng(1)
+
+    data = {}
+    for idx, (n_samples, lag_features) in enumerate([(200, 3), (50, 3), (120, 5), (80, 3)]):
+        X = rng.normal(size = (n_samples, lag_features)) + 10
+        y = X @ rng.normal(size = lag_features) + rng.normal(scale = 0.1, size = n_samples) + idx
+        data[f'measure-{idx}'] = (X, y)
+
+    return data
+
+
+def test_fit_many_matches_linear_regression(valid_obj : Forecast, many_series):
+
+    fitted = valid_obj.fit_many(many_series)
+
+    assert set(fitted) == set(many_series) == set(valid_obj.coefficients)
+
+    for notation, (X, y) in many_series.items():
+
+        model = LinearRegression().fit(X, y)
+
+        assert fitted[notation].lag_features == X.shape[1]
+        assert fitted[notation].n_samples == len(y)
+        assert np.allclose(fitted[notation].coefficients, model.coef_)
+        assert np.isclose(fitted[notation].intercept, model.intercept_)
+
+
+def test_fit_many_constant_series(valid_obj : Forecast):
+
+    X = np.ones((10, 2))
+    y = np.full(10, 3.0)
+
+    fitted = valid_obj.fit_many({'constant' : (X, y)})['constant']
+
+    assert np.allclose(X @ fitted.coefficients + fitted.intercept, y)
+
+
+def test_fit_many_short_series(valid_obj : Forecast, long_data):
+
+    X, y = valid_obj.transform_data(long_data[:3], 3)
+
+    with pytest.raises(Exception, match = 'No training data for measure short'):
+        valid_obj.fit_many({'short' : (X, y)})
+
+
+def test_predict_many(valid_obj : Forecast, many_series):
+
+    valid_obj.fit_many(many_series)
+
+    states = { notation : X[0] for notation, (X, y) in many_series.items() }
+    predictions = valid_obj.predict_many(states, 4)
+
+    for notation, state in states.items():
+        assert np.allclose(predictions[notation], valid_obj.predict(state, 4, measure_notation = notation))
@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+'''
+importing the package must not load the plotting and forecasting dependencies, they are imported on first use
+'''
+LAZY_MODULES = ['matplotlib', 'pandas', 'sklearn', 'scipy']
+
+''' seconds a fresh interpreter may take to import the package, generous so slow CI machines do not fail '''
+IMPORT_BUDGET = 0.5
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+
+def run_python(code : str) -> dict:
+
+    env = dict(os.environ, PYTHONPATH = SRC + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    output = subprocess.run([sys.executable, '-c', code], env = env, capture_output = True, text = True, check = True).stdout
+
+    return json.loads(output.splitlines()[-1])
+
+
+def loaded_after(statement : str) -> list[str]:
+
+    return run_python(f'''
+import json, sys
+{statement}
+print(json.dumps(sorted({{ name.split('.')[0] for name in sys.modules }} & {set(LAZY_MODULES)!r})))
+''')
+
+
+def test_import_is_lazy():
+    assert loaded_after('import flood_monitoring') == []
+
+
+def test_standin_not_imported():
+
+    # the stand in server is only used for testing, it is imported from flood_monitoring.standin
+    assert run_python('''
+import json, sys
+import flood_monitoring
+print(json.dumps([ name for name in ['flood_monitoring.standin', 'http.server', 'socketserver'] if name in sys.modules ]))
+''') == []
+
+
+def test_import_time():
+
+    seconds = min( run_python('''
+import json, time
+start = time.perf_counter()
+import flood_monitoring
+print(json.dumps(time.perf_counter() - start))
+''') for _ in range(3) )
+
+    assert seconds < IMPORT_BUDGET
+
+
+@pytest.mark.parametrize('statement, expected', [
+    ('from flood_monitoring import Readings; Readings.from_csv("dateTime,measure,value\\n", "m")', ['pandas']),
+    ('from flood_monitoring import Forecast; import numpy as np; Forecast().fit_many({"m" : (np.ones((5, 2)), np.ones(5))})', []),
+    ('from flood_monitoring import Forecast; import numpy as np; Forecast().fit(np.ones((5, 2)), np.ones(5))', ['scipy', 'sklearn']),
+])
+def test_loaded_on_first_use(statement : str, expected : list[str]):
+
+    loaded = loaded_after(statement)
+
+    # scikit-learn loads scipy (and may load pandas), so only the modules expected are checked
+    if expected:
+        assert set(expected) <= set(loaded)
+    else:
+        assert loaded == []
@@ -0,0 +1,146 @@
+from flood_monitoring import FloodMonitoringMixin, Forecast, HTTPTransport, Metrics, RiverLevel, get_transport, set_metrics, set_transport
+from flood_monitoring.instrumentation import Histogram, endpoint, phase
+from flood_monitoring.standin import StandInServer, SyntheticNetwork
+
+import logging
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from conftest import FakeResponse
+
+
+NOTATION = '1412-temperature-dry_bulb-i-1_h-deg_C'
+CSV = f'''dateTime,measure,value
+2025-06-05T01:00:00Z,http://environment.data.gov.uk/flood-monitoring/id/measures/{NOTATION},10.5
+2025-06-05T00:00:00Z,http://environment.data.gov.uk/flood-monitoring/id/measures/{NOTATION},10.6
+'''
+
+
+@pytest.fixture
+def metrics():
+
+    metrics = Metrics()
+    set_metrics(metrics)
+
+    yield metrics
+
+    set_metrics(None)
+
+
+def test_endpoint():
+
+    assert endpoint('id/stations') == 'id/stations'
+    assert endpoint('id/stations/F1906/readings?latest') == 'id/stations/{id}/readings'
+    assert endpoint(f'id/measures/{NOTATION}/readings.csv') == 'id/measures/{notation}/readings.csv'
+    assert endpoint('id/floodAreas/123WAF.csv') == 'id/floodAreas/{id}.csv'
+
+
+def test_histogram():
+
+    histogram = Histogram((0.1, 1.0))
+
+    for value in [0.05, 0.1, 0.5, 2.0]:
+        histogram.observe(value)
+
+    assert histogram.cumulative() == [('0.1', 2), ('1.0', 3), ('+Inf', 4)]
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.mean == pytest.approx(2.65 / 4)
+
+
+def test_requests_recorded(fake_transport, metrics):
+
+    fake_transport.add(f'id/measures/{NOTATION}/readings.csv', CSV)
+    fake_transport.add('id/stations', {'items' : [{'lat' : 51.0, 'long' : -1.0}]})
+    fake_transport.add('id/floods', FakeResponse({'items' : []}, status_code = 500))
+
+    calls, events = [], []
+    metrics.add_pre_request_hook(lambda query, params : calls.append(query))
+    metrics.add_post_request_hook(events.append)
+
+    readings = FloodMonitoringMixin().get_readings(NOTATION, ['2025-06-05', '2025-06-05'], as_readings = True)
+    FloodMonitoringMixin.make_request('id/stations', {'stationReference' : 'F1906'})
+
+    with pytest.raises(Exception, match = 'status code : 500'):
+        FloodMonitoringMixin.make_request('id/floods')
+
+    assert len(readings) == 2
+    assert calls == [f'id/measures/{NOTATION}/readings.csv', 'id/stations', 'id/floods']
+    assert [ (event.status_code, event.rows) for event in events ] == [(200, 2), (200, 1), (500, 0)]
+    assert events[0].bytes == len(CSV)
+    assert events[2].error is not None
+
+    snapshot = metrics.snapshot()
+
+    assert snapshot['endpoints']['id/measures/{notation}/readings.csv']['rows'] == 2
+    assert snapshot['endpoints']['id/floods']['status'] == {'500' : 1}
+    assert {'fetch', 'parse', 'get_readings'} <= set(snapshot['phases'])
+
+    # parsing the response into Readings does not time get_readings a second time
+    assert snapshot['phases']['get_readings']['count'] == 1
+
+
+def test_render_excludes_requests(metrics):
+
+    previous = get_transport()
+
+    # every request takes a second, drawing the figure far less
+    with StandInServer(SyntheticNetwork(n_stations = 0), latency = 1.0) as server:
+
+        set_transport(HTTPTransport(base_url = server.base_url, retries = 0))
+
+        try:
+            fig, _ = RiverLevel('F1906', lazy = True).plot_data_range(['2025-06-01', '2025-06-01'])
+            plt.close(fig)
+        finally:
+            set_transport(previous)
+
+    phases = metrics.snapshot()['phases']
+
+    assert phases['render']['count'] == 1
+    assert phases['fetch']['seconds'] >= 2
+    assert phases['render']['seconds'] < 1
+
+
+def test_phases(metrics):
+
+    X, y = np.random.random((50, 3)), np.random.random(50)
+
+    forecast = Forecast()
+    forecast.fit(X, y)
+    forecast.fit_many({'a' : (X, y)})
+
+    with phase('custom'):
+        pass
+
+    phases = metrics.snapshot()['phases']
+
+    assert phases['fit']['count'] == 2
+    assert phases['custom']['count'] == 1
+
+
+def test_prometheus_and_logging(fake_transport, metrics, caplog):
+
+    fake_transport.add('id/stations', {'items' : [{'lat' : 51.0, 'long' : -1.0}]})
+    FloodMonitoringMixin.make_request('id/stations')
+
+    text = metrics.to_prometheus()
+
+    assert '# TYPE flood_monitoring_request_seconds histogram' in text
+    assert 'flood_monitoring_request_seconds_bucket{endpoint="id/stations",le="+Inf"} 1' in text
+    assert 'flood_monitoring_requests_total{endpoint="id/stations",status="200"} 1' in text
+    assert 'flood_monitoring_rows_total{endpoint="id/stations"} 1' in text
+    assert 'flood_monitoring_phase_seconds_count{phase="fetch"} 1' in text
+
+    with caplog.at_level(logging.INFO, logger = 'flood_monitoring'):
+        metrics.log()
+
+    assert any('endpoint=id/stations requests=1' in record.message for record in caplog.records)
+
+
+def test_disabled_by_default(fake_transport):
+
+    fake_transport.add('id/stations', {'items' : []})
+
+    assert FloodMonitoringMixin.make_request('id/stations') == {'items' : []}
@@ -0,0 +1,78 @@
+from flood_monitoring import RiverLevel, Temperature, station
+
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import make_measure
+
+
+@pytest.fixture
+def stations(fake_transport):
+
+    for station_id in ['F1906', 'F1907', 'F1908']:
+        fake_transport.add_station(station_id, [make_measure(f'{station_id}-level-stage'),
+                                                make_measure(f'{station_id}-temperature', parameter = 'temperature', qualifier = '')])
+
+    return fake_transport
+
+
+def test_lazy_construction_sends_no_requests(stations):
+
+    registry = [RiverLevel(station_id, lazy = True) for station_id in ['F1906', 'F1907', 'F1908', '999']]
+
+    assert stations.calls == []
+    assert not any(station_.hydrated for station_ in registry)
+    assert registry[0].station_id == 'F1906'
+
+
+def test_hydrated_on_first_access(stations):
+
+    river_level = RiverLevel('F1906', lazy = True)
+
+    assert river_level.latitude == 51.5
+    assert river_level.hydrated
+    assert [measure.notation for measure in river_level.measures] == ['F1906-level-stage']
+    assert isinstance(river_level.in_flood, bool)
+
+    ''' every attribute should be loaded by the first access '''
+    assert len(stations.calls) == 3
+
+
+def test_validation_deferred(stations):
+
+    lazy_station = Temperature('999', lazy = True)
+
+    with pytest.raises(Exception, match = 'Incorrect Station ID'):
+        lazy_station.measures
+
+    assert not lazy_station.hydrated
+
+
+def test_concurrent_access_hydrates_once(stations):
+
+    river_level = RiverLevel('F1906', lazy = True)
+
+    with ThreadPoolExecutor(8) as executor:
+        latitudes = [*executor.map(lambda _ : river_level.latitude, range(32))]
+
+    assert latitudes == [51.5] * 32
+    assert stations.count('id/stations') == 1
+
+
+def test_hydrate_many(stations):
+
+    registry = [Temperature(station_id, lazy = True) for station_id in ['F1906', 'F1907', '999']]
+
+    errors = station.hydrate_many(registry, max_workers = 3)
+
+    assert [*errors] == ['999']
+    assert registry[0].hydrated and registry[1].hydrated
+
+
+def test_pickle_lazy_station(stations):
+
+    river_level = pickle.loads(pickle.dumps(RiverLevel('F1906', lazy = True)))
+
+    assert river_level.longitude == -0.1
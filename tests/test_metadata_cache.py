@@ -0,0 +1,93 @@
+from flood_monitoring import MetadataCache, RiverLevel, TTLCache, set_metadata_cache
+
+import pytest
+
+from conftest import make_measure
+
+
+NOTATION = 'F1906-level-stage-i-15_min-m'
+
+
+class Clock:
+
+    ''' manually advanced clock so expiry can be tested without sleeping '''
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> Clock:
+    return Clock()
+
+
+@pytest.fixture
+def cache(fake_transport, clock):
+
+    fake_transport.add_station('F1906', [make_measure(NOTATION, value = 1.5)])
+    fake_transport.add('id/stations/F1906/readings?latest',
+                       {'items' : [{'measure' : f'http://environment.data.gov.uk/flood-monitoring/id/measures/{NOTATION}',
+                                    'dateTime' : '2025-06-05T01:00:00Z', 'value' : 2.5}]})
+
+    cache = MetadataCache(static_ttl = 3600, latest_ttl = 300, clock = clock)
+    set_metadata_cache(cache)
+
+    yield cache
+
+    set_metadata_cache(None)
+
+
+def test_ttl_cache_expiry_and_lru(clock):
+
+    cache = TTLCache(maxsize = 2, ttl = 10, clock = clock)
+
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    ''' b was the least recently used entry so it should have been evicted '''
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+
+    clock.now = 11
+    assert cache.get('a') is None
+    assert cache.stats() == {'hits' : 2, 'misses' : 2, 'size' : 1}
+
+
+def test_repeated_construction_uses_cache(fake_transport, cache):
+
+    first = RiverLevel('F1906')
+    second = RiverLevel('F1906')
+
+    assert fake_transport.count('id/stations') == 1
+    assert fake_transport.count('id/measures') == 1
+    assert first.data == second.data == [1.5]
+    assert cache.stats()['stations'] == {'hits' : 1, 'misses' : 1, 'size' : 1}
+
+
+def test_expired_latest_readings_refreshed(fake_transport, cache, clock):
+
+    RiverLevel('F1906')
+
+    clock.now = 301
+    station = RiverLevel('F1906')
+
+    ''' only the latest readings should be requested again '''
+    assert fake_transport.count('id/measures') == 1
+    assert fake_transport.count('id/stations/F1906/readings?latest') == 1
+    assert station.data == [2.5]
+    assert station.timestamps == ['2025-06-05T01:00:00Z']
+
+
+def test_invalidate(fake_transport, cache):
+
+    RiverLevel('F1906')
+    cache.invalidate('F1906')
+    RiverLevel('F1906')
+
+    assert fake_transport.count('id/stations') == 2
+    assert fake_transport.count('id/measures') == 2
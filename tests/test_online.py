@@ -0,0 +1,100 @@
+from flood_monitoring import Forecast, OnlineForecast, Readings, RLSState
+
+import json
+
+import numpy as np
+import pytest
+
+from sklearn.linear_model import LinearRegression
+
+
+NOTATION = '1412-level-stage-i-15_min-m'
+
+
+@pytest.fixture
+def readings() -> Readings:
+
+    ''' an autoregressive series of 15 minute readings '''
+
+    rng = np.random.default_rng(0)
+
+    values = np.zeros(2000)
+    for idx in range(3, len(values)):
+        values[idx] = 0.5 * values[idx - 1] + 0.2 * values[idx - 2] - 0.1 * values[idx - 3] + 1.0 + rng.normal(scale = 0.1)
+
+    times = np.datetime64('2025-06-01T00:00:00') + np.arange(len(values)) * np.timedelta64(15, 'm')
+
+    return Readings(times, values, NOTATION)
+
+
+def test_converges_to_least_squares(readings : Readings):
+
+    forecast = OnlineForecast(lag_features = 3)
+    state = forecast.update(NOTATION, readings)
+
+    X, y = Forecast.lag_matrix(readings.values, 3)
+    model = LinearRegression().fit(X, y)
+
+    assert state.n_updates == len(readings) - 3
+    assert np.allclose(state.theta[:-1], model.coef_, atol = 1e-3)
+    assert np.isclose(state.theta[-1], model.intercept_, atol = 1e-2)
+
+    # forecasts match the batch predictor given the same coefficients and the latest values
+    expected = Forecast.recursive_forecast(state.theta[:-1], state.theta[-1], readings.values[-1:-4:-1][None, :], 1)[0]
+    assert np.allclose(forecast.forecast(NOTATION, 1), expected)
+
+
+def test_overlapping_readings_ignored(readings : Readings):
+
+    forecast = OnlineForecast(lag_features = 3)
+    forecast.update(NOTATION, Readings(readings.times[:100], readings.values[:100]))
+
+    state = forecast.update(NOTATION, Readings(readings.times[50:150], readings.values[50:150]))
+
+    assert state.n_updates == 150 - 3
+    assert state.last_time == '2025-06-02T13:15:00Z'
+
+
+def test_state_round_trip(readings : Readings, tmp_path):
+
+    uninterrupted = OnlineForecast(lag_features = 3)
+    uninterrupted.update(NOTATION, readings)
+
+    first = OnlineForecast(lag_features = 3)
+    first.update(NOTATION, Readings(readings.times[:1000], readings.values[:1000]))
+    first.save(tmp_path / 'states.json')
+
+    restarted = OnlineForecast(lag_features = 3)
+    restarted.load(tmp_path / 'states.json')
+    restarted.update(NOTATION, Readings(readings.times[1000:], readings.values[1000:]))
+
+    assert np.allclose(restarted.states[NOTATION].theta, uninterrupted.states[NOTATION].theta)
+    assert np.allclose(restarted.forecast(NOTATION, 10), uninterrupted.forecast(NOTATION, 10))
+
+
+def test_initial_state():
+
+    state = RLSState.initial(2)
+
+    assert not state.ready
+    json.dumps(state.to_dict())
+
+    with pytest.raises(Exception):
+        state.forecast(1)
+
+    state.update(1.0)
+    state.update(np.nan)
+    state.update(2.0)
+
+    assert state.ready and state.n_updates == 0
+    assert np.array_equal(state.window, [2.0, 1.0])
+
+
+def test_warm_start_from_fit_many(readings : Readings):
+
+    forecast = OnlineForecast(lag_features = 3)
+    fitted = forecast.fit_many({NOTATION : Forecast.lag_matrix(readings.values, 3)})[NOTATION]
+
+    state = forecast.state(NOTATION)
+
+    assert np.allclose(state.theta[:-1], fitted.coefficients)
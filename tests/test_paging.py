@@ -0,0 +1,102 @@
+from flood_monitoring import Forecast, Readings, Temperature, TidalLevel
+from flood_monitoring.station import ReadingsTruncatedWarning
+
+import pytest
+
+from conftest import make_measure
+
+
+NOTATION = 'E71524-level-tidal_level-Mean-15_min-mAOD'
+QUERY = f'id/measures/{NOTATION}/readings'
+
+
+def paged_route(readings : list[dict], csv : bool = False):
+
+    ''' serves readings newest first, honouring _limit and _offset '''
+
+    def route(params):
+        rows = sorted(readings, key = lambda item : item['dateTime'], reverse = True)
+        offset = int(params.get('_offset', 0))
+        rows = rows[offset : offset + int(params.get('_limit', len(rows)))]
+        if csv:
+            return 'dateTime,measure,value\n' + ''.join(f"{item['dateTime']},{NOTATION},{item['value']}\n" for item in rows)
+        return {'items' : rows}
+
+    return route
+
+
+READINGS = [ {'dateTime' : f'2025-06-05T{idx // 4:02d}:{15 * (idx % 4):02d}:00Z', 'value' : float(idx % 7)} for idx in range(25) ]
+
+
+@pytest.fixture
+def paged(fake_transport):
+
+    fake_transport.add(QUERY, paged_route(READINGS))
+    fake_transport.add(QUERY + '.csv', paged_route(READINGS, csv = True))
+
+    return fake_transport
+
+
+def test_iter_readings_pages(paged):
+
+    pages = [*Forecast().iter_readings(NOTATION, page_size = 10)]
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert sorted(item['dateTime'] for page in pages for item in page) == sorted(item['dateTime'] for item in READINGS)
+    assert [params['_offset'] for _, params in paged.calls] == [0, 10, 20]
+
+
+def test_iter_readings_removes_duplicates_at_page_boundary(fake_transport):
+
+    ''' a reading arriving between two pages shifts the rows so the first row of the next page is repeated '''
+
+    readings = list(READINGS)
+    route = paged_route(readings)
+
+    def shifting_route(params):
+        response = route(params)
+        if params['_offset'] == 0:
+            readings.append({'dateTime' : '2025-06-05T23:45:00Z', 'value' : 1.0})
+        return response
+
+    fake_transport.add(QUERY, shifting_route)
+
+    pages = [*Forecast().iter_readings(NOTATION, page_size = 10)]
+    times = [item['dateTime'] for page in pages for item in page]
+
+    assert len(times) == len(set(times)) == 25
+
+
+def test_truncation_warning(fake_transport):
+
+    forecast = Forecast()
+    forecast.api_row_limit = 10
+
+    fake_transport.add(QUERY, paged_route(READINGS[:10]))
+
+    with pytest.warns(ReadingsTruncatedWarning):
+        forecast.get_readings(NOTATION)
+
+
+def test_streamed_aggregates(paged):
+
+    paged.add_station('E71524', [make_measure(NOTATION, qualifier = 'Tidal Level'),
+                                 make_measure(NOTATION, parameter = 'temperature', qualifier = '')])
+
+    tidal_level = TidalLevel('E71524')
+    tidal_level.api_row_limit = 10
+
+    assert tidal_level.calculate_tidal_range() == 6.0
+
+    temperature = Temperature('E71524')
+    temperature.api_row_limit = 10
+
+    assert temperature.average_temp() == pytest.approx(sum(item['value'] for item in READINGS) / 25)
+
+
+def test_iter_readings_as_readings(paged):
+
+    pages = [*Forecast().iter_readings(NOTATION, page_size = 10, as_readings = True)]
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert all(isinstance(page, Readings) for page in pages)
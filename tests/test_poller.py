@@ -0,0 +1,112 @@
+from flood_monitoring import ReadingsPoller
+
+import asyncio
+import datetime
+
+import numpy as np
+import pytest
+
+
+NOTATIONS = ['1412-level-stage-i-15_min-m', '1413-level-stage-i-15_min-m']
+
+
+class ReadingsFeed:
+
+    ''' readings published every 15 minutes, a route returns those at or after since as the API does '''
+
+    def __init__(self, notation : str, n_readings : int) -> None:
+        self.notation = notation
+        self.times = [ str(time) + 'Z' for time in np.datetime64('2025-06-05T00:00:00') + np.arange(n_readings) * np.timedelta64(15, 'm') ]
+        self.requests = []
+
+    def publish(self, n_readings : int = 1) -> None:
+        last = np.datetime64(self.times[-1].rstrip('Z'))
+        self.times += [ str(last + np.timedelta64(15 * (idx + 1), 'm')) + 'Z' for idx in range(n_readings) ]
+
+    def __call__(self, params : dict) -> str:
+        self.requests.append(params)
+        measure = f'http://environment.data.gov.uk/flood-monitoring/id/measures/{self.notation}'
+        rows = [ f'{time},{measure},{float(idx)}\n' for idx, time in enumerate(self.times) if time >= params['since'] ]
+        return 'dateTime,measure,value\n' + ''.join(rows)
+
+
+@pytest.fixture
+def feeds(fake_transport) -> dict:
+
+    feeds = { notation : ReadingsFeed(notation, 4) for notation in NOTATIONS }
+
+    for notation, feed in feeds.items():
+        fake_transport.add(f'id/measures/{notation}/readings.csv', feed)
+
+    return feeds
+
+
+def test_next_poll_time():
+
+    poller = ReadingsPoller(NOTATIONS, interval = 900, offset = 60)
+
+    assert poller.next_poll_time(0) == 60
+    assert poller.next_poll_time(60) == 960
+    assert poller.next_poll_time(1000) == 1860
+
+
+def test_only_new_readings_polled(feeds):
+
+    poller = ReadingsPoller(NOTATIONS, spread = 0, watermarks = { notation : '2025-06-05T00:15:00Z' for notation in NOTATIONS })
+
+    new_readings = poller.poll()
+
+    assert set(new_readings) == set(NOTATIONS)
+    assert len(new_readings[NOTATIONS[0]]) == 2
+    assert poller.watermarks[NOTATIONS[0]] == '2025-06-05T00:45:00Z'
+
+    # nothing new has been published
+    assert poller.poll() == {}
+    assert feeds[NOTATIONS[0]].requests[-1] == {'since' : '2025-06-05T00:45:00Z'}
+
+    feeds[NOTATIONS[1]].publish(3)
+    new_readings = poller.poll()
+
+    assert list(new_readings) == [NOTATIONS[1]]
+    assert new_readings[NOTATIONS[1]].times[0] == np.datetime64('2025-06-05T01:00:00')
+    assert len(new_readings[NOTATIONS[1]]) == 3
+
+
+def test_errors_recorded(feeds):
+
+    poller = ReadingsPoller(NOTATIONS + ['missing'], spread = 0, watermarks = {'missing' : '2025-06-05T00:00:00Z'})
+    poller.poll()
+
+    assert list(poller.errors) == ['missing']
+
+
+def test_run_dispatches_to_callbacks(feeds):
+
+    poller = ReadingsPoller(NOTATIONS, interval = 0.02, offset = 0, spread = 0.01,
+                            watermarks = { notation : '2025-06-05T00:00:00Z' for notation in NOTATIONS })
+
+    received = []
+    poller.add_callback(lambda notation, readings : received.append((notation, len(readings))))
+
+    def publish(notation, readings):
+        if len(received) == 2:
+            feeds[NOTATIONS[0]].publish()
+
+    poller.add_callback(publish)
+    poller.run(cycles = 3)
+
+    assert sorted(received[:2]) == [(NOTATIONS[0], 3), (NOTATIONS[1], 3)]
+    assert received[2:] == [(NOTATIONS[0], 1)]
+
+
+def test_stream(feeds):
+
+    poller = ReadingsPoller(NOTATIONS, interval = 0.02, offset = 0, spread = 0, lookback = datetime.timedelta(days = 10 * 365))
+
+    async def consume():
+        return [ (notation, len(readings)) async for notation, readings in poller.stream(cycles = 2) ]
+
+    # without watermarks the first poll requests readings since the lookback
+    received = asyncio.run(consume())
+
+    assert sorted(received) == [(NOTATIONS[0], 4), (NOTATIONS[1], 4)]
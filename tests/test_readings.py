@@ -0,0 +1,72 @@
+from flood_monitoring import Forecast, Readings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+NOTATION = '1412-temperature-dry_bulb-i-1_h-deg_C'
+
+SAMPLE_CSV = '''dateTime,measure,value
+2025-06-05T02:00:00Z,http://environment.data.gov.uk/flood-monitoring/id/measures/1412-temperature-dry_bulb-i-1_h-deg_C,10.6
+2025-06-05T00:00:00Z,http://environment.data.gov.uk/flood-monitoring/id/measures/1412-temperature-dry_bulb-i-1_h-deg_C,10.5
+2025-06-05T01:00:00Z,http://environment.data.gov.uk/flood-monitoring/id/measures/1412-temperature-dry_bulb-i-1_h-deg_C,
+'''
+
+
+@pytest.fixture
+def readings() -> Readings:
+    return Readings.from_csv(SAMPLE_CSV, NOTATION)
+
+
+def test_from_csv(readings : Readings):
+
+    assert len(readings) == 3
+    assert readings.times.dtype == np.dtype('datetime64[ns]')
+    assert readings.values.dtype == np.float64
+    assert readings.times[0] == np.datetime64('2025-06-05T02:00:00')
+    assert np.isnan(readings.values[2])
+
+
+def test_from_json_matches_csv(readings : Readings):
+
+    response = {'items' : [{'dateTime' : '2025-06-05T02:00:00Z', 'value' : 10.6},
+                           {'dateTime' : '2025-06-05T00:00:00Z', 'value' : 10.5},
+                           {'dateTime' : '2025-06-05T01:00:00Z'}]}
+
+    from_json = Readings.from_json(response)
+
+    np.testing.assert_array_equal(from_json.times, readings.times)
+    np.testing.assert_array_equal(from_json.values, readings.values)
+
+
+def test_aggregates_and_sorting(readings : Readings):
+
+    assert readings.max() == 10.6
+    assert readings.min() == 10.5
+
+    ordered = readings.sorted()
+
+    assert (np.diff(ordered.times) > np.timedelta64(0)).all()
+    assert ordered.sorted() is ordered
+
+
+def test_zero_copy_pandas_views(readings : Readings):
+
+    series = readings.to_series()
+    frame = readings.to_frame()
+
+    assert isinstance(series.index, pd.DatetimeIndex)
+    assert np.shares_memory(series.to_numpy(), readings.values)
+    assert np.shares_memory(frame['value'].to_numpy(), readings.values)
+
+
+def test_get_readings_as_readings(fake_transport):
+
+    fake_transport.add(f'id/measures/{NOTATION}/readings.csv', SAMPLE_CSV)
+
+    readings = Forecast().get_readings(NOTATION, as_readings = True)
+
+    assert isinstance(readings, Readings)
+    assert readings.measure == NOTATION
+    assert len(readings) == 3
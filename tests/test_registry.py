@@ -0,0 +1,95 @@
+from flood_monitoring import Forecast, ModelRegistry, Readings
+
+import datetime
+
+import numpy as np
+import pytest
+
+
+NOTATION = '1412-level-stage-i-15_min-m'
+MEASURE = f'http://environment.data.gov.uk/flood-monitoring/id/measures/{NOTATION}'
+
+
+def readings_csv(n_readings : int, seed : int = 0) -> str:
+
+    rng = np.random.default_rng(seed)
+    times = np.datetime64('2025-06-01T00:00:00') + np.arange(n_readings) * np.timedelta64(15, 'm')
+    values = np.cumsum(rng.normal(size = n_readings))
+
+    return 'dateTime,measure,value\n' + ''.join(f'{time}Z,{MEASURE},{value}\n'
+                                                for time, value in zip(np.datetime_as_string(times, unit = 's'), values))
+
+
+@pytest.fixture
+def readings_route(fake_transport):
+
+    ''' serves 200 readings, swapping in csv['value'] lets a test change the data '''
+
+    csv = {'value' : readings_csv(200)}
+    fake_transport.add(f'id/measures/{NOTATION}/readings.csv', lambda params : csv['value'])
+
+    return csv
+
+
+def test_save_and_load():
+
+    registry = ModelRegistry()
+    model = Forecast.coefficients_dclass(coefficients = np.array([0.5, 0.25]), intercept = 1.0, lag_features = 2, n_samples = 10,
+                                         start = '2025-06-01T00:00:00Z', end = '2025-06-02T00:00:00Z', fingerprint = 'abc')
+
+    registry.save(NOTATION, model)
+
+    loaded = registry.load(NOTATION)
+
+    assert np.array_equal(loaded.coefficients, model.coefficients)
+    assert (loaded.intercept, loaded.lag_features, loaded.n_samples, loaded.end, loaded.fingerprint) == (1.0, 2, 10, model.end, 'abc')
+    assert registry.load('missing') is None
+
+    forecast = Forecast()
+    assert registry.load_into(forecast) == 1
+    assert np.allclose(forecast.predict(np.array([1.0, 1.0]), 1, measure_notation = NOTATION), [1.75])
+
+    registry.remove(NOTATION)
+    assert len(registry) == 0
+
+
+def test_persisted_to_disk(tmp_path):
+
+    path = str(tmp_path / 'models.sqlite')
+
+    registry = ModelRegistry(path)
+    registry.save(NOTATION, Forecast.coefficients_dclass(np.array([1.0]), 0.0, 1, 5))
+    registry.close()
+
+    assert ModelRegistry(path).load(NOTATION).n_samples == 5
+
+
+def test_fit_measures_refits_only_stale(readings_route, fake_transport):
+
+    registry = ModelRegistry()
+    date_range = ['2025-06-01', '2025-06-03']
+
+    fitted = Forecast().fit_measures([NOTATION], date_range, lag_features = 3, registry = registry)[NOTATION]
+
+    assert fitted.fingerprint is not None
+    assert fitted.start == '2025-06-01T00:00:00Z'
+    assert registry.load(NOTATION).fingerprint == fitted.fingerprint
+
+    # unchanged readings are answered from the registry
+    reloaded = Forecast().fit_measures([NOTATION], date_range, lag_features = 3, registry = registry)[NOTATION]
+    assert np.array_equal(reloaded.coefficients, fitted.coefficients)
+    assert not registry.is_stale(NOTATION, 3, Readings.from_csv(readings_route['value']))
+
+    # a different number of lag features or new readings make the model stale
+    assert registry.is_stale(NOTATION, 4, Readings.from_csv(readings_route['value']))
+
+    readings_route['value'] = readings_csv(210, seed = 1)
+    new_readings = Readings.from_csv(readings_route['value'])
+
+    assert registry.is_stale(NOTATION, 3, new_readings)
+    assert not registry.is_stale(NOTATION, 3, new_readings, max_age = datetime.timedelta(hours = 3))
+
+    refitted = Forecast().fit_measures([NOTATION], date_range, lag_features = 3, registry = registry)[NOTATION]
+
+    assert refitted.n_samples == 210 - 3
+    assert registry.load(NOTATION).fingerprint == refitted.fingerprint != fitted.fingerprint
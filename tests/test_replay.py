@@ -0,0 +1,43 @@
+from flood_monitoring import FloodMonitoringMixin, RecordingTransport, ReplayTransport, recording, replaying, get_transport
+from flood_monitoring.replay import request_key
+
+import pytest
+
+
+def test_request_key():
+
+    assert request_key('id/floods') == 'id/floods'
+    assert request_key('id/floods', {'long' : -1.0, 'lat' : 51.0}) == request_key('id/floods', {'lat' : 51.0, 'long' : -1.0})
+
+
+def test_record_and_replay(fake_transport, tmp_path):
+
+    path = str(tmp_path / 'responses.json')
+    fake_transport.add('id/stations', {'items' : [{'lat' : 51.0, 'long' : -1.0}]})
+
+    with recording(path) as recorder:
+        FloodMonitoringMixin.make_request('id/stations', {'stationReference' : 'F1906'})
+
+    assert isinstance(recorder, RecordingTransport)
+    assert get_transport() is fake_transport
+
+    # the recorded response is replayed without sending a request
+    with replaying(path) as replayer:
+        response = FloodMonitoringMixin.make_request('id/stations', {'stationReference' : 'F1906'})
+
+        with pytest.raises(Exception, match = 'status code : 404'):
+            FloodMonitoringMixin.make_request('id/stations', {'stationReference' : 'missing'})
+
+    assert response == {'items' : [{'lat' : 51.0, 'long' : -1.0}]}
+    assert fake_transport.count('id/stations') == 1
+    assert replayer.misses == ['id/stations?stationReference=missing']
+
+
+def test_replay_fallback(fake_transport):
+
+    fake_transport.add('id/floods', {'items' : ['live']})
+
+    replayer = ReplayTransport({'id/floods' : {'status_code' : 200, 'text' : '{"items": ["recorded"]}'}}, fallback = fake_transport)
+
+    assert replayer.get('id/floods').json() == {'items' : ['recorded']}
+    assert replayer.get('id/floods', {'lat' : 1}).json() == {'items' : ['live']}
@@ -0,0 +1,102 @@
+from flood_monitoring import HTTPTransport, RiverLevel, Temperature, set_transport, get_transport
+from flood_monitoring.standin import StandInServer, SyntheticNetwork
+
+import json
+import time
+
+import pytest
+
+
+NOW = 1749081600 + 3 * 3600    # 2025-06-05T03:00:00Z
+
+
+@pytest.fixture
+def network() -> SyntheticNetwork:
+    return SyntheticNetwork(n_stations = 20, readings_per_day = 96, flood_fraction = 0.5, clock = lambda : NOW)
+
+
+@pytest.fixture
+def server(network):
+
+    previous = get_transport()
+
+    with StandInServer(network) as server:
+        set_transport(HTTPTransport(base_url = server.base_url, retries = 0))
+        yield server
+
+    set_transport(previous)
+
+
+def test_readings(network : SyntheticNetwork):
+
+    notation = network.stations['SYN00000']['measures'][0]['notation']
+
+    status, _, body = network.respond(f'id/measures/{notation}/readings', {'startdate' : '2025-06-05', 'enddate' : '2025-06-05'})
+    items = json.loads(body)['items']
+
+    # readings every 15 minutes up to the current time, newest first
+    assert status == 200
+    assert len(items) == 3 * 4 + 1
+    assert items[0]['dateTime'] == '2025-06-05T03:00:00Z' and items[-1]['dateTime'] == '2025-06-05T00:00:00Z'
+
+    # readings are a function of the measure and time, so overlapping requests agree
+    _, _, csv = network.respond(f'id/measures/{notation}/readings.csv', {'since' : '2025-06-05T02:30:00Z', '_limit' : 2})
+    rows = csv.splitlines()
+
+    assert rows[0] == 'dateTime,measure,value'
+    assert rows[1].split(',')[::2] == [items[0]['dateTime'], str(items[0]['value'])]
+    assert len(rows) == 3
+
+
+def test_station_readings(network : SyntheticNetwork):
+
+    _, _, body = network.respond('id/stations/F1906/readings', {'latest' : ''})
+    items = json.loads(body)['items']
+
+    assert { item['measure'].rsplit('/', 1)[-1] for item in items } == { measure['notation'] for measure in network.stations['F1906']['measures'] }
+
+
+def test_stations_and_floods(network : SyntheticNetwork):
+
+    _, _, body = network.respond('id/stations', {'parameter' : 'temperature'})
+    stations = json.loads(body)['items']
+
+    assert stations and all(any(measure['parameter'] == 'temperature' for measure in station['measures']) for station in stations)
+    assert network.respond('id/stations/missing', {})[0] == 404
+
+    flood = network.floods[0]
+    area = next(area for area in network.flood_areas if area['notation'] == flood['floodAreaID'])
+
+    _, _, body = network.respond('id/floods', {'lat' : area['lat'], 'long' : area['long'], 'dist' : 1})
+    assert flood['floodAreaID'] in [ item['floodAreaID'] for item in json.loads(body)['items'] ]
+
+    _, _, body = network.respond('id/floods', {'lat' : 0.0, 'long' : 0.0, 'dist' : 1})
+    assert json.loads(body)['items'] == []
+
+
+def test_stations_served_over_http(server : StandInServer):
+
+    river_level = RiverLevel('F1906')
+
+    assert isinstance(river_level.in_flood, bool)
+    assert river_level.get_latest_measurement()
+
+    readings = Temperature('1412').get_readings('1412-temperature-dry_bulb-i-1_h-deg_C', ['2025-06-04', '2025-06-04'], as_readings = True)
+
+    assert len(readings) == 96
+    assert server.requests >= 4
+
+
+def test_latency_and_recordings(network : SyntheticNetwork):
+
+    recordings = {'id/stations?stationReference=F1906' : {'status_code' : 200, 'text' : json.dumps({'items' : [{'lat' : 1.0, 'long' : 2.0}]})}}
+
+    with StandInServer(network, latency = 0.05, recordings = recordings) as server:
+
+        transport = HTTPTransport(base_url = server.base_url, retries = 0)
+
+        start = time.perf_counter()
+        response = transport.get('id/stations', {'stationReference' : 'F1906'})
+
+        assert time.perf_counter() - start >= 0.05
+        assert response.json()['items'][0]['lat'] == 1.0
@@ -0,0 +1,102 @@
+from flood_monitoring import ReadingsTruncatedError, RiverLevel
+
+import logging
+
+import pytest
+
+from conftest import make_measure
+
+
+NOTATIONS = ['F1906-level-stage-i-15_min-m', 'F1906-level-downstage-i-15_min-m']
+BASE = 'http://environment.data.gov.uk/flood-monitoring/id/measures/'
+
+
+def reading(notation : str, hour : int, value : float) -> dict:
+    return {'measure' : BASE + notation, 'dateTime' : f'2025-06-05T0{hour}:00:00Z', 'value' : value}
+
+
+@pytest.fixture
+def river_level(fake_transport) -> RiverLevel:
+
+    fake_transport.add_station('F1906', [make_measure(NOTATIONS[0]),
+                                         make_measure(NOTATIONS[1], qualifier = 'Downstream Stage'),
+                                         make_measure('F1906-flow', parameter = 'flow', qualifier = '')])
+
+    def station_readings(params):
+
+        rows = [reading(notation, hour, hour + idx) for hour in range(4) for idx, notation in enumerate(NOTATIONS)]
+        rows.append(reading('F1906-flow', 0, 99.0))
+
+        if not params:
+            return {'items' : rows[-3:]}
+
+        return {'items' : rows}
+
+    fake_transport.add('id/stations/F1906/readings', station_readings)
+    fake_transport.add('id/stations/F1906/readings?latest', lambda params : station_readings({}))
+
+    return RiverLevel('F1906')
+
+
+def test_get_station_readings(fake_transport, river_level):
+
+    ''' rows should be split by measure, ignoring measures not attached to the station type '''
+
+    readings = river_level.get_station_readings(['2025-06-05', '2025-06-05'])
+
+    assert [*readings] == NOTATIONS
+    assert [item['value'] for item in readings[NOTATIONS[1]]['items']] == [1.0, 2.0, 3.0, 4.0]
+    assert fake_transport.count('id/stations/F1906/readings') == 1
+
+
+def test_latest_measurement_single_request(fake_transport, river_level):
+
+    latest = river_level.get_latest_measurement()
+
+    assert latest == {NOTATIONS[0] : 3.0, NOTATIONS[1] : 4.0}
+    assert fake_transport.count('id/stations/F1906/readings?latest') == 1
+    assert not any(query.startswith('id/measures/') for query, _ in fake_transport.calls)
+
+
+def test_plot_data_range_single_request(fake_transport, river_level):
+
+    fig, ax = river_level.plot_data_range()
+
+    assert len(ax) == 2
+    assert fake_transport.count('id/stations/F1906/readings') == 1
+
+
+def test_truncated_station_readings_fall_back(fake_transport, river_level, caplog):
+
+    ''' a response reaching the row limit should be requested per measure instead '''
+
+    river_level.station_readings_limit = 4
+
+    for notation in NOTATIONS:
+        fake_transport.add(f'id/measures/{notation}/readings', {'items' : [reading(notation, 0, 7.0)]})
+
+    with pytest.raises(Exception, match = 'truncated'):
+        river_level.get_station_readings()
+
+    with caplog.at_level(logging.INFO, logger = 'flood_monitoring'):
+        fig, ax = river_level.plot_data_range()
+
+    assert len(ax) == 2
+    assert fake_transport.count(f'id/measures/{NOTATIONS[0]}/readings') == 1
+
+    # the fallback to a request per measure is recorded and logged
+    assert isinstance(river_level.station_readings_error, ReadingsTruncatedError)
+    assert any('requesting 2 measures individually' in record.message for record in caplog.records)
+
+
+def test_station_readings_bugs_raised(river_level, monkeypatch):
+
+    ''' only request errors fall back to a request per measure, other exceptions are raised '''
+
+    def broken(**kwargs):
+        raise KeyError('measure')
+
+    monkeypatch.setattr(river_level, 'get_station_readings', broken)
+
+    with pytest.raises(KeyError):
+        river_level.get_latest_measurement()
@@ -0,0 +1,139 @@
+from flood_monitoring import Forecast, ReadingsStore, set_readings_store
+
+import datetime
+
+import pandas as pd
+import pytest
+
+
+NOTATION = '1412-temperature-dry_bulb-i-1_h-deg_C'
+QUERY = f'id/measures/{NOTATION}/readings'
+
+
+def readings_route(params : dict) -> dict:
+
+    ''' returns a reading every 6 hours for each day between startdate and enddate, or the days since '''
+
+    if 'since' in params:
+        start = end = datetime.date.fromisoformat(params['since'][:10])
+    else:
+        start, end = [ datetime.date.fromisoformat(params[key]) for key in ['startdate', 'enddate'] ]
+
+    items = []
+    for day in range((end - start).days + 1):
+        date = start + datetime.timedelta(days = day)
+        items += [ {'dateTime' : f'{date.isoformat()}T{hour:02d}:00:00Z', 'value' : float(day + hour)} for hour in range(0, 24, 6) ]
+
+    return {'items' : items}
+
+
+@pytest.fixture
+def store(fake_transport):
+
+    fake_transport.add(QUERY, readings_route)
+
+    store = ReadingsStore()
+    set_readings_store(store)
+
+    yield store
+
+    set_readings_store(None)
+    store.close()
+
+
+def test_repeated_request_served_locally(fake_transport, store):
+
+    forecast = Forecast()
+
+    first = forecast.get_readings(NOTATION, ['2025-06-01', '2025-06-03'])
+    second = forecast.get_readings(NOTATION, ['2025-06-01', '2025-06-03'])
+
+    assert len(first['items']) == 12
+    assert first == second
+    assert fake_transport.count(QUERY) == 1
+
+
+def test_only_missing_days_requested(fake_transport, store):
+
+    forecast = Forecast()
+
+    forecast.get_readings(NOTATION, ['2025-06-03', '2025-06-04'])
+    forecast.get_readings(NOTATION, ['2025-06-01', '2025-06-06'])
+
+    requested = [ (params['startdate'], params['enddate']) for query, params in fake_transport.calls if query == QUERY ]
+
+    assert requested == [('2025-06-03', '2025-06-04'), ('2025-06-01', '2025-06-02'), ('2025-06-05', '2025-06-06')]
+    assert store.missing_days(NOTATION, datetime.date(2025, 6, 1), datetime.date(2025, 6, 6)) == []
+
+
+def test_current_day_topped_up_with_since(fake_transport, store):
+
+    forecast = Forecast()
+
+    forecast.get_readings(NOTATION)
+    forecast.get_readings(NOTATION)
+
+    calls = [ params for query, params in fake_transport.calls if query == QUERY ]
+
+    assert all('since' in params for params in calls)
+    assert calls[1]['since'] > calls[0]['since']
+
+
+def test_load_data_from_store(fake_transport, store):
+
+    ''' csv responses from the store should load into the same dataframe layout as the API '''
+
+    readings = Forecast().load_data(NOTATION, ['2025-06-01', '2025-06-02'])
+
+    assert isinstance(readings, pd.DataFrame)
+    assert [*readings.columns] == ['dateTime', 'measure', 'value']
+    assert len(readings) == 8
+    assert readings.measure.str.endswith(NOTATION).all()
+
+
+def test_limit_bypasses_store(fake_transport, store):
+
+    Forecast().get_readings(NOTATION, ['2025-06-01', '2025-06-01'], limit = 2)
+
+    assert store.readings(NOTATION, datetime.date(2025, 6, 1), datetime.date(2025, 6, 1)) == []
+
+
+def test_late_readings_fetched_until_settled(fake_transport):
+
+    ''' a day fetched just after it ended is topped up with readings which reach the API later '''
+
+    yesterday = datetime.datetime.now(datetime.timezone.utc).date() - datetime.timedelta(days = 1)
+    published = [ {'dateTime' : f'{yesterday.isoformat()}T{hour:02d}:00:00Z', 'value' : float(hour)} for hour in range(0, 12, 6) ]
+
+    def route(params):
+        since = params.get('since', f'{params.get("startdate", "")}T00:00:00Z')
+        return {'items' : [ item for item in published if item['dateTime'] >= since ]}
+
+    fake_transport.add(QUERY, route)
+
+    store = ReadingsStore(settle_period = datetime.timedelta(days = 1))
+    set_readings_store(store)
+
+    try:
+        forecast = Forecast()
+
+        first = forecast.get_readings(NOTATION, [yesterday.isoformat(), yesterday.isoformat()])
+
+        published.extend({'dateTime' : f'{yesterday.isoformat()}T{hour:02d}:00:00Z', 'value' : float(hour)} for hour in range(12, 24, 6))
+
+        second = forecast.get_readings(NOTATION, [yesterday.isoformat(), yesterday.isoformat()])
+
+        assert len(first['items']) == 2
+        assert len(second['items']) == 4
+        assert store.missing_days(NOTATION, yesterday, yesterday) == [yesterday]
+        assert all('since' in params for query, params in fake_transport.calls if query == QUERY)
+
+        # without a settle period the day is final as soon as it has ended
+        store.settle_period = datetime.timedelta(0)
+        forecast.get_readings(NOTATION, [yesterday.isoformat(), yesterday.isoformat()])
+
+        assert store.missing_days(NOTATION, yesterday, yesterday) == []
+
+    finally:
+        set_readings_store(None)
+        store.close()
@@ -0,0 +1,47 @@
+from flood_monitoring import FloodMonitoringMixin, RiverLevel
+
+import numpy as np
+import pytest
+from matplotlib.figure import Figure
+
+from conftest import make_measure
+
+
+TIMESTAMPS = ['2025-06-05T00:00:00Z', '    2025-06-05T13:45:00Z', '2025-12-31T23:15:00Z']
+
+
+def test_parse_timestamps():
+
+    times = FloodMonitoringMixin.parse_timestamps(TIMESTAMPS)
+
+    assert times.dtype == np.dtype('datetime64[ns]')
+    assert [*times.astype('datetime64[s]').astype(object)] == [ FloodMonitoringMixin.convert_to_datetime(timestamp.strip()) for timestamp in TIMESTAMPS ]
+
+
+@pytest.mark.parametrize('frmt', ['%Y-%m-%d %H:%M', '%m-%d %H:%M', '%d %H:%M', '%H:%M', '%d/%m/%Y'])
+def test_format_timestamps_matches_format_date(frmt : str):
+
+    ''' bulk formatting should match formatting each timestamp with format_date '''
+
+    times = FloodMonitoringMixin.parse_timestamps(TIMESTAMPS)
+    labels = FloodMonitoringMixin.format_timestamps(times, frmt)
+
+    assert [*labels] == [ FloodMonitoringMixin.format_date(timestamp.strip(), frmt) for timestamp in TIMESTAMPS ]
+
+
+def test_plot_data_range_time_axis(fake_transport):
+
+    notation = 'F1906-level-stage'
+    fake_transport.add_station('F1906', [make_measure(notation)])
+    fake_transport.add(f'id/measures/{notation}/readings',
+                       {'items' : [ {'dateTime' : f'2025-06-05T{hour:02d}:00:00Z', 'value' : float(hour)} for hour in range(23, -1, -1) ]})
+
+    fig, ax = RiverLevel('F1906').plot_data_range(['2025-06-05', '2025-06-05'])
+
+    line = ax[0].get_lines()[0]
+    x = line.get_xdata()
+
+    assert isinstance(fig, Figure)
+    assert np.issubdtype(np.asarray(x).dtype, np.datetime64)
+    assert (np.diff(x) > np.timedelta64(0)).all()
+    assert [label.get_text() for label in ax[0].get_xticklabels()][:2] == ['00:00', '02:00']
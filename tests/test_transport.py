@@ -0,0 +1,69 @@
+from flood_monitoring import FloodMonitoringMixin, HTTPTransport, get_transport, set_transport
+
+import pytest
+
+from concurrent.futures import ThreadPoolExecutor
+
+from conftest import FakeResponse
+
+
+def test_default_transport():
+
+    ''' Double checking that a shared HTTPTransport is created by default '''
+
+    previous = get_transport()
+    set_transport(None)
+
+    assert isinstance(get_transport(), HTTPTransport)
+    assert get_transport() is get_transport()
+
+    set_transport(previous)
+
+
+def test_injected_transport(fake_transport):
+
+    ''' make_request should route requests through the injected transport '''
+
+    fake_transport.add('id/stations', {'items' : [{'lat' : 51.0, 'long' : -1.0}]})
+
+    response = FloodMonitoringMixin.make_request('id/stations', {'stationReference' : 'F1906'})
+
+    assert response['items'][0]['lat'] == 51.0
+    assert fake_transport.calls == [('id/stations', {'stationReference' : 'F1906'})]
+
+
+def test_invalid_status_code(fake_transport):
+
+    fake_transport.add('id/stations', FakeResponse({}, status_code = 500))
+
+    with pytest.raises(Exception, match = 'Invalid Query, status code : 500'):
+        FloodMonitoringMixin.make_request('id/stations')
+
+
+def test_pool_and_retry_configuration():
+
+    ''' Checking the connection pool size and retry policy are applied to the mounted adapter '''
+
+    transport = HTTPTransport(pool_size = 32, retries = 5, status_forcelist = (429, 503))
+
+    adapter = transport.session.get_adapter(transport.base_url)
+
+    assert adapter._pool_maxsize == 32
+    assert adapter.max_retries.total == 5
+    assert 429 in adapter.max_retries.status_forcelist
+
+    transport.close()
+
+
+def test_session_shared_between_threads():
+
+    ''' every thread should reuse the same session rather than creating its own '''
+
+    transport = HTTPTransport()
+
+    with ThreadPoolExecutor(8) as executor:
+        sessions = [*executor.map(lambda _ : transport.session, range(32))]
+
+    assert all(session is sessions[0] for session in sessions)
+
+    transport.close()
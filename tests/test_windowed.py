@@ -0,0 +1,99 @@
+from flood_monitoring import Forecast
+
+import datetime
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+
+NOTATION = '1412-temperature-dry_bulb-i-1_h-deg_C'
+MEASURE = f'http://environment.data.gov.uk/flood-monitoring/id/measures/{NOTATION}'
+
+
+def daily_readings(start : datetime.date, end : datetime.date) -> list[tuple[str, float]]:
+
+    ''' one reading at midnight and noon of each day from start to end, plus the following midnight '''
+
+    readings = []
+    for day in range((end - start).days + 2):
+        date = start + datetime.timedelta(days = day)
+        readings += [ (f'{date.isoformat()}T{hour:02d}:00:00Z', float(date.day)) for hour in [0, 12] ]
+
+    return readings[:-1]
+
+
+def windowed_route(csv : bool):
+
+    ''' returns readings for startdate to enddate, with each window overlapping the next by one reading '''
+
+    def route(params):
+        time.sleep(0.01)
+        start, end = [ datetime.date.fromisoformat(params[key]) for key in ['startdate', 'enddate'] ]
+        rows = daily_readings(start, end)[::-1]
+        if csv:
+            return 'dateTime,measure,value\n' + ''.join(f'{date_time},{MEASURE},{value}\n' for date_time, value in rows)
+        return {'items' : [ {'dateTime' : date_time, 'measure' : MEASURE, 'value' : value} for date_time, value in rows ]}
+
+    return route
+
+
+@pytest.fixture
+def windowed(fake_transport):
+
+    fake_transport.add(f'id/measures/{NOTATION}/readings', windowed_route(csv = False))
+    fake_transport.add(f'id/measures/{NOTATION}/readings.csv', windowed_route(csv = True))
+
+    return fake_transport
+
+
+def test_split_date_range():
+
+    windows = Forecast.split_date_range(['2025-06-01', '2025-06-17'], window_days = 7)
+
+    assert windows == [['2025-06-01', '2025-06-07'], ['2025-06-08', '2025-06-14'], ['2025-06-15', '2025-06-17']]
+
+
+def test_windowed_readings_merged_in_order(windowed):
+
+    readings = Forecast().get_readings_windowed(NOTATION, ['2025-06-01', '2025-06-30'], window_days = 3, max_workers = 4)
+
+    times = [ item['dateTime'] for item in readings['items'] ]
+
+    assert len(windowed.calls) == 10
+    assert times == sorted(set(times))
+    assert times[0] == '2025-06-01T00:00:00Z' and times[-1] == '2025-07-01T00:00:00Z'
+    assert len(times) == 61
+
+
+def test_windows_fetched_concurrently(fake_transport):
+
+    lock = threading.Lock()
+    in_flight = {'current' : 0, 'max' : 0}
+    route = windowed_route(csv = False)
+
+    def counting_route(params):
+        with lock:
+            in_flight['current'] += 1
+            in_flight['max'] = max(in_flight['max'], in_flight['current'])
+        response = route(params)
+        with lock:
+            in_flight['current'] -= 1
+        return response
+
+    fake_transport.add(f'id/measures/{NOTATION}/readings', counting_route)
+
+    Forecast().get_readings_windowed(NOTATION, ['2025-06-01', '2025-06-30'], window_days = 1, max_workers = 5)
+
+    assert 1 < in_flight['max'] <= 5
+
+
+def test_load_data_windowed(windowed):
+
+    readings = Forecast().load_data(NOTATION, ['2025-06-01', '2025-06-10'], window_days = 2)
+    expected = Forecast().load_data(NOTATION, ['2025-06-01', '2025-06-10'])
+
+    assert isinstance(readings, pd.DataFrame)
+    assert [*readings.dateTime] == sorted(expected.dateTime)
+    assert [*readings.value] == [*expected.sort_values('dateTime').value]